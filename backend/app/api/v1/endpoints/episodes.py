@@ -1,25 +1,207 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session, joinedload
-from app.db.session import get_db
-from app.db.models import Episode, EpisodeNews, News, NewsStatus
-from app.schemas.episode import EpisodeCreate, EpisodeUpdate, EpisodeResponse
-from app.schemas.episode_news import EpisodeNewsResponse, EpisodeNewsUpdate
+from app.db.session import get_db, SessionLocal
+from app.db.models import Episode, EpisodeNews, EpisodeStatus, News, NewsStatus, ScriptVariant
+from app.schemas.episode import (
+    EpisodeCreate, EpisodeUpdate, EpisodeResponse, EpisodeOverview, EpisodeOverviewPage
+)
+from app.schemas.episode_news import EpisodeNewsResponse, EpisodeNewsUpdate, ScriptVariantResponse
+from app.services.audio_serving import audio_response, audio_version
+from app.services.audio_storage import collect_unreferenced_audio
+from app.services.audio_utils import scan_mp3
 from app.services.podcast import get_podcast_service
+from app.services.progress import ProgressCallback, format_sse, get_progress_bus, no_progress
+from app.services.script_format import ScriptFormatError, dump_turns, parse_script
+from app.services.script_scorer import ACCEPT_SCORE, score_script
+from app.services.token_budget import news_material
 from typing import List, Optional
+from datetime import datetime
 from pydantic import BaseModel
+from contextlib import contextmanager
 import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# 检查客户端是否断开的间隔（秒）
+DISCONNECT_POLL_INTERVAL = 0.5
+
+
+class ClientDisconnected(Exception):
+    """客户端在生成完成前断开连接"""
+    pass
+
+
+async def _cancel_on_disconnect(request: Request, coro):
+    """
+    运行协程，客户端断开时取消它
+
+    取消会一直传播到 LLM HTTP 请求，连接归还连接池，不再为无人等待的结果付费。
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def _store_script(episode_news: EpisodeNews, script: str):
+    """写入逐字稿文本，并同步结构化台词（script_json）"""
+    episode_news.script = script
+    episode_news.script_json = dump_turns(parse_script(script)) if script else None
+
+
+def _store_audio(episode_news: EpisodeNews, audio_path: str):
+    """写入音频路径，并记录时长（供节目列表汇总，无法解析时为空）"""
+    episode_news.audio_url = audio_path
+    try:
+        episode_news.audio_duration = round(scan_mp3(audio_path).duration, 2)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Cannot read audio duration of {audio_path}: {e}")
+        episode_news.audio_duration = None
+
+
+# ===== 进度事件 =====
+
+# SSE 心跳间隔（秒），同时用于检查客户端是否断开
+SSE_HEARTBEAT_INTERVAL = 15.0
+
+# 任务完成后新闻的状态
+JOB_DONE_STATUS = {
+    "script": NewsStatus.SCRIPT_DONE.value,
+    "audio": NewsStatus.AUDIO_DONE.value,
+}
+
+
+def _news_progress(episode_news: EpisodeNews) -> ProgressCallback:
+    """发布到节目事件流的回调，事件带上新闻标识"""
+    return get_progress_bus().reporter(
+        episode_news.episode_id,
+        episode_news_id=episode_news.id,
+        news_id=episode_news.news_id
+    )
+
+
+@contextmanager
+def _job(progress: ProgressCallback, job: str):
+    """报告任务 job.started / job.finished / job.failed / job.cancelled，带耗时"""
+    start = time.monotonic()
+    progress("job.started", job=job, status=NewsStatus.GENERATING.value)
+    try:
+        yield
+    except ClientDisconnected:
+        progress("job.cancelled", job=job, elapsed=round(time.monotonic() - start, 2))
+        raise
+    except Exception as e:
+        progress(
+            "job.failed",
+            job=job,
+            status=NewsStatus.ERROR.value,
+            error=str(e),
+            elapsed=round(time.monotonic() - start, 2)
+        )
+        raise
+    progress(
+        "job.finished",
+        job=job,
+        status=JOB_DONE_STATUS[job],
+        elapsed=round(time.monotonic() - start, 2)
+    )
+
 
 @router.get("/", response_model=List[EpisodeResponse])
 def list_episodes(db: Session = Depends(get_db)):
     return db.query(Episode).order_by(Episode.created_at.desc()).all()
 
 
+def _news_stats():
+    """按节目汇总新闻（不含已软删除）：各状态数量、逐字稿字数、音频时长"""
+    return (
+        select(
+            EpisodeNews.episode_id,
+            func.count(EpisodeNews.id).label("news_total"),
+            *[
+                func.sum(case((EpisodeNews.status == status, 1), else_=0)).label(status.value)
+                for status in NewsStatus
+            ],
+            func.sum(func.length(EpisodeNews.script)).label("script_chars"),
+            func.sum(EpisodeNews.audio_duration).label("audio_duration"),
+        )
+        .where(EpisodeNews.deleted_at.is_(None))
+        .group_by(EpisodeNews.episode_id)
+        .subquery()
+    )
+
+
+@router.get("/overview", response_model=EpisodeOverviewPage)
+def list_episode_overview(
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    status: EpisodeStatus | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    db: Session = Depends(get_db)
+):
+    """
+    分页获取节目列表及新闻进度汇总
+
+    汇总在一条分组查询中完成，页面不必再逐个节目请求新闻列表。
+
+    Args:
+        limit: 每页数量
+        offset: 偏移量
+        status: 节目状态筛选
+        date_from: 播出日期下限（含；无 scheduled_date 时按 created_at）
+        date_to: 播出日期上限（不含）
+    """
+    stats = _news_stats()
+    air_date = func.coalesce(Episode.scheduled_date, Episode.created_at)
+    date_filters = []
+    if date_from:
+        date_filters.append(air_date >= date_from)
+    if date_to:
+        date_filters.append(air_date < date_to)
+
+    query = db.query(Episode, stats).outerjoin(stats, stats.c.episode_id == Episode.id).filter(*date_filters)
+    if status:
+        query = query.filter(Episode.status == status)
+
+    total = query.count()
+    rows = query.order_by(air_date.desc(), Episode.id.desc()).offset(offset).limit(limit).all()
+
+    items = []
+    for row in rows:
+        item = EpisodeOverview.model_validate(row.Episode)
+        item.news_total = row.news_total or 0
+        item.news_counts = {s.value: getattr(row, s.value) or 0 for s in NewsStatus}
+        item.script_chars = row.script_chars or 0
+        item.audio_duration = round(row.audio_duration or 0.0, 2)
+        items.append(item)
+
+    # 日期范围内各状态的节目数（不受 status 筛选和分页影响）
+    status_counts = {s.value: 0 for s in EpisodeStatus}
+    counts = db.query(Episode.status, func.count(Episode.id)).filter(*date_filters).group_by(Episode.status)
+    for episode_status, count in counts:
+        if episode_status is not None:
+            status_counts[episode_status.value] = count
+
+    return EpisodeOverviewPage(
+        total=total, limit=limit, offset=offset, status_counts=status_counts, items=items
+    )
+
+
 @router.post("/", response_model=EpisodeResponse)
 def create_episode(episode: EpisodeCreate, db: Session = Depends(get_db)):
     db_episode = Episode(**episode.model_dump())
@@ -29,6 +211,12 @@ def create_episode(episode: EpisodeCreate, db: Session = Depends(get_db)):
     return db_episode
 
 
+@router.post("/audio-gc")
+def collect_audio_garbage(dry_run: bool = False, db: Session = Depends(get_db)):
+    """清理不再被任何新闻引用的音频文件（以及中断任务留下的临时目录）"""
+    return collect_unreferenced_audio(db, dry_run=dry_run).to_dict()
+
+
 @router.get("/{episode_id}", response_model=EpisodeResponse)
 def get_episode(episode_id: int, db: Session = Depends(get_db)):
     episode = db.query(Episode).filter(Episode.id == episode_id).first()
@@ -187,7 +375,10 @@ def update_script(
     if not episode_news:
         raise HTTPException(status_code=404, detail="News not found in episode")
     
-    episode_news.script = script
+    try:
+        _store_script(episode_news, script)
+    except ScriptFormatError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid script: {e}")
     db.commit()
     db.refresh(episode_news)
     
@@ -196,14 +387,56 @@ def update_script(
     return {"script": episode_news.script, "status": episode_news.status.value}
 
 
+@router.get("/{episode_id}/events")
+async def episode_events(
+    episode_id: int,
+    request: Request,
+    last_event_id: Optional[int] = Header(default=None, alias="Last-Event-ID")
+):
+    """
+    节目生成进度事件流（Server-Sent Events）
+
+    - job.*：逐字稿/音频任务的开始、完成、失败（带 status 和耗时）
+    - llm.*：LLM 请求与响应（耗时、token 用量）
+    - tts.*：逐段合成 submitted / polling / downloaded / failed，以及 merged
+    断线重连时浏览器会带上 Last-Event-ID，从历史中补发错过的事件。
+    """
+    subscription = get_progress_bus().subscribe(episode_id, last_event_id or 0)
+
+    async def stream():
+        with subscription:
+            yield "retry: 3000\n\n"
+            while True:
+                event = await subscription.next(SSE_HEARTBEAT_INTERVAL)
+                if event is not None:
+                    yield format_sse(event)
+                    continue
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/{episode_id}/news/{news_id}/generate-script")
 async def generate_script(
     episode_id: int,
     news_id: int,
+    request: Request,
+    regenerate: bool = False,
+    variants: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
     """
     Generate script for a specific news item in an episode using DeepSeek LLM
+
+    - regenerate=true: skip the LLM response cache and roll a new script
+    - variants=N: generate N variants concurrently and return the best one
+      (defaults to the episode's script_variants setting)
     """
     episode_news = db.query(EpisodeNews).filter(
         EpisodeNews.episode_id == episode_id,
@@ -218,35 +451,57 @@ async def generate_script(
     if not news:
         raise HTTPException(status_code=404, detail="News not found")
     
+    if variants is None:
+        episode = db.query(Episode).filter(Episode.id == episode_id).first()
+        variants = (episode.script_variants if episode else None) or 1
+    variants = max(1, min(variants, len(VARIANT_TEMPERATURES)))
+    
     # Update status to generating
+    previous_status = episode_news.status
     episode_news.status = NewsStatus.GENERATING
     db.commit()
     
+    progress = _news_progress(episode_news)
     try:
-        # Get podcast service
-        podcast_service = get_podcast_service()
+        with _job(progress, "script"):
+            # Get podcast service
+            podcast_service = get_podcast_service()
         
-        # Use custom prompt if available, otherwise use default
-        role_prompt = episode_news.prompt or ""
+            # Use custom prompt if available, otherwise use default
+            role_prompt = episode_news.prompt or ""
         
-        # Generate script using LLM
-        news_content = news.content or news.summary or news.title
-        logger.info(f"Generating script for news {news_id}, content length: {len(news_content)}")
+            # Generate script using LLM
+            news_content = news_material(db, news)
+            logger.info(f"Generating script for news {news_id}, content length: {len(news_content)}")
         
-        script = await podcast_service.generate_script(
-            news_content=news_content,
-            role_prompt=role_prompt
-        )
+            if variants > 1:
+                return await _generate_script_variants(
+                    request, db, episode_news, news_content, role_prompt, variants, regenerate,
+                    progress=progress
+                )
         
-        logger.info(f"Script generated successfully, length: {len(script)}")
+            script = await _cancel_on_disconnect(request, podcast_service.generate_script(
+                news_content=news_content,
+                role_prompt=role_prompt,
+                bypass_cache=regenerate,
+                progress=progress
+            ))
         
-        episode_news.script = script
-        episode_news.status = NewsStatus.SCRIPT_DONE
-        db.commit()
+            logger.info(f"Script generated successfully, length: {len(script)}")
         
-        logger.info(f"Generated script for news {news_id}: {len(script)} chars")
+            _store_script(episode_news, script)
+            episode_news.status = NewsStatus.SCRIPT_DONE
+            db.commit()
+        
+            logger.info(f"Generated script for news {news_id}: {len(script)} chars")
         
-        return {"script": episode_news.script, "status": episode_news.status.value}
+            return {"script": episode_news.script, "status": episode_news.status.value}
+        
+    except ClientDisconnected:
+        logger.info(f"Client disconnected, cancelled script generation for news {news_id}")
+        episode_news.status = previous_status
+        db.commit()
+        raise HTTPException(status_code=499, detail="Client closed request")
         
     except Exception as e:
         logger.error(f"Error generating script: {e}")
@@ -256,6 +511,192 @@ async def generate_script(
         raise HTTPException(status_code=500, detail=f"Error generating script: {str(e)}")
 
 
+# ===== 逐字稿候选 =====
+
+# 候选之间使用不同温度，第一个与单次生成一致
+VARIANT_TEMPERATURES = [0.8, 1.0, 0.6, 1.2, 0.7]
+
+# 持有仍在后台生成的候选任务，避免被垃圾回收
+_background_variants: set = set()
+
+
+async def _generate_variant(
+    episode_news_id: int,
+    batch_id: int,
+    index: int,
+    temperature: float,
+    news_content: str,
+    role_prompt: str,
+    bypass_cache: bool,
+    progress: ProgressCallback = no_progress
+) -> dict:
+    """生成、打分并保存一个候选（独立会话，请求返回后仍可继续写入）"""
+    def variant_progress(event: str, **data):
+        progress(event, variant=index, **data)
+
+    script = await get_podcast_service().generate_script(
+        news_content=news_content,
+        role_prompt=role_prompt,
+        bypass_cache=bypass_cache,
+        temperature=temperature,
+        progress=variant_progress
+    )
+    score = score_script(script)
+    variant_progress("script.variant", score=round(score.total, 4), batch_id=batch_id)
+
+    db = SessionLocal()
+    try:
+        variant = ScriptVariant(
+            episode_news_id=episode_news_id,
+            batch_id=batch_id,
+            variant_index=index,
+            temperature=temperature,
+            script=script,
+            score=score.total,
+            score_detail=score.to_dict(),
+        )
+        db.add(variant)
+        db.commit()
+        logger.info(f"Script variant {index} (t={temperature}) scored {score.total:.3f}")
+        return {"id": variant.id, "score": score.total, "script": script}
+    finally:
+        db.close()
+
+
+async def _pick_best_variant(tasks: list) -> Optional[dict]:
+    """按完成顺序检查候选，达到 ACCEPT_SCORE 立即返回，否则等全部完成取最高分"""
+    best = None
+    for next_done in asyncio.as_completed(tasks):
+        try:
+            variant = await next_done
+        except Exception as e:
+            logger.warning(f"Script variant failed: {e}")
+            continue
+        if best is None or variant["score"] > best["score"]:
+            best = variant
+        if best["score"] >= ACCEPT_SCORE:
+            break
+    return best
+
+
+def _select_variant(db: Session, episode_news: EpisodeNews, variant_id: int) -> ScriptVariant:
+    """标记选中的候选并写入 episode_news.script"""
+    variants = db.query(ScriptVariant).filter(
+        ScriptVariant.episode_news_id == episode_news.id
+    ).all()
+    chosen = None
+    for v in variants:
+        v.selected = v.id == variant_id
+        if v.selected:
+            chosen = v
+    if chosen is None:
+        raise HTTPException(status_code=404, detail="Script variant not found")
+
+    _store_script(episode_news, chosen.script)
+    episode_news.status = NewsStatus.SCRIPT_DONE
+    db.commit()
+    return chosen
+
+
+async def _generate_script_variants(
+    request: Request,
+    db: Session,
+    episode_news: EpisodeNews,
+    news_content: str,
+    role_prompt: str,
+    count: int,
+    bypass_cache: bool,
+    progress: ProgressCallback = no_progress
+) -> dict:
+    """
+    并行生成多个候选，尽早返回最好的一个
+
+    未完成的候选在后台继续生成并保存，之后可以在候选列表中切换。
+    """
+    last_batch = db.query(func.max(ScriptVariant.batch_id)).filter(
+        ScriptVariant.episode_news_id == episode_news.id
+    ).scalar()
+    batch_id = (last_batch or 0) + 1
+
+    tasks = [
+        asyncio.create_task(_generate_variant(
+            episode_news.id, batch_id, i, temperature, news_content, role_prompt, bypass_cache,
+            progress=progress
+        ))
+        for i, temperature in enumerate(VARIANT_TEMPERATURES[:count])
+    ]
+    for task in tasks:
+        _background_variants.add(task)
+        task.add_done_callback(_background_variants.discard)
+
+    try:
+        best = await _cancel_on_disconnect(request, _pick_best_variant(tasks))
+    except ClientDisconnected:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    if best is None:
+        raise RuntimeError("All script variants failed")
+
+    chosen = _select_variant(db, episode_news, best["id"])
+    pending = sum(1 for task in tasks if not task.done())
+
+    return {
+        "script": episode_news.script,
+        "status": episode_news.status.value,
+        "variant_id": chosen.id,
+        "score": chosen.score,
+        "batch_id": batch_id,
+        "pending_variants": pending,
+    }
+
+
+@router.get(
+    "/{episode_id}/news/{news_id}/script-variants",
+    response_model=List[ScriptVariantResponse]
+)
+def list_script_variants(
+    episode_id: int,
+    news_id: int,
+    batch_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """获取逐字稿候选（默认最近一批），按分数从高到低"""
+    episode_news = db.query(EpisodeNews).filter(
+        EpisodeNews.episode_id == episode_id,
+        EpisodeNews.news_id == news_id
+    ).first()
+    if not episode_news:
+        raise HTTPException(status_code=404, detail="News not found in episode")
+
+    query = db.query(ScriptVariant).filter(ScriptVariant.episode_news_id == episode_news.id)
+    if batch_id is None:
+        batch_id = db.query(func.max(ScriptVariant.batch_id)).filter(
+            ScriptVariant.episode_news_id == episode_news.id
+        ).scalar()
+    return query.filter(ScriptVariant.batch_id == batch_id).order_by(ScriptVariant.score.desc()).all()
+
+
+@router.post("/{episode_id}/news/{news_id}/script-variants/{variant_id}/select")
+def select_script_variant(
+    episode_id: int,
+    news_id: int,
+    variant_id: int,
+    db: Session = Depends(get_db)
+):
+    """采用某个候选作为逐字稿"""
+    episode_news = db.query(EpisodeNews).filter(
+        EpisodeNews.episode_id == episode_id,
+        EpisodeNews.news_id == news_id
+    ).first()
+    if not episode_news:
+        raise HTTPException(status_code=404, detail="News not found in episode")
+
+    chosen = _select_variant(db, episode_news, variant_id)
+    return {"script": episode_news.script, "status": episode_news.status.value, "variant_id": chosen.id}
+
+
 @router.post("/{episode_id}/news/{news_id}/generate-audio")
 async def generate_audio(
     episode_id: int,
@@ -281,23 +722,32 @@ async def generate_audio(
     episode_news.status = NewsStatus.GENERATING
     db.commit()
     
+    progress = _news_progress(episode_news)
     try:
-        # Get podcast service
-        podcast_service = get_podcast_service()
+        with _job(progress, "audio"):
+            # Get podcast service
+            podcast_service = get_podcast_service()
         
-        # Generate audio using TTS
-        audio_path = await podcast_service.generate_audio(
-            script=episode_news.script,
-            voice_id=voice_id
-        )
+            # Generate audio using TTS
+            audio_path = await podcast_service.generate_audio(
+                script=episode_news.script,
+                voice_id=voice_id,
+                progress=progress,
+                episode_id=episode_id,
+                episode_news_id=episode_news.id
+            )
         
-        episode_news.status = NewsStatus.AUDIO_DONE
-        episode_news.audio_url = audio_path
-        db.commit()
+            episode_news.status = NewsStatus.AUDIO_DONE
+            _store_audio(episode_news, audio_path)
+            db.commit()
         
-        logger.info(f"Generated audio for news {news_id}: {audio_path}")
+            logger.info(f"Generated audio for news {news_id}: {audio_path}")
         
-        return {"audio_url": episode_news.audio_url, "status": episode_news.status.value}
+            return {
+                "audio_url": episode_news.audio_url,
+                "audio_version": audio_version(audio_path),
+                "status": episode_news.status.value,
+            }
         
     except Exception as e:
         logger.error(f"Error generating audio: {e}")
@@ -307,6 +757,34 @@ async def generate_audio(
         raise HTTPException(status_code=500, detail=f"Error generating audio: {str(e)}")
 
 
+@router.api_route("/{episode_id}/news/{news_id}/audio", methods=["GET", "HEAD"])
+def stream_audio(
+    episode_id: int,
+    news_id: int,
+    request: Request,
+    v: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    播放已生成的音频（支持 Range 拖动进度）
+
+    只返回数据库中登记过的文件，不接受任意路径。带 ?v=<audio_version> 的地址
+    内容不变，按 immutable 长缓存；不带版本的地址每次用 ETag 重新验证。
+    """
+    episode_news = db.query(EpisodeNews).filter(
+        EpisodeNews.episode_id == episode_id,
+        EpisodeNews.news_id == news_id
+    ).first()
+
+    if not episode_news or not episode_news.audio_url:
+        raise HTTPException(status_code=404, detail="Audio not generated yet")
+
+    try:
+        return audio_response(episode_news.audio_url, request.headers, version=v, method=request.method)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Audio file missing")
+
+
 @router.post("/{episode_id}/generate-all")
 async def generate_all(
     episode_id: int,
@@ -334,24 +812,30 @@ async def generate_all(
             if not news:
                 continue
             
+            progress = _news_progress(en)
+            
             # Generate script
             en.status = NewsStatus.GENERATING
             db.commit()
             
-            news_content = news.content or news.summary or news.title
-            script = await podcast_service.generate_script(news_content=news_content)
-            en.script = script
-            en.status = NewsStatus.SCRIPT_DONE
-            db.commit()
+            with _job(progress, "script"):
+                news_content = news_material(db, news)
+                script = await podcast_service.generate_script(news_content=news_content, progress=progress)
+                _store_script(en, script)
+                en.status = NewsStatus.SCRIPT_DONE
+                db.commit()
             
             # Generate audio
             en.status = NewsStatus.GENERATING
             db.commit()
             
-            audio_path = await podcast_service.generate_audio(script=script)
-            en.status = NewsStatus.AUDIO_DONE
-            en.audio_url = audio_path
-            db.commit()
+            with _job(progress, "audio"):
+                audio_path = await podcast_service.generate_audio(
+                    script=script, progress=progress, episode_id=episode_id, episode_news_id=en.id
+                )
+                en.status = NewsStatus.AUDIO_DONE
+                _store_audio(en, audio_path)
+                db.commit()
             
             results.append({"news_id": en.news_id, "status": en.status.value})
             
@@ -404,36 +888,32 @@ async def batch_generate(
             if not news:
                 continue
             
-            # 生成脚本
-            if request.action in ("script", "all"):
+            progress = _news_progress(en)
+            
+            # 生成脚本（音频模式下没有脚本时也先生成脚本）
+            if request.action in ("script", "all") or not en.script:
                 en.status = NewsStatus.GENERATING
                 db.commit()
                 
-                news_content = news.content or news.summary or news.title
-                script = await podcast_service.generate_script(news_content=news_content)
-                en.script = script
-                en.status = NewsStatus.SCRIPT_DONE
-                db.commit()
+                with _job(progress, "script"):
+                    news_content = news_material(db, news)
+                    script = await podcast_service.generate_script(news_content=news_content, progress=progress)
+                    _store_script(en, script)
+                    en.status = NewsStatus.SCRIPT_DONE
+                    db.commit()
             
             # 生成音频
             if request.action in ("audio", "all"):
-                # 如果没有脚本，先生成脚本
-                if not en.script:
-                    en.status = NewsStatus.GENERATING
-                    db.commit()
-                    news_content = news.content or news.summary or news.title
-                    script = await podcast_service.generate_script(news_content=news_content)
-                    en.script = script
-                    en.status = NewsStatus.SCRIPT_DONE
-                    db.commit()
-                
                 en.status = NewsStatus.GENERATING
                 db.commit()
                 
-                audio_path = await podcast_service.generate_audio(script=en.script)
-                en.audio_url = audio_path
-                en.status = NewsStatus.AUDIO_DONE
-                db.commit()
+                with _job(progress, "audio"):
+                    audio_path = await podcast_service.generate_audio(
+                        script=en.script, progress=progress, episode_id=episode_id, episode_news_id=en.id
+                    )
+                    _store_audio(en, audio_path)
+                    en.status = NewsStatus.AUDIO_DONE
+                    db.commit()
             
             results.append({
                 "episode_news_id": en.id,
@@ -4,6 +4,7 @@ from app.db.session import get_db
 from app.db.models import News, RSSSource
 from app.schemas.news import NewsResponse
 from app.services.news_scorer import NewsScorer
+from app.services.news_ingest import ingest_items
 from typing import List
 import asyncio
 import logging
@@ -125,36 +126,7 @@ async def fetch_news(source_id: int | None = None, db: Session = Depends(get_db)
             try:
                 # 抓取新闻
                 items = await rss_service.fetch(source.url, limit=20)
-                
-                for item in items:
-                    # 检查是否已存在（通过 URL）
-                    item_url = item.url if hasattr(item, 'url') else item.get('url', '')
-                    existing = db.query(News).filter(News.url == item_url).first()
-                    if existing:
-                        continue
-                    
-                    # 创建新闻记录
-                    news = News(
-                        title=item.title if hasattr(item, 'title') else item.get('title', ''),
-                        source=source.name,
-                        url=item_url,
-                        summary=item.summary if hasattr(item, 'summary') else item.get('summary', ''),
-                        keywords=[],
-                        content=item.summary if hasattr(item, 'summary') else item.get('summary', ''),
-                        rss_source_id=source.id
-                    )
-                    
-                    # 计算评分
-                    scores = scorer.score_news(news)
-                    news.score = scores["score"]
-                    news.score_authority = scores["score_authority"]
-                    news.score_timeliness = scores["score_timeliness"]
-                    news.score_depth = scores["score_depth"]
-                    news.score_updated_at = scores["score_updated_at"]
-                    
-                    db.add(news)
-                    new_news_count += 1
-                
+                new_news_count += len(ingest_items(db, source, items, scorer))
                 db.commit()
                 logger.info(f"从 {source.name} 抓取了 {len(items)} 条新闻")
                 
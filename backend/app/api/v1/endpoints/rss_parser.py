@@ -1,5 +1,4 @@
 from fastapi import APIRouter, HTTPException
-import httpx
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,6 +9,8 @@ router = APIRouter()
 @router.get("/parse-rss")
 async def parse_rss_title(url: str):
     """从 RSS URL 解析标题"""
+    import httpx
+
     try:
         async with httpx.AsyncClient(timeout=10.0) as client:
             response = await client.get(url)
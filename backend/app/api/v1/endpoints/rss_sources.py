@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.db.models import RSSSource
 from app.schemas.rss_source import RSSSourceCreate, RSSSourceUpdate, RSSSourceResponse
+from app.services.auto_scheduler import get_auto_scheduler
+from dataclasses import asdict
 from typing import List
 
 router = APIRouter()
@@ -22,6 +24,13 @@ def create_source(source: RSSSourceCreate, db: Session = Depends(get_db)):
     return db_source
 
 
+@router.post("/auto-run")
+async def run_auto_mode():
+    """立即执行一轮自动模式：抓取到期的源并为当天的热门新闻预生成逐字稿"""
+    result = await get_auto_scheduler().run_once()
+    return asdict(result)
+
+
 @router.get("/{source_id}", response_model=RSSSourceResponse)
 def get_source(source_id: int, db: Session = Depends(get_db)):
     source = db.query(RSSSource).filter(RSSSource.id == source_id).first()
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from app.core.config import settings
-import httpx
 import logging
 import os
 from pathlib import Path
@@ -15,6 +14,7 @@ ENV_FILE = Path(__file__).parent.parent.parent / ".env"
 
 # 提示词配置的 key
 SCRIPT_PROMPT_KEY = "SCRIPT_PROMPT"
+SCRIPT_PROMPT_OVERRIDE_KEY = "script_prompt"
 
 
 class ScriptPromptResponse(BaseModel):
@@ -26,30 +26,16 @@ class ScriptPromptUpdate(BaseModel):
 
 
 @router.get("/status")
-async def get_api_status():
-    """获取 API 配置状态"""
+async def get_api_status(refresh: bool = False):
+    """获取 API 配置状态（refresh=true 跳过探测缓存）"""
     status = {}
     
-    # Test DeepSeek - call API to verify connection
-    if settings.DEEPSEEK_API_KEY:
-        try:
-            from openai import OpenAI
-            client = OpenAI(
-                api_key=settings.DEEPSEEK_API_KEY,
-                base_url="https://api.deepseek.com"
-            )
-            # 发送简单提示词测试连接
-            response = client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[{"role": "user", "content": "Hi"}],
-                max_tokens=10
-            )
-            if response.choices and len(response.choices) > 0:
-                status["deepseek"] = {"connected": True, "status": "ok"}
-            else:
-                status["deepseek"] = {"connected": False, "status": "empty_response"}
-        except Exception as e:
-            status["deepseek"] = {"connected": False, "status": str(e)}
+    # DeepSeek - cheap cached probe on the shared client (no completion)
+    from app.services.podcast import get_podcast_service
+
+    llm = get_podcast_service().llm
+    if llm is not None:
+        status["deepseek"] = await llm.probe(force=refresh)
     else:
         status["deepseek"] = {"connected": False, "status": "not_configured"}
     
@@ -78,6 +64,29 @@ async def get_api_status():
     return status
 
 
+@router.get("/llm-cache")
+async def get_llm_cache_stats():
+    """获取 LLM 缓存命中率统计"""
+    from app.services.podcast import get_podcast_service
+
+    cache = get_podcast_service().llm_cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.delete("/llm-cache")
+async def clear_llm_cache():
+    """清空 LLM 缓存"""
+    from app.services.podcast import get_podcast_service
+
+    cache = get_podcast_service().llm_cache
+    if cache is None:
+        raise HTTPException(status_code=400, detail="LLM 缓存未启用")
+    cache.clear()
+    return {"message": "LLM 缓存已清空"}
+
+
 @router.get("/env-keys")
 async def get_env_keys():
     """获取当前环境变量（已配置的 key）"""
@@ -134,6 +143,11 @@ async def update_env(key: str, value: str):
         
         # 更新当前进程的环境变量
         os.environ[key] = value
+
+        # 让共享的 LLM 客户端使用新 key
+        if key == "DEEPSEEK_API_KEY":
+            from app.services.podcast import get_podcast_service
+            get_podcast_service().configure_llm(value)
         
         logger.info(f"Updated {key} in .env file")
         
@@ -147,9 +161,12 @@ async def update_env(key: str, value: str):
 @router.get("/script-prompt")
 async def get_script_prompt():
     """获取提示词配置"""
-    prompt = ""
-    
-    if ENV_FILE.exists():
+    from app.services.llm import get_prompt_registry
+
+    prompt = get_prompt_registry().get(SCRIPT_PROMPT_OVERRIDE_KEY)
+
+    # 兼容旧版本写在 .env 中的配置
+    if not prompt and ENV_FILE.exists():
         with open(ENV_FILE, "r") as f:
             for line in f:
                 line = line.strip()
@@ -164,35 +181,26 @@ async def get_script_prompt():
 
 @router.put("/script-prompt")
 async def update_script_prompt(data: ScriptPromptUpdate):
-    """更新提示词配置"""
+    """更新提示词配置（写入提示词覆盖文件，无需重启即可生效）"""
+    from app.services.llm import get_prompt_registry
+    from app.services.prompt_registry import PromptError
+
     try:
-        # 读取现有 .env 文件
-        env_lines = []
-        if ENV_FILE.exists():
-            with open(ENV_FILE, "r") as f:
-                env_lines = f.readlines()
-        
-        # 查找并更新或添加
-        key_found = False
-        new_lines = []
-        for line in env_lines:
-            if line.strip().startswith(f"{SCRIPT_PROMPT_KEY}="):
-                new_lines.append(f"{SCRIPT_PROMPT_KEY}={data.script_prompt}\n")
-                key_found = True
-            else:
-                new_lines.append(line)
-        
-        if not key_found:
-            new_lines.append(f"{SCRIPT_PROMPT_KEY}={data.script_prompt}\n")
-        
-        # 写回文件
-        with open(ENV_FILE, "w") as f:
-            f.writelines(new_lines)
-        
-        logger.info(f"Updated {SCRIPT_PROMPT_KEY} in .env file")
-        
+        get_prompt_registry().set_override(SCRIPT_PROMPT_OVERRIDE_KEY, data.script_prompt)
+        logger.info(f"Updated {SCRIPT_PROMPT_OVERRIDE_KEY} prompt override")
         return {"message": "提示词已保存", "script_prompt": data.script_prompt}
-        
+
+    except PromptError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to update script prompt: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/prompts")
+async def get_prompt_versions():
+    """当前生效的提示词版本（内容哈希）"""
+    from app.services.llm import get_prompt_registry
+
+    registry = get_prompt_registry()
+    return {"generation": registry.generation, "versions": registry.versions()}
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.db.models import VoiceHost
+from app.schemas.voice_host import VoiceHostCreate, VoiceHostUpdate, VoiceHostResponse
+from app.services.voice_hosts import find_label_conflicts, reload_voice_roster
+from typing import List
+
+router = APIRouter()
+
+
+def _check_labels(db: Session, name: str, aliases: List[str], exclude_id: int = None):
+    conflicts = find_label_conflicts(db, [name, *aliases], exclude_id=exclude_id)
+    if conflicts:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Labels already used by another host: {', '.join(conflicts)}"
+        )
+
+
+@router.get("/", response_model=List[VoiceHostResponse])
+def list_hosts(db: Session = Depends(get_db)):
+    return db.query(VoiceHost).order_by(VoiceHost.id).all()
+
+
+@router.post("/", response_model=VoiceHostResponse)
+def create_host(host: VoiceHostCreate, db: Session = Depends(get_db)):
+    if db.query(VoiceHost).filter(VoiceHost.key == host.key).first():
+        raise HTTPException(status_code=400, detail=f"Host key already exists: {host.key}")
+    _check_labels(db, host.name, host.aliases)
+
+    db_host = VoiceHost(**host.model_dump())
+    db.add(db_host)
+    db.commit()
+    db.refresh(db_host)
+    reload_voice_roster(db, publish=True)
+    return db_host
+
+
+@router.put("/{host_id}", response_model=VoiceHostResponse)
+def update_host(host_id: int, host: VoiceHostUpdate, db: Session = Depends(get_db)):
+    db_host = db.query(VoiceHost).filter(VoiceHost.id == host_id).first()
+    if not db_host:
+        raise HTTPException(status_code=404, detail="Host not found")
+
+    updates = host.model_dump(exclude_unset=True)
+    _check_labels(
+        db,
+        updates.get("name", db_host.name),
+        updates.get("aliases", db_host.aliases or []),
+        exclude_id=host_id
+    )
+    for key, value in updates.items():
+        setattr(db_host, key, value)
+    db.commit()
+    db.refresh(db_host)
+    reload_voice_roster(db, publish=True)
+    return db_host
+
+
+@router.delete("/{host_id}")
+def delete_host(host_id: int, db: Session = Depends(get_db)):
+    db_host = db.query(VoiceHost).filter(VoiceHost.id == host_id).first()
+    if not db_host:
+        raise HTTPException(status_code=404, detail="Host not found")
+    db.delete(db_host)
+    db.commit()
+    reload_voice_roster(db, publish=True)
+    return {"ok": True}
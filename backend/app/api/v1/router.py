@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import rss_sources, news, episodes, rss_parser, settings
+from app.api.v1.endpoints import rss_sources, news, episodes, rss_parser, settings, voices
 
 api_router = APIRouter()
 api_router.include_router(rss_sources.router, prefix="/sources", tags=["sources"])
@@ -7,3 +7,4 @@ api_router.include_router(news.router, prefix="/news", tags=["news"])
 api_router.include_router(episodes.router, prefix="/episodes", tags=["episodes"])
 api_router.include_router(rss_parser.router, prefix="/rss", tags=["rss"])
 api_router.include_router(settings.router, prefix="/settings", tags=["settings"])
+api_router.include_router(voices.router, prefix="/voices", tags=["voices"])
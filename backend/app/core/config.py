@@ -1,6 +1,21 @@
+from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
+from pathlib import Path
 import os
 
+# The single place .env is read. Settings gets its values from the file
+# directly. load_dotenv also exports them to os.environ for the services
+# shared with mvp/, which read os.getenv (TTS keys, voices, rate limits).
+# The file is looked up next to this package (backend/, then the repo
+# root), not in the working directory, so scripts and workers started
+# elsewhere see the same config
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+ENV_FILE = next(
+    (str(d / ".env") for d in (BACKEND_DIR, BACKEND_DIR.parent) if (d / ".env").is_file()), None
+)
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./podcast_studio.db"
@@ -9,12 +24,46 @@ class Settings(BaseSettings):
     # DeepSeek LLM
     DEEPSEEK_API_KEY: str = ""
     DEEPSEEK_MODEL: str = "deepseek-chat"
+
+    # LLM response cache (opt-in)
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_PATH: str = "./llm_cache.db"
+    LLM_CACHE_TTL: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 1000
+
+    # Shared async LLM HTTP client
+    LLM_TIMEOUT: float = 120.0
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE: int = 10
+    LLM_HTTP2: bool = True  # needs the optional `h2` package
+
+    # News material token budget per script request
+    NEWS_TOKEN_BUDGET: int = 1500
+    DEEPSEEK_TOKENIZER_PATH: str = ""  # tokenizer.json; estimated when empty
     
+    # Script format
+    SCRIPT_JSON_MODE: bool = True  # ask the LLM for {"turns": [...]} JSON
+    SCRIPT_SPEAKER_ALIASES: str = ""  # extra host labels, e.g. "主持人=luoyonghao,嘉宾=wangziru"
+
     # MiniMax TTS
     MINIMAX_API_KEY: str = ""
 
+    # Generated audio: {dir}/{episode_id}/{episode_news_id}/{hash}.mp3
+    AUDIO_STORAGE_DIR: str = "./storage/audio"
+    AUDIO_GC_ON_STARTUP: bool = True
+
+    # Auto-mode scheduler: polls auto_mode sources and pre-generates scripts
+    AUTO_SCHEDULER_ENABLED: bool = False  # run in-process; or `python -m app.worker`
+    AUTO_TICK_SECONDS: int = 60
+    AUTO_DEFAULT_INTERVAL: int = 3600
+    AUTO_MIN_INTERVAL: int = 15 * 60
+    AUTO_MAX_INTERVAL: int = 24 * 3600
+    AUTO_BACKOFF_FACTOR: float = 1.5
+    AUTO_TOP_ITEMS: int = 5  # pre-generated stories per day
+    AUTO_MIN_SCORE: float = 60.0
+
     class Config:
-        env_file = ".env"
+        env_file = ENV_FILE
 
 
 settings = Settings()
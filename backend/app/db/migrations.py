@@ -0,0 +1,66 @@
+"""Lightweight schema upgrades
+
+`Base.metadata.create_all` creates missing tables but never alters existing
+ones. `upgrade_schema` adds columns and indexes that exist on the models but
+not yet in the database, so new nullable/defaulted columns and new indexes
+reach existing databases without a migration tool.
+"""
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.db.base import Base
+
+logger = logging.getLogger(__name__)
+
+
+def _column_ddl(column, dialect) -> str:
+    ddl = f'"{column.name}" {column.type.compile(dialect=dialect)}'
+    default = column.default
+    if default is not None and default.is_scalar:
+        value = default.arg
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, (int, float)):
+            ddl += f" DEFAULT {value}"
+        elif isinstance(value, str):
+            escaped = value.replace("'", "''")
+            ddl += f" DEFAULT '{escaped}'"
+    return ddl
+
+
+def upgrade_schema(engine: Engine) -> list:
+    """
+    Add model columns and indexes missing from existing tables
+
+    Returns:
+        ["table.column", "table.index", ...] that were added
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or column.primary_key:
+                    continue
+                conn.execute(text(
+                    f'ALTER TABLE "{table.name}" ADD COLUMN {_column_ddl(column, engine.dialect)}'
+                ))
+                added.append(f"{table.name}.{column.name}")
+
+            existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing_indexes:
+                    continue
+                index.create(conn)
+                added.append(f"{table.name}.{index.name}")
+
+    for name in added:
+        logger.info(f"Added {name}")
+    return added
@@ -2,5 +2,8 @@ from app.db.models.rss_source import RSSSource
 from app.db.models.news import News
 from app.db.models.episode import Episode, EpisodeStatus
 from app.db.models.episode_news import EpisodeNews, NewsStatus
+from app.db.models.news_digest import NewsDigest
+from app.db.models.script_variant import ScriptVariant
+from app.db.models.voice_host import VoiceHost
 
-__all__ = ["RSSSource", "News", "Episode", "EpisodeNews", "EpisodeStatus", "NewsStatus"]
+__all__ = ["RSSSource", "News", "Episode", "EpisodeNews", "EpisodeStatus", "NewsStatus", "NewsDigest", "ScriptVariant", "VoiceHost"]
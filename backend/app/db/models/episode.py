@@ -21,6 +21,7 @@ class Episode(Base):
     outro_template = Column(Text, default="")
     script_prompt = Column(Text, default="")
     scheduled_date = Column(DateTime, nullable=True)  # 预计播出日期，与日历绑定
+    script_variants = Column(Integer, default=1)  # 每次生成逐字稿时并行生成的候选数
     created_at = Column(DateTime, default=datetime.utcnow)
     published_at = Column(DateTime, nullable=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
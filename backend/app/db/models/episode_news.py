@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, ForeignKey, JSON, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 from datetime import datetime
@@ -17,13 +17,15 @@ class EpisodeNews(Base):
     __tablename__ = "episode_news"
 
     id = Column(Integer, primary_key=True, index=True)
-    episode_id = Column(Integer, ForeignKey("episodes.id"))
+    episode_id = Column(Integer, ForeignKey("episodes.id"), index=True)
     news_id = Column(Integer, ForeignKey("news.id"))
     order = Column(Integer, default=0)
     status = Column(SQLEnum(NewsStatus), default=NewsStatus.PENDING)
     prompt = Column(Text, default="")
     script = Column(Text, default="")
+    script_json = Column(JSON, nullable=True)  # 结构化台词 [{"speaker", "text"}]，与 script 同步
     audio_url = Column(String, default="")
+    audio_duration = Column(Float, nullable=True)  # 音频时长（秒），生成音频时写入
     error_message = Column(Text, nullable=True)
     
     # 软删除字段
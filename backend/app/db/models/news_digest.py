@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from app.db.base import Base
+from datetime import datetime
+
+
+class NewsDigest(Base):
+    """新闻素材在 token 预算内的精简版本（按 News.id 缓存）"""
+    __tablename__ = "news_digests"
+
+    news_id = Column(Integer, ForeignKey("news.id"), primary_key=True)
+    content_hash = Column(String, nullable=False)  # 原文哈希，原文变化后失效
+    budget = Column(Integer, nullable=False)       # 生成时使用的 token 预算
+    text = Column(Text, nullable=False)
+    tokens = Column(Integer, default=0)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -15,6 +15,11 @@ class RSSSource(Base):
     
     # 来源权威性评分 (0-100)
     authority_score = Column(Float, default=50.0)
+
+    # 自动模式抓取调度（按源的更新频率自适应）
+    fetch_interval = Column(Integer, nullable=True)    # 当前抓取间隔（秒），为空时使用默认值
+    last_fetched_at = Column(DateTime, nullable=True)
+    next_fetch_at = Column(DateTime, nullable=True)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Float, Text, JSON, Boolean, DateTime, ForeignKey
+from app.db.base import Base
+from datetime import datetime
+
+
+class ScriptVariant(Base):
+    """并行生成的逐字稿候选"""
+    __tablename__ = "script_variants"
+
+    id = Column(Integer, primary_key=True, index=True)
+    episode_news_id = Column(Integer, ForeignKey("episode_news.id"), index=True)
+    batch_id = Column(Integer, default=0)       # 同一次生成请求的候选共享 batch_id
+    variant_index = Column(Integer, default=0)
+    temperature = Column(Float)
+    script = Column(Text, default="")
+    score = Column(Float, default=0.0)
+    score_detail = Column(JSON, default=dict)
+    selected = Column(Boolean, default=False)   # 当前采用的候选
+
+    created_at = Column(DateTime, default=datetime.utcnow)
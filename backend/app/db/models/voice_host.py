@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON
+from app.db.base import Base
+from datetime import datetime
+
+
+class VoiceHost(Base):
+    """主播及其在各 TTS 提供方的音色"""
+    __tablename__ = "voice_hosts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, unique=True, nullable=False)   # 说话人键，如 luoyonghao
+    name = Column(String, nullable=False)               # 逐字稿主标签，如 彪悍罗
+    aliases = Column(JSON, default=list)                # 其他标签，如 ["罗永浩"]
+    voices = Column(JSON, default=dict)                 # {"minimax": {"voice_id": ..., "speed": 1.0}}
+    enabled = Column(Boolean, default=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
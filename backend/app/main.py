@@ -1,18 +1,41 @@
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.db.session import engine, Base
+from app.db.session import engine, Base, SessionLocal
+from app.db.migrations import upgrade_schema
 from app.db import models  # noqa: F401
 from app.api.v1.router import api_router
+from app.services.audio_storage import collect_unreferenced_audio
+from app.services.auto_scheduler import get_auto_scheduler
+from app.services.podcast import get_podcast_service
+from app.services.progress import get_progress_bus
+from app.services.voice_hosts import reload_voice_roster, roster_check_due, seed_voice_hosts, sync_voice_roster
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    with SessionLocal() as db:
+        seed_voice_hosts(db)
+        reload_voice_roster(db)
+        if settings.AUDIO_GC_ON_STARTUP:
+            collect_unreferenced_audio(db)
+    podcast_service = get_podcast_service()
+    await podcast_service.startup()
+    # Mirrors other workers' progress events when SHARED_STATE_URL is set
+    progress_bus = get_progress_bus()
+    progress_bus.start()
+    if settings.AUTO_SCHEDULER_ENABLED:
+        get_auto_scheduler().start()
     yield
     # Shutdown
+    await get_auto_scheduler().stop()
+    await podcast_service.shutdown()
+    progress_bus.stop()
 
 
 app = FastAPI(title="Podcast Studio API", lifespan=lifespan)
@@ -26,7 +49,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(api_router, prefix=settings.API_V1_PREFIX)
+
+async def sync_shared_roster():
+    # Host edits made through another worker (SHARED_STATE_URL); the check
+    # itself is rate limited, so most requests skip the thread hop
+    if roster_check_due():
+        await asyncio.to_thread(sync_voice_roster)
+
+
+app.include_router(api_router, prefix=settings.API_V1_PREFIX, dependencies=[Depends(sync_shared_roster)])
 
 
 @app.get("/health")
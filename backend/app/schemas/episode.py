@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from enum import Enum
 
@@ -15,6 +15,7 @@ class EpisodeBase(BaseModel):
     outro_template: str = ""
     script_prompt: str = ""  # 生成逐字稿的自定义提示词
     scheduled_date: datetime | None = None  # 预计播出日期
+    script_variants: int = Field(default=1, ge=1, le=5)  # 并行生成的逐字稿候选数
 
 
 class EpisodeCreate(EpisodeBase):
@@ -28,6 +29,7 @@ class EpisodeUpdate(BaseModel):
     outro_template: str | None = None
     script_prompt: str | None = None  # 生成逐字稿的自定义提示词
     scheduled_date: datetime | None = None  # 预计播出日期
+    script_variants: int | None = Field(default=None, ge=1, le=5)
 
 
 class EpisodeResponse(EpisodeBase):
@@ -38,3 +40,20 @@ class EpisodeResponse(EpisodeBase):
 
     class Config:
         from_attributes = True
+
+
+class EpisodeOverview(EpisodeResponse):
+    """节目及其新闻进度汇总"""
+    news_total: int = 0
+    news_counts: dict[str, int] = {}  # 各 NewsStatus 的新闻数
+    script_chars: int = 0  # 逐字稿总字数
+    audio_duration: float = 0.0  # 音频总时长（秒）
+
+
+class EpisodeOverviewPage(BaseModel):
+    """节目列表分页"""
+    total: int
+    limit: int
+    offset: int
+    status_counts: dict[str, int]  # 日期范围内各 EpisodeStatus 的节目数（不受 status 筛选和分页影响）
+    items: list[EpisodeOverview]
@@ -38,6 +38,22 @@ class EpisodeNewsUpdate(BaseModel):
     audio_url: str | None = None
 
 
+class ScriptVariantResponse(BaseModel):
+    """逐字稿候选"""
+    id: int
+    batch_id: int
+    variant_index: int
+    temperature: float | None = None
+    script: str
+    score: float
+    score_detail: dict | None = None
+    selected: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class EpisodeNewsResponse(EpisodeNewsBase):
     id: int
     episode_id: int
@@ -45,7 +61,9 @@ class EpisodeNewsResponse(EpisodeNewsBase):
     order: int
     status: NewsStatus
     script: str
+    script_json: list[dict] | None = None
     audio_url: str
+    audio_duration: float | None = None
     error_message: str | None
     updated_at: datetime
     news: NewsSummary | None = None
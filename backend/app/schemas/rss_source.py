@@ -22,6 +22,9 @@ class RSSSourceUpdate(BaseModel):
 
 class RSSSourceResponse(RSSSourceBase):
     id: int
+    fetch_interval: int | None = None
+    last_fetched_at: datetime | None = None
+    next_fetch_at: datetime | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+
+class VoiceHostBase(BaseModel):
+    key: str = Field(min_length=1)
+    name: str = Field(min_length=1)
+    aliases: list[str] = []
+    voices: dict[str, dict] = {}
+    enabled: bool = True
+
+
+class VoiceHostCreate(VoiceHostBase):
+    pass
+
+
+class VoiceHostUpdate(BaseModel):
+    name: str | None = None
+    aliases: list[str] | None = None
+    voices: dict[str, dict] | None = None
+    enabled: bool | None = None
+
+
+class VoiceHostResponse(VoiceHostBase):
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,219 @@
+"""HTTP serving of generated audio files
+
+Generated episodes can be an hour long, so the player must be able to seek
+without downloading the whole file:
+
+- Single byte ranges (`Range: bytes=start-end`, `bytes=start-`, `bytes=-n`)
+  are answered with 206; If-Range falls back to a full 200 when the file
+  changed underneath the client
+- Strong ETags are the SHA-256 of the content, memoized per
+  (path, size, mtime) so a file is hashed once, not on every seek
+- URLs carrying the content version (`?v=<etag>`) are immutable and cached
+  for a year; unversioned URLs must revalidate (If-None-Match -> 304)
+- The body is sent with the ASGI zero-copy extension (sendfile) when the
+  server offers it, otherwise streamed in chunks from a worker thread
+"""
+import hashlib
+import os
+import re
+import stat
+import threading
+from email.utils import formatdate
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+_etag_lock = threading.Lock()
+_etag_cache: Dict[str, Tuple[int, int, str]] = {}
+
+
+class RangeNotSatisfiable(Exception):
+    """The requested range lies outside the file"""
+    pass
+
+
+def file_etag(path: str) -> str:
+    """Strong ETag (quoted) for a file's content"""
+    st = os.stat(path)
+    with _etag_lock:
+        cached = _etag_cache.get(path)
+    if cached and cached[:2] == (st.st_size, st.st_mtime_ns):
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    etag = f'"{digest.hexdigest()[:32]}"'
+
+    with _etag_lock:
+        _etag_cache[path] = (st.st_size, st.st_mtime_ns, etag)
+    return etag
+
+
+def audio_version(path: str) -> Optional[str]:
+    """Content version for cache-busting URLs (ETag without quotes)"""
+    if not path or not os.path.isfile(path):
+        return None
+    return file_etag(path).strip('"')
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a Range header into an inclusive (start, end)
+
+    Returns None when the header should be ignored (malformed, multiple
+    ranges or another unit), in which case the full file is sent.
+    Raises RangeNotSatisfiable when the range starts past the end or
+    selects no bytes (including any range on an empty file).
+    """
+    match = _RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: the last n bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            # An empty file has no last bytes to send
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+class AudioFileResponse(Response):
+    """Serve (part of) a file, preferring zero-copy sendfile"""
+
+    media_type = "audio/mpeg"
+
+    def __init__(
+        self,
+        path: str,
+        status_code: int = 200,
+        headers: Optional[dict] = None,
+        byte_range: Optional[Tuple[int, int]] = None,
+        size: int = 0,
+        send_body: bool = True,
+    ):
+        self.path = path
+        self.status_code = status_code
+        self.background = None
+        self.offset, last = byte_range if byte_range else (0, size - 1)
+        self.count = last - self.offset + 1 if size else 0
+        self.send_body = send_body and status_code in (200, 206)
+        self.init_headers(headers)
+        if status_code in (200, 206):
+            # HEAD reports the length it would have sent
+            self.headers["content-length"] = str(self.count)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if not self.send_body or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        zero_copy = "http.response.zerocopysend" in scope.get("extensions", {})
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            if zero_copy:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f.wrapped,
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False,
+                })
+                return
+
+            await f.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0,
+                })
+            if remaining > 0:
+                # File shrank mid-response; close the body cleanly
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def audio_response(
+    path: str,
+    request_headers: Headers,
+    version: Optional[str] = None,
+    method: str = "GET",
+) -> Response:
+    """
+    Build the response for an audio file request
+
+    Args:
+        path: File on disk (must exist)
+        request_headers: Incoming headers (Range, If-Range, If-None-Match)
+        version: `v` query parameter; immutable caching when it matches
+        method: HEAD sends headers only
+    """
+    st = os.stat(path)
+    if not stat.S_ISREG(st.st_mode):
+        raise FileNotFoundError(path)
+    size = st.st_size
+    etag = file_etag(path)
+
+    headers = {
+        "etag": etag,
+        "accept-ranges": "bytes",
+        "last-modified": formatdate(st.st_mtime, usegmt=True),
+        "cache-control": IMMUTABLE_CACHE if version and f'"{version}"' == etag else REVALIDATE_CACHE,
+    }
+
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return AudioFileResponse(path, status_code=304, headers=headers, send_body=False)
+
+    byte_range = None
+    range_header = request_headers.get("range")
+    if_range = request_headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            headers["content-range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+    send_body = method != "HEAD"
+    if byte_range:
+        start, end = byte_range
+        headers["content-range"] = f"bytes {start}-{end}/{size}"
+        return AudioFileResponse(path, 206, headers, byte_range, size, send_body)
+    return AudioFileResponse(path, 200, headers, None, size, send_body)
@@ -0,0 +1,222 @@
+"""Isolated on-disk layout for generated audio
+
+    {root}/{episode_id}/{episode_news_id}/{content_hash}.mp3
+
+Every generation runs in its own scratch directory under the news item's
+directory (`.work-*`, holding the TTS segments and the merged file). The
+result is renamed into place under its content hash. Concurrent jobs never
+share a path, and a reader never sees a half-written file. Regenerating
+leaves the previous file in place until the database points at the new one.
+`collect_garbage` then removes files that no row references any more.
+
+A live scratch directory holds a heartbeat file that is touched every
+HEARTBEAT_SECONDS while the job runs. Garbage collection (which may run in
+several API workers at once) only removes scratch directories whose
+heartbeat has gone quiet, i.e. whose job crashed or was killed.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Union
+
+from app.core.config import settings
+from app.db.models import EpisodeNews
+
+logger = logging.getLogger(__name__)
+
+WORK_PREFIX = ".work-"
+HEARTBEAT_FILE = ".heartbeat"
+# How often a live scratch directory's heartbeat is refreshed
+HEARTBEAT_SECONDS = 60
+AUDIO_SUFFIX = ".mp3"
+HASH_CHARS = 16
+# Files younger than this are never collected: a job may have committed
+# its file but not yet written the row that references it
+GC_GRACE_SECONDS = 3600
+
+Key = Optional[Union[int, str]]
+
+
+@dataclass
+class GCResult:
+    removed: List[str] = field(default_factory=list)
+    freed_bytes: int = 0
+    kept: int = 0
+
+    def to_dict(self) -> dict:
+        return {"removed": len(self.removed), "freed_bytes": self.freed_bytes, "kept": self.kept}
+
+
+def _content_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_CHARS]
+
+
+def _keep_alive(path: str, stop: threading.Event, interval: float):
+    while not stop.wait(interval):
+        try:
+            os.utime(path)
+        except OSError:
+            return
+
+
+def _last_active(work_dir: str) -> float:
+    """Latest of the scratch directory's own mtime and its heartbeat"""
+    mtime = os.path.getmtime(work_dir)
+    try:
+        return max(mtime, os.path.getmtime(os.path.join(work_dir, HEARTBEAT_FILE)))
+    except OSError:
+        return mtime
+
+
+class AudioStorage:
+    """Content-addressed audio files grouped by episode and news item"""
+
+    def __init__(self, root: Optional[str] = None, heartbeat_seconds: float = HEARTBEAT_SECONDS):
+        self.root = os.path.abspath(root or settings.AUDIO_STORAGE_DIR)
+        self.heartbeat_seconds = heartbeat_seconds
+
+    def item_dir(self, episode_id: Key, episode_news_id: Key) -> str:
+        return os.path.join(
+            self.root,
+            str(episode_id if episode_id is not None else "unassigned"),
+            str(episode_news_id if episode_news_id is not None else "unassigned"),
+        )
+
+    @contextmanager
+    def workspace(self, episode_id: Key, episode_news_id: Key) -> Iterator[str]:
+        """Private scratch directory for one generation, kept alive while in use and removed afterwards"""
+        parent = self.item_dir(episode_id, episode_news_id)
+        os.makedirs(parent, exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix=WORK_PREFIX, dir=parent)
+        heartbeat = os.path.join(work_dir, HEARTBEAT_FILE)
+        open(heartbeat, "w").close()
+        stop = threading.Event()
+        keeper = threading.Thread(
+            target=_keep_alive, args=(heartbeat, stop, self.heartbeat_seconds),
+            name="audio-workspace-heartbeat", daemon=True
+        )
+        keeper.start()
+        try:
+            yield work_dir
+        finally:
+            stop.set()
+            keeper.join()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def commit(self, episode_id: Key, episode_news_id: Key, temp_path: str) -> str:
+        """
+        Move a finished file to its content-addressed path
+
+        temp_path must be on the same filesystem (use workspace()), so the
+        rename is atomic. Identical content is stored once.
+        """
+        final_path = os.path.join(
+            self.item_dir(episode_id, episode_news_id),
+            f"{_content_hash(temp_path)}{AUDIO_SUFFIX}",
+        )
+        if os.path.exists(final_path):
+            os.remove(temp_path)
+            # Refresh mtime so the grace period protects it until referenced
+            os.utime(final_path)
+        else:
+            os.replace(temp_path, final_path)
+        return final_path
+
+    def collect_garbage(
+        self,
+        referenced: Iterable[str],
+        grace_seconds: float = GC_GRACE_SECONDS,
+        dry_run: bool = False,
+    ) -> GCResult:
+        """
+        Remove audio files and stale scratch directories nobody references
+
+        Args:
+            referenced: Paths still in use (EpisodeNews.audio_url)
+            grace_seconds: Leave anything modified more recently than this
+                (scratch directories: since their last heartbeat); must
+                exceed HEARTBEAT_SECONDS
+            dry_run: Report without deleting
+        """
+        keep = {os.path.abspath(p) for p in referenced if p}
+        cutoff = time.time() - grace_seconds
+        result = GCResult()
+        if not os.path.isdir(self.root):
+            return result
+
+        for dirpath, dirnames, filenames in os.walk(self.root, topdown=False):
+            for name in dirnames:
+                path = os.path.join(dirpath, name)
+                if not name.startswith(WORK_PREFIX):
+                    continue
+                try:
+                    if _last_active(path) >= cutoff:
+                        continue
+                except FileNotFoundError:
+                    continue  # finished meanwhile, or collected by another worker
+                result.removed.append(path)
+                if not dry_run:
+                    shutil.rmtree(path, ignore_errors=True)
+
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if not name.endswith(AUDIO_SUFFIX) or WORK_PREFIX in path:
+                    continue
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if path in keep or st.st_mtime >= cutoff:
+                    result.kept += 1
+                    continue
+                result.removed.append(path)
+                result.freed_bytes += st.st_size
+                if not dry_run:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+            if not dry_run and dirpath != self.root and WORK_PREFIX not in dirpath:
+                try:
+                    if not os.listdir(dirpath) and os.path.getmtime(dirpath) < cutoff:
+                        os.rmdir(dirpath)
+                except OSError:
+                    pass  # gone already, or a job just created a workspace in it
+
+        if result.removed:
+            logger.info(
+                f"Audio GC removed {len(result.removed)} entries, "
+                f"freed {result.freed_bytes} bytes"
+            )
+        return result
+
+
+def collect_unreferenced_audio(db, storage: Optional["AudioStorage"] = None, **kwargs) -> GCResult:
+    """Run garbage collection against the audio paths stored in the database"""
+    referenced = [path for (path,) in db.query(EpisodeNews.audio_url).filter(EpisodeNews.audio_url != None)]
+    return (storage or get_audio_storage()).collect_garbage(referenced, **kwargs)
+
+
+_audio_storage: Optional[AudioStorage] = None
+_audio_storage_lock = threading.Lock()
+
+
+def get_audio_storage() -> AudioStorage:
+    """Get the audio storage singleton (created on first use)"""
+    global _audio_storage
+    if _audio_storage is None:
+        with _audio_storage_lock:
+            if _audio_storage is None:
+                _audio_storage = AudioStorage()
+    return _audio_storage
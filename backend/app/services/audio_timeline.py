@@ -0,0 +1,302 @@
+"""音频时间线 - 片段测量、响度归一化与拼接
+
+每个片段只测量一次：
+- 时长：逐帧统计采样数（不解码）
+- 响度：ffmpeg ebur128 单次解码得到 EBU R128 综合响度
+
+测量结果按片段内容哈希缓存在片段目录的 manifest.json 中，
+重新拼接时直接读取缓存，不再重复分析。
+
+拼接分两步：每个片段按增益单独转码为统一格式，缓存在 normalized/ 目录
+（按内容哈希和增益命名，重新拼接时直接复用）；再用 concat demuxer 读取
+列表文件直接复制拼接。ffmpeg 始终只打开一个输入，片段再多也不会因
+同时打开的文件数和单个滤镜图的规模而变慢或失败。
+"""
+import hashlib
+import json
+import os
+import re
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .audio_utils import scan_mp3
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+NORMALIZED_DIR = "normalized"
+
+# 播客常用目标响度（LUFS）
+TARGET_LUFS = -16.0
+# 单个片段的最大增益调整，避免静音片段被过度放大
+MAX_GAIN_DB = 12.0
+# 低于该响度视为静音，不做增益
+SILENCE_LUFS = -60.0
+
+OUTPUT_SAMPLE_RATE = 44100
+
+_INTEGRATED_RE = re.compile(r"I:\s+(-?[\d.]+|-inf) LUFS")
+
+
+@dataclass
+class SegmentAnalysis:
+    """片段测量结果"""
+    sha1: str
+    samples: int
+    sample_rate: int
+    loudness: Optional[float]  # 综合响度 LUFS，未测量为 None
+
+    @property
+    def duration(self) -> float:
+        return self.samples / self.sample_rate if self.sample_rate else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "samples": self.samples,
+            "sample_rate": self.sample_rate,
+            "duration": round(self.duration, 6),
+            "loudness": self.loudness,
+        }
+
+
+@dataclass
+class TimelineEntry:
+    """时间线上的一个片段"""
+    path: str
+    analysis: SegmentAnalysis
+    start: float  # 起始时间（秒）
+    gain_db: float
+
+
+def file_sha1(path: str) -> str:
+    """计算文件内容哈希"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def measure_loudness(path: str) -> Optional[float]:
+    """用 ffmpeg ebur128 测量综合响度（单次解码）"""
+    cmd = [
+        "ffmpeg", "-nostats", "-hide_banner",
+        "-i", path,
+        "-filter_complex", "ebur128=framelog=quiet",
+        "-f", "null", "-"
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"响度测量失败: {path}: {result.stderr[-300:]}")
+        return None
+
+    matches = _INTEGRATED_RE.findall(result.stderr)
+    if not matches or matches[-1] == "-inf":
+        return None
+    return float(matches[-1])
+
+
+def load_manifest(directory: str) -> dict:
+    """读取片段目录的 manifest.json"""
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"version": MANIFEST_VERSION, "analyses": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest.setdefault("analyses", {})
+    return manifest
+
+
+def save_manifest(directory: str, manifest: dict):
+    """原子写入 manifest.json"""
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".json.part")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, os.path.join(directory, MANIFEST_NAME))
+
+
+def analyze_segment(path: str, cache: Dict[str, dict], with_loudness: bool = True) -> SegmentAnalysis:
+    """测量片段，命中缓存（按内容哈希）时不再分析"""
+    sha1 = file_sha1(path)
+    cached = cache.get(sha1)
+    if cached and (cached.get("loudness") is not None or not with_loudness):
+        return SegmentAnalysis(
+            sha1=sha1,
+            samples=cached["samples"],
+            sample_rate=cached["sample_rate"],
+            loudness=cached.get("loudness"),
+        )
+
+    info = scan_mp3(path)
+    analysis = SegmentAnalysis(
+        sha1=sha1,
+        samples=info.samples,
+        sample_rate=info.sample_rate,
+        loudness=measure_loudness(path) if with_loudness else None,
+    )
+    cache[sha1] = analysis.to_dict()
+    return analysis
+
+
+def gain_for(analysis: SegmentAnalysis, target_lufs: Optional[float]) -> float:
+    """计算归一化到目标响度所需增益（dB）"""
+    if target_lufs is None or analysis.loudness is None or analysis.loudness <= SILENCE_LUFS:
+        return 0.0
+    gain = target_lufs - analysis.loudness
+    return max(-MAX_GAIN_DB, min(MAX_GAIN_DB, gain))
+
+
+class AudioTimeline:
+    """按顺序排列的片段时间线"""
+
+    def __init__(self, entries: List[TimelineEntry], cache_dir: Optional[str] = None):
+        """
+        Args:
+            entries: 按播放顺序排列的片段
+            cache_dir: 归一化片段的缓存目录，None 时每次拼接使用临时目录
+        """
+        self.entries = entries
+        self.cache_dir = cache_dir
+
+    @classmethod
+    def build(
+        cls,
+        paths: List[str],
+        manifest_dir: str,
+        target_lufs: Optional[float] = TARGET_LUFS
+    ) -> "AudioTimeline":
+        """
+        测量片段并构建时间线
+
+        Args:
+            paths: 按播放顺序排列的片段路径
+            manifest_dir: manifest.json 所在目录（分析缓存，归一化片段缓存在其 normalized/ 下）
+            target_lufs: 目标响度，None 表示不做归一化
+        """
+        manifest = load_manifest(manifest_dir)
+        cache = manifest["analyses"]
+        before = len(cache)
+
+        entries = []
+        start = 0.0
+        for path in paths:
+            analysis = analyze_segment(path, cache, with_loudness=target_lufs is not None)
+            entries.append(TimelineEntry(
+                path=path,
+                analysis=analysis,
+                start=start,
+                gain_db=gain_for(analysis, target_lufs),
+            ))
+            start += analysis.duration
+
+        if len(cache) != before:
+            save_manifest(manifest_dir, manifest)
+
+        return cls(entries, cache_dir=os.path.join(manifest_dir, NORMALIZED_DIR))
+
+    @property
+    def total_duration(self) -> float:
+        if not self.entries:
+            return 0.0
+        last = self.entries[-1]
+        return last.start + last.analysis.duration
+
+    @staticmethod
+    def normalized_name(entry: TimelineEntry) -> str:
+        """归一化片段的缓存文件名（内容哈希 + 增益）"""
+        return f"{entry.analysis.sha1}_{entry.gain_db:+.2f}dB.mp3"
+
+    @staticmethod
+    def normalize_command(entry: TimelineEntry, output_path: str) -> List[str]:
+        """生成单个片段的转码命令：应用增益并统一采样率与声道"""
+        return [
+            "ffmpeg", "-y", "-nostdin", "-hide_banner",
+            "-i", os.path.abspath(entry.path),
+            "-af", f"volume={entry.gain_db:.2f}dB,"
+                   f"aresample={OUTPUT_SAMPLE_RATE},aformat=channel_layouts=stereo",
+            "-acodec", "libmp3lame",
+            "-q:a", "2",
+            # 片段中间的 Xing 头会让播放器误判总时长
+            "-write_xing", "0",
+            "-f", "mp3",
+            output_path
+        ]
+
+    @staticmethod
+    def ffmpeg_command(list_path: str, output_path: str) -> List[str]:
+        """生成拼接命令：concat demuxer 读取列表文件，直接复制已归一化的片段"""
+        return [
+            "ffmpeg", "-y", "-nostdin", "-hide_banner",
+            "-f", "concat", "-safe", "0",
+            "-i", list_path,
+            "-c", "copy",
+            "-f", "mp3",
+            output_path
+        ]
+
+    def _normalize(self, entry: TimelineEntry, cache_dir: str) -> Optional[str]:
+        """转码单个片段到缓存目录（已缓存时直接复用），失败返回 None"""
+        path = os.path.join(cache_dir, self.normalized_name(entry))
+        if os.path.exists(path):
+            return path
+
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".part.mp3")
+        os.close(fd)
+        try:
+            result = subprocess.run(self.normalize_command(entry, temp_path), capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"片段转码失败: {entry.path}: {result.stderr[-300:]}")
+                return None
+            os.replace(temp_path, path)
+            return path
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _concat(self, parts: List[str], output_path: str) -> bool:
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(output_dir, exist_ok=True)
+        fd, list_path = tempfile.mkstemp(dir=output_dir, suffix=".concat.txt")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(concat_list(parts))
+        fd, temp_path = tempfile.mkstemp(dir=output_dir, suffix=".part.mp3")
+        os.close(fd)
+        try:
+            result = subprocess.run(self.ffmpeg_command(list_path, temp_path), capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"合并失败: {result.stderr[-300:]}")
+                return False
+            os.replace(temp_path, output_path)
+            return True
+        finally:
+            for path in (list_path, temp_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def render(self, output_path: str) -> bool:
+        """执行拼接：先写同目录临时文件，成功后原子重命名，失败不留半成品"""
+        if self.cache_dir is None:
+            with tempfile.TemporaryDirectory() as cache_dir:
+                return self._render(cache_dir, output_path)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return self._render(self.cache_dir, output_path)
+
+    def _render(self, cache_dir: str, output_path: str) -> bool:
+        parts = []
+        for entry in self.entries:
+            path = self._normalize(entry, cache_dir)
+            if path is None:
+                return False
+            parts.append(path)
+        return self._concat(parts, output_path)
+
+
+def concat_list(paths: List[str]) -> str:
+    """concat demuxer 列表文件内容（路径中的单引号需转义）"""
+    lines = []
+    for path in paths:
+        escaped = os.path.abspath(path).replace("'", "'\\''")
+        lines.append(f"file '{escaped}'")
+    return "\n".join(lines) + "\n"
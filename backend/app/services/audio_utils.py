@@ -0,0 +1,195 @@
+"""音频文件工具：流式落盘、原子写入与 MP3 完整性校验"""
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+CHUNK_SIZE = 64 * 1024
+DOWNLOAD_RETRIES = 3
+
+# MPEG Audio Layer III 帧头查找表
+_BITRATES_V1 = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320]
+_BITRATES_V2 = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG1
+    2: [22050, 24000, 16000],  # MPEG2
+    0: [11025, 12000, 8000],   # MPEG2.5
+}
+
+
+class AudioIntegrityError(Exception):
+    """音频文件不完整或格式错误"""
+    pass
+
+
+@dataclass
+class MP3Info:
+    """MP3 帧扫描结果"""
+    frames: int
+    samples: int
+    sample_rate: int
+    truncated: bool
+
+    @property
+    def duration(self) -> float:
+        """按帧数计算的时长（秒）"""
+        return self.samples / self.sample_rate if self.sample_rate else 0.0
+
+
+def parse_frame_header(header: bytes) -> Optional[tuple]:
+    """
+    解析 Layer III 帧头
+
+    Returns:
+        (帧长度, 每帧采样数, 采样率)，非法帧头返回 None
+    """
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+
+    version = (header[1] >> 3) & 0x03
+    layer = (header[1] >> 1) & 0x03
+    bitrate_idx = header[2] >> 4
+    sample_rate_idx = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+
+    if version == 1 or layer != 1 or bitrate_idx in (0, 15) or sample_rate_idx == 3:
+        return None
+
+    sample_rate = _SAMPLE_RATES[version][sample_rate_idx]
+    if version == 3:
+        bitrate = _BITRATES_V1[bitrate_idx] * 1000
+        samples = 1152
+    else:
+        bitrate = _BITRATES_V2[bitrate_idx] * 1000
+        samples = 576
+
+    frame_len = samples // 8 * bitrate // sample_rate + padding
+    return frame_len, samples, sample_rate
+
+
+def _id3v2_size(f) -> int:
+    """返回文件开头 ID3v2 标签长度（没有则为 0）"""
+    header = f.read(10)
+    if len(header) < 10 or header[:3] != b"ID3":
+        return 0
+    size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+    footer = 10 if header[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def scan_mp3(path: str) -> MP3Info:
+    """逐帧扫描 MP3（只读帧头），统计帧数/采样数并检测截断"""
+    file_size = os.path.getsize(path)
+    frames = samples = sample_rate = 0
+    truncated = False
+
+    with open(path, "rb") as f:
+        pos = _id3v2_size(f)
+        while pos + 4 <= file_size:
+            f.seek(pos)
+            header = f.read(4)
+            parsed = parse_frame_header(header)
+            if parsed is None:
+                # 尾部 ID3v1 标签或其他非音频数据
+                break
+            frame_len, frame_samples, sample_rate = parsed
+            if pos + frame_len > file_size:
+                truncated = True
+                break
+            frames += 1
+            samples += frame_samples
+            pos += frame_len
+
+    return MP3Info(frames=frames, samples=samples, sample_rate=sample_rate, truncated=truncated)
+
+
+def validate_mp3(path: str) -> MP3Info:
+    """校验 MP3 完整性，失败抛出 AudioIntegrityError"""
+    info = scan_mp3(path)
+    if info.frames == 0:
+        raise AudioIntegrityError(f"未找到有效 MP3 帧: {path}")
+    if info.truncated:
+        raise AudioIntegrityError(f"MP3 最后一帧不完整（文件被截断）: {path}")
+    return info
+
+
+def stream_to_file(
+    chunks: Iterable[bytes],
+    output_path: str,
+    expected_length: Optional[int] = None,
+    validate: bool = True
+) -> str:
+    """
+    将字节流写入同目录临时文件，校验后原子重命名到 output_path
+
+    Args:
+        chunks: 字节块迭代器
+        output_path: 目标路径
+        expected_length: 期望字节数（Content-Length），None 表示不校验
+        validate: 是否做 MP3 帧校验
+
+    Returns:
+        output_path
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(dir=output_dir, suffix=".part")
+    try:
+        written = 0
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                if chunk:
+                    f.write(chunk)
+                    written += len(chunk)
+
+        if expected_length is not None and written != int(expected_length):
+            raise AudioIntegrityError(
+                f"下载不完整: 期望 {expected_length} 字节，实际 {written} 字节"
+            )
+        if validate:
+            validate_mp3(temp_path)
+
+        os.replace(temp_path, output_path)
+        return output_path
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def write_atomic(data: bytes, output_path: str, validate: bool = True) -> str:
+    """内存中的音频原子写入"""
+    return stream_to_file([data], output_path, expected_length=len(data), validate=validate)
+
+
+def download_to_file(
+    url: str,
+    output_path: str,
+    headers: Optional[dict] = None,
+    retries: int = DOWNLOAD_RETRIES,
+    timeout: int = 120
+) -> str:
+    """
+    分块流式下载音频到文件，校验失败时重新下载
+
+    内存占用只与 CHUNK_SIZE 有关，与文件大小无关。
+    """
+    import requests
+
+    for attempt in range(retries):
+        try:
+            with requests.get(url, headers=headers, stream=True, timeout=timeout) as resp:
+                resp.raise_for_status()
+                # 压缩传输时 Content-Length 是压缩后的长度，无法直接比对
+                expected = None if resp.headers.get("Content-Encoding") else resp.headers.get("Content-Length")
+                return stream_to_file(
+                    resp.iter_content(chunk_size=CHUNK_SIZE),
+                    output_path,
+                    expected_length=expected
+                )
+        except (AudioIntegrityError, requests.RequestException) as e:
+            print(f"  ⚠️ 下载尝试 {attempt + 1}/{retries} 失败: {e}")
+            if attempt < retries - 1:
+                time.sleep(2)
+            else:
+                raise
@@ -0,0 +1,403 @@
+"""Scheduled ingestion for auto-mode sources
+
+A background loop polls every enabled source with `auto_mode` set, each on
+its own interval:
+
+- Each source keeps `fetch_interval`, `last_fetched_at` and `next_fetch_at`.
+  A source is polled once `next_fetch_at` has passed.
+- After a fetch that found new items, the interval follows the feed's
+  observed cadence: half the median gap between item pubDates. Feeds without
+  dates halve the interval instead. A fetch with nothing new (or a failed
+  fetch) multiplies it by AUTO_BACKOFF_FACTOR. Intervals stay within
+  AUTO_MIN_INTERVAL..AUTO_MAX_INTERVAL, so a feed that rarely updates ends up
+  polled about once a day.
+- New items are scored on ingestion (NewsScorer) and clustered by title
+  similarity, because several feeds often carry the same story. The
+  best-scored item of each top cluster is added to the day's auto episode
+  with a pre-generated script, up to AUTO_TOP_ITEMS stories per day.
+
+Runs in-process from the app lifespan (AUTO_SCHEDULER_ENABLED) or as a
+standalone worker (`python -m app.worker`). With SHARED_STATE_URL set, a pass
+first takes a lease in the shared store, so only one of several API workers
+polls at a time. The lease is refreshed before each script, so a long pass
+keeps it. Without it, run only one scheduler per database: two
+schedulers would poll and generate twice.
+"""
+import asyncio
+import logging
+import re
+import statistics
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterable, List, Optional, Set
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Episode, EpisodeNews, News, NewsStatus, RSSSource
+from app.db.session import SessionLocal
+from app.services.news_ingest import ingest_items
+from app.services.news_scorer import NewsScorer
+from app.services.progress import get_progress_bus
+from app.services.script_format import dump_turns, parse_script
+from app.services.shared_state import get_shared_store, refresh, release, try_acquire
+from app.services.voice_hosts import sync_voice_roster
+from app.services.token_budget import news_material
+
+logger = logging.getLogger(__name__)
+
+FETCH_LIMIT = 20
+# Titles at least this similar (Jaccard over words and CJK bigrams) are one story
+CLUSTER_SIMILARITY = 0.5
+AUTO_EPISODE_TITLE = "自动节目 {date}"
+# Shared-store lease held for a pass; expires if the holder dies mid-pass
+SCHEDULER_LEASE_KEY = "auto-scheduler:pass"
+SCHEDULER_LEASE_TTL = 30 * 60
+
+_CJK = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+_WORD = re.compile(r"[A-Za-z0-9]+")
+
+
+# ===== Poll intervals =====
+
+def parse_published(value: Optional[str]) -> Optional[datetime]:
+    """RFC 822 (RSS) or ISO 8601 (Atom) date -> naive UTC, None if unparseable"""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def observed_gap(published: Iterable[Optional[datetime]]) -> Optional[float]:
+    """Median seconds between consecutive items, None with fewer than two dates"""
+    times = sorted(t for t in published if t is not None)
+    gaps = [(b - a).total_seconds() for a, b in zip(times, times[1:])]
+    gaps = [g for g in gaps if g > 0]
+    return statistics.median(gaps) if gaps else None
+
+
+def next_interval(current: Optional[int], new_items: int, published: Iterable[Optional[datetime]] = ()) -> int:
+    """
+    Seconds until a source is polled again
+
+    Args:
+        current: The source's current interval (None for a new source)
+        new_items: Items the fetch added
+        published: pubDates of the items in the feed
+    """
+    current = current or settings.AUTO_DEFAULT_INTERVAL
+    if new_items:
+        gap = observed_gap(published)
+        interval = gap / 2 if gap else current / 2
+    else:
+        interval = current * settings.AUTO_BACKOFF_FACTOR
+    return int(min(max(interval, settings.AUTO_MIN_INTERVAL), settings.AUTO_MAX_INTERVAL))
+
+
+# ===== Clustering =====
+
+def title_terms(title: str) -> Set[str]:
+    """English words plus CJK character bigrams"""
+    terms = {w.lower() for w in _WORD.findall(title)}
+    cjk = "".join(_CJK.findall(title))
+    terms.update(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return terms
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def cluster_news(news: Iterable[News], threshold: float = CLUSTER_SIMILARITY) -> List[List[News]]:
+    """
+    Group items reporting the same story
+
+    Greedy single pass in score order: an item joins the first cluster whose
+    representative (its best-scored item) has a similar title. Clusters come
+    back ordered by their representative's score.
+    """
+    clusters = []
+    for item in sorted(news, key=lambda n: n.score or 0, reverse=True):
+        terms = title_terms(item.title or "")
+        for cluster in clusters:
+            if similarity(terms, cluster[0]) >= threshold:
+                cluster[1].append(item)
+                break
+        else:
+            clusters.append((terms, [item]))
+    return [items for _, items in clusters]
+
+
+# ===== Scheduler =====
+
+@dataclass
+class TickResult:
+    """What one scheduler pass did"""
+    polled: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    new_items: int = 0
+    clusters: int = 0
+    pregenerated: List[int] = field(default_factory=list)  # News ids
+    skipped: bool = False  # another worker was running a pass
+
+
+def auto_episode(db: Session, day: date) -> Episode:
+    """The draft episode collecting one day's auto-mode stories"""
+    title = AUTO_EPISODE_TITLE.format(date=day.isoformat())
+    scheduled = datetime.combine(day, time.min)
+    episode = db.query(Episode).filter(
+        Episode.title == title,
+        Episode.scheduled_date == scheduled
+    ).first()
+    if episode is None:
+        episode = Episode(title=title, scheduled_date=scheduled)
+        db.add(episode)
+        db.flush()
+    return episode
+
+
+class AutoScheduler:
+    """Polls auto-mode sources and pre-generates scripts for the best new stories"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        fetcher=None,
+        podcast_service=None,
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
+        """
+        Args:
+            session_factory: Creates a database session per pass
+            fetcher: Object with `async fetch(url, limit)`; defaults to RSSService
+            podcast_service: Generates scripts; defaults to the app singleton
+            clock: Current naive UTC time
+        """
+        self.session_factory = session_factory
+        self._fetcher = fetcher
+        self._podcast_service = podcast_service
+        self.clock = clock
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        # Shared store and lease held by the current pass
+        self._store = None
+        self._lease: Optional[str] = None
+
+    @property
+    def fetcher(self):
+        if self._fetcher is None:
+            from app.services.rss import RSSService
+            self._fetcher = RSSService()
+        return self._fetcher
+
+    @property
+    def podcast_service(self):
+        if self._podcast_service is None:
+            from app.services.podcast import get_podcast_service
+            self._podcast_service = get_podcast_service()
+        return self._podcast_service
+
+    def due_sources(self, db: Session, now: datetime) -> List[RSSSource]:
+        return db.query(RSSSource).filter(
+            RSSSource.enabled == True,
+            RSSSource.auto_mode == True,
+            or_(RSSSource.next_fetch_at.is_(None), RSSSource.next_fetch_at <= now)
+        ).all()
+
+    async def run_once(self) -> TickResult:
+        """Poll the due sources, then pre-generate scripts for today's top stories"""
+        async with self._lock:
+            # Store calls block (SQLite waits on locks, Redis on the network)
+            store = await asyncio.to_thread(get_shared_store)
+            lease = None
+            if store is not None:
+                lease = await asyncio.to_thread(try_acquire, store, SCHEDULER_LEASE_KEY, 1, SCHEDULER_LEASE_TTL)
+                if lease is None:
+                    return TickResult(skipped=True)
+            self._store, self._lease = store, lease
+            try:
+                # Pick up host edits made through any API worker
+                await asyncio.to_thread(sync_voice_roster)
+                with self.session_factory() as db:
+                    return await self._tick(db)
+            finally:
+                self._store, self._lease = None, None
+                if lease is not None:
+                    await asyncio.to_thread(release, store, SCHEDULER_LEASE_KEY, lease)
+
+    async def _refresh_lease(self) -> bool:
+        """Extend the pass lease before a long step; False if it expired and may be held elsewhere"""
+        if self._lease is None:
+            return True
+        return await asyncio.to_thread(refresh, self._store, SCHEDULER_LEASE_KEY, self._lease, SCHEDULER_LEASE_TTL)
+
+    async def _tick(self, db: Session) -> TickResult:
+        now = self.clock()
+        result = TickResult()
+        sources = self.due_sources(db, now)
+        if not sources:
+            return result
+
+        fetched = await asyncio.gather(
+            *(self.fetcher.fetch(source.url, limit=FETCH_LIMIT) for source in sources),
+            return_exceptions=True
+        )
+
+        scorer = NewsScorer(db)
+        new_news = []
+        for source, items in zip(sources, fetched):
+            if isinstance(items, BaseException):
+                logger.warning(f"Auto-mode fetch failed for {source.name}: {items}")
+                result.failed.append(source.name)
+                added, published = [], []
+            else:
+                result.polled.append(source.name)
+                added = ingest_items(db, source, items, scorer)
+                published = [parse_published(getattr(item, "published_at", None)) for item in items]
+
+            source.fetch_interval = next_interval(source.fetch_interval, len(added), published)
+            source.last_fetched_at = now
+            source.next_fetch_at = now + timedelta(seconds=source.fetch_interval)
+            new_news.extend(added)
+            logger.info(
+                f"Auto-mode polled {source.name}: {len(added)} new, "
+                f"next in {source.fetch_interval}s"
+            )
+        db.commit()
+
+        result.new_items = len(new_news)
+        if new_news:
+            clusters = cluster_news(new_news)
+            result.clusters = len(clusters)
+            result.pregenerated = await self.pregenerate(db, clusters, now.date())
+        return result
+
+    async def pregenerate(self, db: Session, clusters: List[List[News]], day: date) -> List[int]:
+        """
+        Add the best story of each top cluster to the day's auto episode and
+        generate its script
+
+        Stories already in the episode (or similar to one) are skipped, and the
+        episode never holds more than AUTO_TOP_ITEMS stories.
+        """
+        episode = auto_episode(db, day)
+        existing = db.query(EpisodeNews).filter(
+            EpisodeNews.episode_id == episode.id,
+            EpisodeNews.deleted_at.is_(None)
+        ).all()
+        taken = [title_terms(en.news.title or "") for en in existing if en.news]
+        taken_ids = {en.news_id for en in existing}
+        slots = settings.AUTO_TOP_ITEMS - len(existing)
+
+        picked = []
+        for cluster in clusters:
+            if len(picked) >= slots:
+                break
+            news = cluster[0]
+            terms = title_terms(news.title or "")
+            if (news.score or 0) < settings.AUTO_MIN_SCORE:
+                break  # clusters are in score order
+            if news.id in taken_ids or any(similarity(terms, t) >= CLUSTER_SIMILARITY for t in taken):
+                continue
+            taken.append(terms)
+            picked.append(EpisodeNews(episode_id=episode.id, news_id=news.id, order=len(existing) + len(picked)))
+
+        if not picked:
+            db.commit()
+            return []
+        db.add_all(picked)
+        db.commit()
+
+        if not self.podcast_service.llm:
+            logger.warning("DEEPSEEK_API_KEY not set, auto-mode stories added without scripts")
+            return []
+
+        generated = []
+        for en in picked:
+            if not await self._refresh_lease():
+                logger.warning("Auto-mode lease lost, stopping the pass; remaining stories stay pending")
+                break
+            if await self._generate_script(db, en):
+                generated.append(en.news_id)
+        return generated
+
+    async def _generate_script(self, db: Session, en: EpisodeNews) -> bool:
+        progress = get_progress_bus().reporter(en.episode_id, episode_news_id=en.id, news_id=en.news_id)
+        en.status = NewsStatus.GENERATING
+        db.commit()
+        progress("job.started", job="script", status=NewsStatus.GENERATING.value)
+        try:
+            script = await self.podcast_service.generate_script(
+                news_content=news_material(db, en.news),
+                progress=progress
+            )
+        except Exception as e:
+            logger.error(f"Auto-mode script generation failed for news {en.news_id}: {e}")
+            en.status = NewsStatus.ERROR
+            en.error_message = str(e)
+            db.commit()
+            progress("job.failed", job="script", status=NewsStatus.ERROR.value, error=str(e))
+            return False
+
+        en.script = script
+        en.script_json = dump_turns(parse_script(script))
+        en.status = NewsStatus.SCRIPT_DONE
+        db.commit()
+        progress("job.finished", job="script", status=NewsStatus.SCRIPT_DONE.value)
+        return True
+
+    # ===== Background loop =====
+
+    async def run_forever(self):
+        while True:
+            try:
+                result = await self.run_once()
+                if result.polled or result.failed:
+                    logger.info(
+                        f"Auto-mode pass: polled {len(result.polled)}, failed {len(result.failed)}, "
+                        f"{result.new_items} new in {result.clusters} stories, "
+                        f"{len(result.pregenerated)} scripts pre-generated"
+                    )
+            except Exception:
+                logger.exception("Auto-mode scheduler pass failed")
+            await asyncio.sleep(settings.AUTO_TICK_SECONDS)
+
+    def start(self):
+        """Start the loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+            logger.info("Auto-mode scheduler started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._fetcher is not None and hasattr(self._fetcher, "close"):
+            await self._fetcher.close()
+            self._fetcher = None
+
+
+_scheduler: Optional[AutoScheduler] = None
+
+
+def get_auto_scheduler() -> AutoScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AutoScheduler()
+    return _scheduler
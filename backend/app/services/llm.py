@@ -1,45 +1,32 @@
-"""DeepSeek LLM 服务 - 使用 OpenAI SDK"""
+"""DeepSeek LLM 服务 - 使用 OpenAI SDK
+
+The OpenAI SDK and httpx are imported when a client is first created, not at
+module import, to keep API startup fast. Environment variables from .env are
+loaded once by app.core.config.
+"""
 import os
+import time
 import logging
-import yaml
+import threading
 
-from openai import OpenAI
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 from pydantic import BaseModel
 
-# Load .env file
-from dotenv import load_dotenv
-load_dotenv()
+from app.services.llm_cache import LLMCache
+from app.services.prompt_registry import PromptRegistry
+from app.services.rate_limit import DEEPSEEK, get_rate_limiter
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
 
 logger = logging.getLogger(__name__)
 
-# ===== Load prompts =====
+# ===== Prompts =====
 PROMPTS_FILE = os.path.join(os.path.dirname(__file__), "prompts.yaml")
+PROMPTS_OVERRIDE_FILE = os.getenv("PROMPTS_OVERRIDE_PATH", "./prompts.override.yaml")
 
-
-def _load_prompts() -> dict:
-    """Load prompts from prompts.yaml"""
-    try:
-        with open(PROMPTS_FILE, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {}
-    except FileNotFoundError:
-        logger.warning(f"Prompts config file not found: {PROMPTS_FILE}")
-        return {}
-
-
-def _get_prompt(key: str, default: str = "") -> str:
-    """Get prompt, fallback to default"""
-    prompts = _load_prompts()
-    return prompts.get(key, default)
-
-
-# Load prompts from config
-PROMPTS = _load_prompts()
-
-LUO_SYSTEM_PROMPT = PROMPTS.get("luo_system_prompt", "")
-ZIRU_SYSTEM_PROMPT = PROMPTS.get("ziru_system_prompt", "")
-PODCAST_SYSTEM_PROMPT = PROMPTS.get("podcast_system_prompt", "")
-PODCAST_USER_TEMPLATE = PROMPTS.get("podcast_user_template", """请根据以下科技新闻，生成一期脱口秀风格播客逐字稿正文部分。
+DEFAULT_USER_TEMPLATE = """请根据以下科技新闻，生成一期脱口秀风格播客逐字稿正文部分。
 
 新闻素材：
 {news_text}
@@ -51,21 +38,152 @@ PODCAST_USER_TEMPLATE = PROMPTS.get("podcast_user_template", """请根据以下
 4. 适当引用新闻中的关键信息
 5. 最后有结束语
 
-请直接输出对话内容正文。""")
+请直接输出对话内容正文。"""
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
 
-# Fixed intro (not passed to LLM)
-INTRO_TEXT = PROMPTS.get("intro_text", "")
+
+def get_prompt_registry() -> PromptRegistry:
+    """Prompt registry singleton (prompts.yaml is parsed on first use only)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = PromptRegistry(PROMPTS_FILE, override_path=PROMPTS_OVERRIDE_FILE)
+    return _registry
+
+
+# Legacy module constants, resolved from the registry so they follow hot reloads
+_LEGACY_PROMPTS = {
+    "LUO_SYSTEM_PROMPT": ("luo_system_prompt", ""),
+    "ZIRU_SYSTEM_PROMPT": ("ziru_system_prompt", ""),
+    "PODCAST_SYSTEM_PROMPT": ("podcast_system_prompt", ""),
+    "PODCAST_USER_TEMPLATE": ("podcast_user_template", DEFAULT_USER_TEMPLATE),
+    "PODCAST_SCRIPT_RULES": ("podcast_script_rules", ""),
+    "PODCAST_EXAMPLE": ("podcast_example", ""),
+    "INTRO_TEXT": ("intro_text", ""),
+}
+
+
+def __getattr__(name: str):
+    if name in _LEGACY_PROMPTS:
+        key, default = _LEGACY_PROMPTS[name]
+        return get_prompt_registry().get(key, default)
+    if name == "SCRIPT_SYSTEM_PROMPT":
+        return get_script_system_prompt()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_intro() -> str:
     """Get fixed intro"""
-    return INTRO_TEXT
+    return get_prompt_registry().get("intro_text")
+
+
+_system_prompt_cache = (None, "")
+
+
+def get_script_system_prompt() -> str:
+    """
+    Personas, format rules, example and the global script prompt
+
+    Identical across all script requests; rebuilt only when the registry
+    reloads.
+    """
+    global _system_prompt_cache
+    registry = get_prompt_registry()
+    generation, text = _system_prompt_cache
+    if generation == registry.generation:
+        return text
+
+    parts = [
+        registry.get("podcast_system_prompt"),
+        registry.get("luo_system_prompt"),
+        registry.get("ziru_system_prompt"),
+    ]
+    example = registry.get("podcast_example")
+    if example:
+        parts.append(f"## 格式示例\n\n{example}")
+    script_prompt = registry.get("script_prompt")
+    if script_prompt:
+        parts.append(f"## 全局要求\n\n{script_prompt}")
+
+    text = "\n\n".join(p.strip() for p in parts if p)
+    _system_prompt_cache = (registry.generation, text)
+    return text
+
+
+def build_script_messages(
+    news_text: str,
+    role_prompt: str = "",
+    json_mode: bool = False
+) -> List[Dict[str, str]]:
+    """
+    Assemble script-generation messages with a stable prefix
+
+    The system message and the leading rules of the user message are
+    byte-identical for every request, so the provider's prefix (context)
+    cache can serve them; per-item instructions and the news come last.
+
+    Args:
+        news_text: News material
+        role_prompt: Optional per-item custom instructions
+        json_mode: Ask for {"turns": [...]} JSON instead of markdown
+
+    Returns:
+        Chat messages
+    """
+    registry = get_prompt_registry()
+    user_parts = [registry.get("podcast_script_rules").strip()]
+    if json_mode:
+        user_parts.append(registry.get("podcast_json_format").strip())
+    if role_prompt:
+        user_parts.append(f"补充要求：\n{role_prompt.strip()}")
+    user_parts.append(f"新闻素材：\n{news_text.strip()}")
+
+    return [
+        {"role": "system", "content": get_script_system_prompt()},
+        {"role": "user", "content": "\n\n".join(user_parts)},
+    ]
 
 
 class LLMResponse(BaseModel):
     """LLM Response"""
     text: str
     usage: Optional[Dict[str, int]] = None
+    cached: bool = False
+
+
+def create_http_client(
+    max_connections: int = 20,
+    max_keepalive: int = 10,
+    keepalive_expiry: float = 60.0,
+    timeout: float = 120.0,
+    http2: bool = True
+) -> "httpx.AsyncClient":
+    """
+    Pooled async HTTP client for LLM calls
+
+    HTTP/2 is used when the optional `h2` package is installed; otherwise
+    the pool keeps HTTP/1.1 connections alive.
+    """
+    import httpx
+
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(timeout, connect=10.0),
+    )
 
 
 class DeepSeekService:
@@ -73,21 +191,73 @@ class DeepSeekService:
 
     BASE_URL = "https://api.deepseek.com"
     DEFAULT_MODEL = "deepseek-chat"
+    PROBE_TTL = 60.0
 
-    def __init__(self, api_key: Optional[str] = None, model: str = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = None,
+        cache: Optional[LLMCache] = None,
+        http_client: Optional["httpx.AsyncClient"] = None,
+        timeout: float = 120.0
+    ):
         self.api_key = api_key or os.getenv("DEEPSEEK_API_KEY")
         self.model = model or self.DEFAULT_MODEL
-        self.client = OpenAI(
+        self.cache = cache
+        self.timeout = timeout
+        self._client: Optional["OpenAI"] = None
+        self._async_client: Optional["AsyncOpenAI"] = None
+        self._owns_http_client = False
+        self._probe_result: Optional[Dict[str, Any]] = None
+        self._probe_time = 0.0
+        if http_client is not None:
+            self.attach_http_client(http_client)
+
+    @property
+    def client(self) -> "OpenAI":
+        """Sync client, created on first use"""
+        if self._client is None:
+            from openai import OpenAI
+
+            self._client = OpenAI(
+                api_key=self.api_key,
+                base_url=self.BASE_URL
+            )
+        return self._client
+
+    def attach_http_client(self, http_client: "httpx.AsyncClient"):
+        """Use an application-scoped HTTP client for async calls"""
+        from openai import AsyncOpenAI
+
+        self._async_client = AsyncOpenAI(
             api_key=self.api_key,
-            base_url=self.BASE_URL
+            base_url=self.BASE_URL,
+            http_client=http_client,
+            max_retries=1,
         )
+        self._owns_http_client = False
+
+    @property
+    def async_client(self) -> "AsyncOpenAI":
+        """Async client; falls back to a private pool if none was attached"""
+        if self._async_client is None:
+            self.attach_http_client(create_http_client(timeout=self.timeout))
+            self._owns_http_client = True
+        return self._async_client
+
+    async def aclose(self):
+        """Close the private pool (an attached shared client is left to its owner)"""
+        if self._async_client is not None and self._owns_http_client:
+            await self._async_client.close()
+        self._async_client = None
 
     def generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         max_tokens: int = 4096,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        bypass_cache: bool = False
     ) -> LLMResponse:
         """
         Call LLM to generate content
@@ -97,40 +267,179 @@ class DeepSeekService:
             system_prompt: System prompt (persona)
             max_tokens: Max tokens
             temperature: Temperature (0-1)
+            bypass_cache: Skip the cache lookup (intentional re-roll); the
+                new result still replaces the cached one
 
         Returns:
             LLMResponse
         """
-        try:
-            messages = []
+        messages = []
+
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+
+        messages.append({"role": "user", "content": prompt})
 
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
+        return self.generate_messages(
+            messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            bypass_cache=bypass_cache
+        )
+
+    def generate_messages(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        bypass_cache: bool = False,
+        response_format: Optional[Dict[str, str]] = None
+    ) -> LLMResponse:
+        """
+        Call LLM with pre-built chat messages
+
+        Args:
+            messages: Chat messages (see build_script_messages)
+            max_tokens: Max tokens
+            temperature: Temperature (0-1)
+            bypass_cache: Skip the cache lookup
+            response_format: e.g. {"type": "json_object"} for JSON mode
 
-            messages.append({"role": "user", "content": prompt})
+        Returns:
+            LLMResponse
+        """
+        try:
+            cache_key, cached = self._cache_lookup(messages, max_tokens, temperature, bypass_cache)
+            if cached is not None:
+                return cached
 
             logger.info(f"DeepSeek API request with model: {self.model}")
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
+            extra = {"response_format": response_format} if response_format else {}
+            # Shares the DeepSeek quota with every other caller (see rate_limit)
+            with get_rate_limiter(DEEPSEEK).slot():
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **extra
+                )
+
+            return self._handle_response(response, cache_key)
+
+        except Exception as e:
+            logger.error(f"DeepSeek API error: {e}")
+            raise
+
+    async def agenerate_messages(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        bypass_cache: bool = False,
+        timeout: Optional[float] = None,
+        response_format: Optional[Dict[str, str]] = None
+    ) -> LLMResponse:
+        """
+        Async variant of generate_messages on the pooled client
+
+        Cancelling the awaiting task aborts the HTTP request and returns the
+        connection to the pool.
+
+        Args:
+            messages: Chat messages
+            max_tokens: Max tokens
+            temperature: Temperature (0-1)
+            bypass_cache: Skip the cache lookup
+            timeout: Per-call timeout in seconds (defaults to the service timeout)
+            response_format: e.g. {"type": "json_object"} for JSON mode
 
-            # Parse response
-            text = response.choices[0].message.content
+        Returns:
+            LLMResponse
+        """
+        try:
+            cache_key, cached = self._cache_lookup(messages, max_tokens, temperature, bypass_cache)
+            if cached is not None:
+                return cached
 
-            usage = {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens
-            }
+            logger.info(f"DeepSeek API async request with model: {self.model}")
 
-            logger.info(f"LLM generated {len(text)} chars, usage: {usage}")
+            extra = {"response_format": response_format} if response_format else {}
+            async with get_rate_limiter(DEEPSEEK).aslot():
+                response = await self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=timeout or self.timeout,
+                    **extra
+                )
 
-            return LLMResponse(text=text, usage=usage)
+            return self._handle_response(response, cache_key)
 
         except Exception as e:
             logger.error(f"DeepSeek API error: {e}")
             raise
+
+    async def probe(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Cheap connectivity check (lists models, no completion), cached for PROBE_TTL seconds
+
+        Returns:
+            {"connected": bool, "status": str}
+        """
+        now = time.monotonic()
+        if not force and self._probe_result is not None and now - self._probe_time < self.PROBE_TTL:
+            return self._probe_result
+
+        try:
+            await self.async_client.models.list(timeout=10)
+            result = {"connected": True, "status": "ok"}
+        except Exception as e:
+            result = {"connected": False, "status": str(e)}
+
+        self._probe_result = result
+        self._probe_time = now
+        return result
+
+    def _cache_lookup(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        bypass_cache: bool
+    ):
+        """Return (cache_key, cached LLMResponse or None)"""
+        if self.cache is None:
+            return None, None
+
+        cache_key = LLMCache.make_key(self.model, messages, temperature, max_tokens)
+        if not bypass_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"LLM cache hit ({len(cached['text'])} chars)")
+                return cache_key, LLMResponse(text=cached["text"], usage=cached["usage"], cached=True)
+        return cache_key, None
+
+    def _handle_response(self, response, cache_key: Optional[str]) -> LLMResponse:
+        """Parse a completion, record usage and fill the cache"""
+        text = response.choices[0].message.content
+
+        usage = {
+            "prompt_tokens": response.usage.prompt_tokens,
+            "completion_tokens": response.usage.completion_tokens,
+            "total_tokens": response.usage.total_tokens
+        }
+        # DeepSeek context caching: prompt tokens served from / missing the prefix cache
+        for key in ("prompt_cache_hit_tokens", "prompt_cache_miss_tokens"):
+            value = getattr(response.usage, key, None)
+            if value is not None:
+                usage[key] = value
+
+        logger.info(f"LLM generated {len(text)} chars, usage: {usage}")
+
+        if cache_key is not None:
+            self.cache.set(cache_key, text, usage)
+
+        return LLMResponse(text=text, usage=usage)
@@ -0,0 +1,65 @@
+"""
+新闻入库
+手动抓取（POST /news/fetch）和自动模式调度共用：按 URL 去重、评分后写入 News
+"""
+from typing import Iterable, List, Optional
+from sqlalchemy.orm import Session
+from app.db.models import News, RSSSource
+from app.services.news_scorer import NewsScorer
+
+
+def _field(item, name: str) -> str:
+    value = getattr(item, name, None) if not isinstance(item, dict) else item.get(name)
+    return value or ""
+
+
+def ingest_items(
+    db: Session,
+    source: RSSSource,
+    items: Iterable,
+    scorer: Optional[NewsScorer] = None
+) -> List[News]:
+    """
+    保存一个源抓取到的新闻（调用方负责 commit）
+
+    Args:
+        db: 数据库会话
+        source: 新闻所属的 RSS 源
+        items: RSSItem 或 dict
+        scorer: 评分器，默认新建
+
+    Returns:
+        新增的 News（已存在的 URL 跳过）
+    """
+    scorer = scorer or NewsScorer(db)
+    added = []
+    seen = set()
+
+    for item in items:
+        url = _field(item, "url")
+        if url in seen or db.query(News.id).filter(News.url == url).first():
+            continue
+        seen.add(url)
+
+        summary = _field(item, "summary")
+        news = News(
+            title=_field(item, "title"),
+            source=source.name,
+            url=url,
+            summary=summary,
+            keywords=[],
+            content=summary,
+            rss_source_id=source.id
+        )
+
+        scores = scorer.score_news(news)
+        news.score = scores["score"]
+        news.score_authority = scores["score_authority"]
+        news.score_timeliness = scores["score_timeliness"]
+        news.score_depth = scores["score_depth"]
+        news.score_updated_at = scores["score_updated_at"]
+
+        db.add(news)
+        added.append(news)
+
+    return added
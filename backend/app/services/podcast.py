@@ -2,13 +2,21 @@
 """
 Podcast generation service - wraps LLM and TTS services
 """
+import asyncio
 import os
 import logging
+import shutil
+import tempfile
+import threading
+import time
 from typing import Optional
 
 from app.core.config import settings
-from app.services.llm import DeepSeekService
-from app.services.tts import MiniMaxTTSService
+from app.services.audio_storage import get_audio_storage
+from app.services.llm import DeepSeekService, create_http_client
+from app.services.llm_cache import LLMCache
+from app.services.progress import ProgressCallback, no_progress
+from app.services.script_format import ScriptDecodeError, ScriptFormatError, ScriptParser
 
 logger = logging.getLogger(__name__)
 
@@ -17,28 +25,77 @@ class PodcastService:
     def __init__(self):
         self.llm = None
         self.tts = None
+        self.http_client = None
+        self.storage = get_audio_storage()
         
         # Initialize services if API keys are available
-        if settings.DEEPSEEK_API_KEY:
-            self.llm = DeepSeekService(
-                api_key=settings.DEEPSEEK_API_KEY,
-                model=settings.DEEPSEEK_MODEL
+        self.llm_cache = None
+        if settings.LLM_CACHE_ENABLED:
+            self.llm_cache = LLMCache(
+                path=settings.LLM_CACHE_PATH,
+                ttl_seconds=settings.LLM_CACHE_TTL,
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES
             )
-            logger.info("DeepSeek LLM service initialized")
-        else:
-            logger.warning("DEEPSEEK_API_KEY not set, LLM service not available")
+            logger.info(f"LLM response cache enabled: {settings.LLM_CACHE_PATH}")
+
+        self.configure_llm(settings.DEEPSEEK_API_KEY)
             
         if settings.MINIMAX_API_KEY:
+            # Imported here: the TTS stack (requests, audio tools) is only needed with a key
+            from app.services.tts import MiniMaxTTSService
+
             self.tts = MiniMaxTTSService()
             logger.info("MiniMax TTS service initialized")
         else:
             logger.warning("MINIMAX_API_KEY not set, TTS service not available")
 
+    def configure_llm(self, api_key: str):
+        """(Re)create the LLM service, reusing the shared HTTP client if open"""
+        if not api_key:
+            self.llm = None
+            logger.warning("DEEPSEEK_API_KEY not set, LLM service not available")
+            return
+
+        self.llm = DeepSeekService(
+            api_key=api_key,
+            model=settings.DEEPSEEK_MODEL,
+            cache=self.llm_cache,
+            http_client=self.http_client,
+            timeout=settings.LLM_TIMEOUT
+        )
+        logger.info("DeepSeek LLM service initialized")
+
+    async def startup(self):
+        """Open the application-scoped LLM HTTP client (called from the app lifespan)"""
+        if self.http_client is None:
+            self.http_client = create_http_client(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive=settings.LLM_MAX_KEEPALIVE,
+                timeout=settings.LLM_TIMEOUT,
+                http2=settings.LLM_HTTP2
+            )
+            logger.info("Shared LLM HTTP client opened")
+        if self.llm:
+            self.llm.attach_http_client(self.http_client)
+
+    async def shutdown(self):
+        """Close pooled connections"""
+        if self.llm:
+            await self.llm.aclose()
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
     async def generate_script(
         self,
         news_content: str,
         role_prompt: str = "",
-        max_tokens: int = 4096
+        max_tokens: int = 4096,
+        bypass_cache: bool = False,
+        timeout: Optional[float] = None,
+        temperature: float = 0.8,
+        json_mode: Optional[bool] = None,
+        progress: ProgressCallback = no_progress
     ) -> str:
         """
         Generate podcast script from news content using DeepSeek
@@ -47,40 +104,90 @@ class PodcastService:
             news_content: The news article content
             role_prompt: Prompt defining the speaker roles
             max_tokens: Maximum tokens for generation
+            bypass_cache: Force a fresh generation even if a cached one exists
+            timeout: Per-call timeout in seconds
+            temperature: Sampling temperature
+            json_mode: Request structured {"turns": [...]} output
+                (defaults to SCRIPT_JSON_MODE)
+            progress: Receives llm.request / llm.response events
             
         Returns:
-            Generated script text
+            Generated script text (markdown; JSON output is validated and
+            rendered back to the markdown format)
         """
         if not self.llm:
             raise RuntimeError("LLM service not initialized. Please set DEEPSEEK_API_KEY")
         
-        from app.services.llm import PODCAST_USER_TEMPLATE
+        from app.services.llm import build_script_messages
         
-        prompt = PODCAST_USER_TEMPLATE.format(news_text=news_content)
+        if json_mode is None:
+            json_mode = settings.SCRIPT_JSON_MODE
+        messages = build_script_messages(news_content, role_prompt=role_prompt, json_mode=json_mode)
         
-        response = self.llm.generate(
-            prompt=prompt,
-            system_prompt=role_prompt,
+        progress("llm.request", model=self.llm.model, temperature=temperature, json_mode=json_mode)
+        start = time.monotonic()
+        response = await self.llm.agenerate_messages(
+            messages,
             max_tokens=max_tokens,
-            temperature=0.8
+            temperature=temperature,
+            bypass_cache=bypass_cache,
+            timeout=timeout,
+            response_format={"type": "json_object"} if json_mode else None
+        )
+        progress(
+            "llm.response",
+            elapsed=round(time.monotonic() - start, 2),
+            chars=len(response.text),
+            cached=response.cached,
+            usage=response.usage
         )
         
-        logger.info(f"Generated script: {len(response.text)} chars")
-        return response.text
+        logger.info(
+            f"Generated script: {len(response.text)} chars, "
+            f"prompt cache hit tokens: {(response.usage or {}).get('prompt_cache_hit_tokens', 0)}"
+        )
+        if not json_mode:
+            return response.text
+
+        parser = ScriptParser()
+        try:
+            turns = parser.parse_json(response.text)
+        except ScriptDecodeError as e:
+            # The model ignored JSON mode; keep whatever markdown it produced
+            logger.warning(f"Invalid JSON script, falling back to markdown parsing: {e}")
+            return response.text
+        except ScriptFormatError as e:
+            # Valid JSON that breaks the format (e.g. an unknown speaker) would be
+            # stored as a script with no parseable turns; fail the job instead
+            raise RuntimeError(f"LLM returned an invalid script: {e}") from e
+        if not turns:
+            raise RuntimeError("LLM returned an empty script")
+        return parser.to_markdown(turns)
 
     async def generate_audio(
         self,
         script: str,
         voice_id: str = "luoyonghao",
-        output_path: Optional[str] = None
+        output_path: Optional[str] = None,
+        progress: ProgressCallback = no_progress,
+        episode_id: Optional[int] = None,
+        episode_news_id: Optional[int] = None
     ) -> str:
         """
         Generate audio from script using MiniMax TTS
         
+        Segments and the merged file are written to a private scratch
+        directory, so concurrent jobs never share paths.
+        
         Args:
             script: The script text to convert to speech
             voice_id: The voice ID to use (luoyonghao or wangziru)
-            output_path: Path to save the audio file
+            output_path: Explicit destination; by default the file is stored
+                content-addressed under episode_id/episode_news_id
+            progress: Receives tts.planned and the TTS segment events
+                (called from worker threads)
+            episode_id: Episode the audio belongs to
+            episode_news_id: EpisodeNews row the audio belongs to
             
         Returns:
             Path to the generated audio file
@@ -88,30 +195,70 @@ class PodcastService:
         if not self.tts:
             raise RuntimeError("TTS service not initialized. Please set MINIMAX_API_KEY")
         
-        if not output_path:
-            output_path = f"/tmp/podcast_{voice_id}.mp3"
-        
-        # Parse dialogues from script and generate audio
+        # Parse dialogues from script and plan TTS jobs
         dialogues = self.tts.parse_script(script)
         
         if not dialogues:
             logger.warning("No dialogues found in script")
             return ""
         
-        # Generate audio for all dialogues
-        audio_files = self.tts.generate(dialogues)
+        segments = self.tts.plan_segments(dialogues)
+        logger.info(f"Planned {len(segments)} TTS segments from {len(dialogues)} dialogues")
+        progress("tts.planned", segments=len(segments), dialogues=len(dialogues))
         
-        # Merge audio files
-        output_file = self.tts.merge_audio(audio_files, output_path)
+        with self.storage.workspace(episode_id, episode_news_id) as work_dir:
+            # Synthesis and merging block on HTTP/FFmpeg; keep them off the event loop
+            audio_files = await asyncio.to_thread(
+                self.tts.batch_generate, segments, os.path.join(work_dir, "splits"),
+                skip_existing=False, progress=progress
+            )
+            
+            merged_path = os.path.join(work_dir, "merged.mp3")
+            merged = await asyncio.to_thread(
+                self.tts.merge_audio, audio_files, merged_path, skip_existing=False, progress=progress
+            )
+            if not merged:
+                raise RuntimeError("Failed to merge audio segments")
+            
+            if output_path:
+                await asyncio.to_thread(_publish_file, merged_path, output_path)
+                output_file = output_path
+            else:
+                output_file = self.storage.commit(episode_id, episode_news_id, merged_path)
         
         logger.info(f"Generated audio: {output_file}")
         return output_file
 
 
-# Singleton instance
-podcast_service = PodcastService()
+def _publish_file(source: str, output_path: str):
+    """
+    Copy a finished file to output_path atomically
+
+    The copy goes to a temp file in the destination directory and is then
+    renamed over output_path, so readers never see a partial file even when
+    the scratch directory is on another filesystem.
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=output_dir, suffix=".part.mp3")
+    os.close(fd)
+    try:
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+_podcast_service: Optional[PodcastService] = None
+_podcast_service_lock = threading.Lock()
 
 
 def get_podcast_service() -> PodcastService:
-    """Get the podcast service singleton"""
-    return podcast_service
+    """Get the podcast service singleton (created on first use, normally from the app lifespan)"""
+    global _podcast_service
+    if _podcast_service is None:
+        with _podcast_service_lock:
+            if _podcast_service is None:
+                _podcast_service = PodcastService()
+    return _podcast_service
@@ -0,0 +1,293 @@
+"""Per-episode progress events for generation jobs
+
+Services report progress through a plain callback, `progress(event, **data)`,
+so they stay unaware of transport. The endpoints bind that callback to an
+episode with `ProgressBus.reporter`; events are fanned out to Server-Sent
+Events subscribers.
+
+- publish() is thread-safe: TTS workers call it from executor threads and
+  delivery is handed to the event loop with call_soon_threadsafe
+- Each episode keeps a short history so a reconnecting EventSource can
+  resume from its Last-Event-ID. The history is dropped HISTORY_TTL
+  seconds after the episode's last job ends (when nobody is subscribed),
+  and at most MAX_EPISODES episodes are kept, least recently active first out
+- A slow subscriber whose queue is full loses events instead of blocking
+  producers
+
+With SHARED_STATE_URL set (`--workers N`, or the standalone auto-mode
+worker), events are also appended to an event log in the shared store,
+with ids from a shared counter. Every API process runs a relay thread
+(start()) that polls the log and mirrors other processes' events into its
+own history and subscribers. An SSE stream can then be served by any
+worker and resume from any worker; remote events arrive up to
+RELAY_POLL_INTERVAL late. Without a shared store the bus stays in-process.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+from app.services.shared_state import get_shared_store
+
+logger = logging.getLogger(__name__)
+
+HISTORY_SIZE = 200
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Seconds an episode's history is kept after its last job ends
+HISTORY_TTL = 600
+# Episodes with history kept at most
+MAX_EPISODES = 256
+# Events that end a job
+TERMINAL_EVENTS = {"job.finished", "job.failed", "job.cancelled"}
+
+# Shared event log (SHARED_STATE_URL): a sorted set scored by event id
+EVENT_LOG_KEY = "progress:events"
+EVENT_SEQ_KEY = "progress:seq"
+# Events kept in the shared log (all episodes), trimmed every TRIM_EVERY events
+SHARED_LOG_SIZE = 5000
+TRIM_EVERY = 100
+# Seconds between relay polls of the shared log
+RELAY_POLL_INTERVAL = 0.5
+# Ids a relay re-reads behind its cursor: another process may take an id
+# from the counter and append its event slightly later
+REORDER_WINDOW = 100
+
+ProgressCallback = Callable[..., None]
+
+
+def no_progress(event: str, **data):
+    """Default callback when nobody is listening"""
+    pass
+
+
+def format_sse(event: dict) -> str:
+    """Encode an event as an SSE frame"""
+    return (
+        f"id: {event['id']}\n"
+        f"event: {event['event']}\n"
+        f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+    )
+
+
+class Subscription:
+    """One SSE client's view of an episode's events"""
+
+    def __init__(self, bus: "ProgressBus", episode_id: int, backlog: List[dict]):
+        self.bus = bus
+        self.episode_id = episode_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._backlog = deque(backlog)
+
+    async def next(self, timeout: float) -> Optional[dict]:
+        """Next event, or None if none arrived within timeout"""
+        if self._backlog:
+            return self._backlog.popleft()
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.bus._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ProgressBus:
+    """In-process pub/sub of job and segment events, keyed by episode"""
+
+    def __init__(
+        self,
+        history_size: int = HISTORY_SIZE,
+        history_ttl: float = HISTORY_TTL,
+        max_episodes: int = MAX_EPISODES,
+        clock: Callable[[], float] = time.monotonic,
+        store=None,
+        poll_interval: float = RELAY_POLL_INTERVAL
+    ):
+        self.history_size = history_size
+        self.history_ttl = history_ttl
+        self.max_episodes = max_episodes
+        self.clock = clock
+        self.store = store
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._last_id = 0
+        # Relay state: highest id read from the shared log, ids already recorded
+        self._cursor = 0
+        self._seen: Set[int] = set()
+        self._relay: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # Least recently active episode first
+        self._history: "OrderedDict[int, Deque[dict]]" = OrderedDict()
+        # Episode -> when its last job ended (absent while a job is running)
+        self._ended_at: Dict[int, float] = {}
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def publish(self, episode_id: int, event: str, **data) -> dict:
+        """Record an event and deliver it to current subscribers (any thread)"""
+        payload = {"id": 0, "event": event, "episode_id": episode_id, "ts": round(time.time(), 3), **data}
+        if self.store is None:
+            with self._lock:
+                self._last_id += 1
+                payload["id"] = self._last_id
+        else:
+            try:
+                self._append_shared(payload)
+            except Exception as e:
+                # Progress is best effort: never fail a job because the store is down
+                logger.warning(f"Cannot append progress event to the shared log: {e}")
+                return payload
+        self._record(payload)
+        return payload
+
+    def _append_shared(self, payload: dict):
+        event_id = self.store.incr(EVENT_SEQ_KEY)
+        payload["id"] = event_id
+        self.store.zadd(EVENT_LOG_KEY, {json.dumps(payload, ensure_ascii=False): event_id})
+        if event_id % TRIM_EVERY == 0:
+            self.store.zremrangebyrank(EVENT_LOG_KEY, 0, -(SHARED_LOG_SIZE + 1))
+
+    def _record(self, payload: dict):
+        """Add an event to its episode's history and hand it to subscribers"""
+        episode_id, event = payload["episode_id"], payload["event"]
+        with self._lock:
+            if self.store is not None:
+                if payload["id"] in self._seen:
+                    return
+                self._seen.add(payload["id"])
+                if len(self._seen) > 2 * SHARED_LOG_SIZE:
+                    # No relay running (e.g. the auto-mode worker) prunes it otherwise
+                    floor = payload["id"] - SHARED_LOG_SIZE
+                    self._seen = {i for i in self._seen if i >= floor}
+            history = self._history.setdefault(episode_id, deque(maxlen=self.history_size))
+            history.append(payload)
+            self._history.move_to_end(episode_id)
+            if event in TERMINAL_EVENTS:
+                self._ended_at[episode_id] = self.clock()
+            else:
+                self._ended_at.pop(episode_id, None)
+            self._evict()
+            subscribers = list(self._subscribers.get(episode_id, ()))
+            loop = self._loop
+
+        if subscribers and loop is not None and not loop.is_closed():
+            for sub in subscribers:
+                loop.call_soon_threadsafe(self._offer, sub, payload)
+
+    def poll(self) -> int:
+        """Mirror new events from the shared log (relay thread); returns events recorded"""
+        if self.store is None:
+            return 0
+        low = max(self._cursor - REORDER_WINDOW, 0) + 1
+        recorded = 0
+        for member in self.store.zrangebyscore(EVENT_LOG_KEY, low, "+inf"):
+            payload = json.loads(member)
+            self._cursor = max(self._cursor, payload["id"])
+            if payload["id"] not in self._seen:
+                self._record(payload)
+                recorded += 1
+        with self._lock:
+            self._seen = {i for i in self._seen if i >= low}
+        return recorded
+
+    def start(self):
+        """Start the relay thread (only with a shared store)"""
+        if self.store is None or self._relay is not None:
+            return
+        self._stop.clear()
+        self._relay = threading.Thread(target=self._run_relay, name="progress-relay", daemon=True)
+        self._relay.start()
+
+    def stop(self):
+        """Stop the relay thread"""
+        relay, self._relay = self._relay, None
+        if relay is not None:
+            self._stop.set()
+            relay.join(timeout=5)
+
+    def _run_relay(self):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning(f"Progress relay poll failed: {e}")
+            if self._stop.wait(self.poll_interval):
+                return
+
+    def reporter(self, episode_id: int, **context) -> ProgressCallback:
+        """Callback publishing to an episode, tagging every event with context"""
+        def progress(event: str, **data):
+            self.publish(episode_id, event, **context, **data)
+        return progress
+
+    def subscribe(self, episode_id: int, last_event_id: int = 0) -> Subscription:
+        """
+        Subscribe to an episode (call from the event loop)
+
+        Events newer than last_event_id that are still in history are
+        replayed first.
+        """
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            backlog = [
+                e for e in self._history.get(episode_id, ())
+                if e["id"] > last_event_id
+            ] if last_event_id else []
+            sub = Subscription(self, episode_id, backlog)
+            self._subscribers.setdefault(episode_id, set()).add(sub)
+        return sub
+
+    def history(self, episode_id: int) -> List[dict]:
+        with self._lock:
+            return list(self._history.get(episode_id, ()))
+
+    def _evict(self):
+        """Drop histories of ended jobs past their TTL, then the least recently active (lock held)"""
+        now = self.clock()
+        for episode_id, ended_at in list(self._ended_at.items()):
+            if now - ended_at >= self.history_ttl and episode_id not in self._subscribers:
+                self._drop(episode_id)
+        while len(self._history) > self.max_episodes:
+            self._drop(next(iter(self._history)))
+
+    def _drop(self, episode_id: int):
+        self._history.pop(episode_id, None)
+        self._ended_at.pop(episode_id, None)
+
+    def _unsubscribe(self, sub: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(sub.episode_id)
+            if subscribers is not None:
+                subscribers.discard(sub)
+                if not subscribers:
+                    del self._subscribers[sub.episode_id]
+
+    @staticmethod
+    def _offer(sub: Subscription, payload: dict):
+        try:
+            sub.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            logger.warning(f"Progress subscriber for episode {sub.episode_id} is lagging, dropping event")
+
+
+_progress_bus: Optional[ProgressBus] = None
+_progress_bus_lock = threading.Lock()
+
+
+def get_progress_bus() -> ProgressBus:
+    """Get the progress bus singleton (shared through SHARED_STATE_URL when set)"""
+    global _progress_bus
+    if _progress_bus is None:
+        with _progress_bus_lock:
+            if _progress_bus is None:
+                _progress_bus = ProgressBus(store=get_shared_store())
+    return _progress_bus
@@ -6,10 +6,6 @@ from dataclasses import dataclass
 import logging
 import xml.etree.ElementTree as ET
 
-# 加载 .env 文件
-from dotenv import load_dotenv
-load_dotenv()
-
 logger = logging.getLogger(__name__)
 
 
@@ -0,0 +1,206 @@
+"""逐字稿结构化格式
+
+逐字稿在内部表示为 Turn 列表（说话人 + 台词），支持两种文本格式：
+
+- JSON（LLM JSON 模式输出）：{"turns": [{"speaker": "彪悍罗", "text": "..."}]}，
+  也接受顶层数组或每行一个对象（JSON Lines）
+- Markdown（旧格式）：**彪悍罗：**xxx。逐行单遍扫描：行首是说话人标签即开始新台词，
+  否则并入上一句台词；台词原样保留（包括 *）
+
+说话人标签 -> 说话人的映射来自主播名册（voice_roster），新增主播无需修改正则。
+"""
+import json
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .voice_roster import get_voice_roster
+
+COLONS = ("：", ":")
+# 行首标签最多查找的字符数（保证每行的匹配代价有上限）
+MAX_LABEL_CHARS = 16
+
+
+class ScriptFormatError(ValueError):
+    """逐字稿格式错误"""
+
+
+class ScriptDecodeError(ScriptFormatError):
+    """文本无法按 JSON 解码（区别于 JSON 合法但内容不符合格式，如说话人未知）"""
+
+
+@dataclass
+class Turn:
+    """一句台词"""
+    speaker: str
+    text: str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class ScriptParser:
+    """逐字稿解析器（Markdown 单遍扫描 / JSON）"""
+
+    def __init__(self, aliases: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            aliases: 标签 -> 说话人；默认使用当前主播名册
+                （每个说话人的第一个标签用于输出 Markdown）
+        """
+        if aliases is None:
+            roster = get_voice_roster()
+            self.aliases = roster.aliases
+            self.labels = roster.labels
+        else:
+            self.aliases = dict(aliases)
+            self.labels: Dict[str, str] = {}
+            for label, speaker in self.aliases.items():
+                self.labels.setdefault(speaker, label)
+        self.speakers = self.labels.keys()
+
+    def resolve(self, name: str) -> Optional[str]:
+        """标签或说话人键 -> 说话人"""
+        name = name.strip()
+        if name in self.aliases:
+            return self.aliases[name]
+        if name in self.speakers:
+            return name
+        return None
+
+    def match_label(self, line: str) -> Optional[Tuple[str, str]]:
+        """
+        识别行首的说话人标签
+
+        支持 **标签：**台词、**标签**：台词 和 标签：台词（全角/半角冒号）
+
+        Returns:
+            (说话人, 标签后的台词)，不是台词行时返回 None
+        """
+        body = line.lstrip()
+        bold = body.startswith("**")
+        if bold:
+            body = body[2:]
+
+        head = body[:MAX_LABEL_CHARS + 3]
+        end = -1
+        for colon in COLONS:
+            pos = head.find(colon)
+            if pos != -1 and (end == -1 or pos < end):
+                end = pos
+        if end <= 0:
+            return None
+
+        label = body[:end]
+        if bold and label.endswith("**"):
+            label = label[:-2]
+        speaker = self.aliases.get(label.strip())
+        if speaker is None:
+            return None
+
+        rest = body[end + 1:]
+        if bold and rest.startswith("**"):
+            rest = rest[2:]
+        return speaker, rest
+
+    def parse_markdown(self, content: str) -> List[Turn]:
+        """解析 Markdown 逐字稿；第一句台词之前的内容（如开场白）忽略"""
+        turns: List[Turn] = []
+        speaker = None
+        lines: List[str] = []
+
+        def flush():
+            text = "\n".join(lines).strip()
+            if speaker is not None and text:
+                turns.append(Turn(speaker=speaker, text=text))
+
+        for line in content.splitlines():
+            hit = self.match_label(line)
+            if hit is not None:
+                flush()
+                speaker, first = hit
+                lines = [first.strip()]
+            elif speaker is not None:
+                stripped = line.strip()
+                if stripped.startswith("#") or stripped == "---":
+                    # 标题/分隔线结束当前台词
+                    flush()
+                    speaker, lines = None, []
+                else:
+                    lines.append(stripped)
+        flush()
+        return turns
+
+    def parse_json(self, content: str) -> List[Turn]:
+        """解析 JSON / JSON Lines 逐字稿"""
+        text = _strip_code_fence(content)
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                data = [json.loads(line) for line in text.splitlines() if line.strip()]
+            except json.JSONDecodeError as e:
+                raise ScriptDecodeError(f"不是合法的 JSON: {e}") from e
+
+        if isinstance(data, dict):
+            data = data.get("turns", data.get("dialogues"))
+        if not isinstance(data, list):
+            raise ScriptFormatError("JSON 逐字稿缺少 turns 数组")
+        return self.from_dicts(data)
+
+    def from_dicts(self, items: Iterable[dict]) -> List[Turn]:
+        """[{"speaker", "text"}] -> Turn 列表，校验说话人"""
+        turns = []
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise ScriptFormatError(f"第 {i + 1} 句台词不是对象")
+            speaker = self.resolve(str(item.get("speaker", "")))
+            if speaker is None:
+                raise ScriptFormatError(f"第 {i + 1} 句台词的说话人未知: {item.get('speaker')!r}")
+            text = str(item.get("text", "")).strip()
+            if text:
+                turns.append(Turn(speaker=speaker, text=text))
+        return turns
+
+    def parse(self, content: str) -> List[Turn]:
+        """
+        自动识别格式：JSON 开头按 JSON 解析，否则按 Markdown
+
+        只有无法解码为 JSON 时才退回 Markdown（如以 [开场] 开头的文本）；
+        JSON 合法但内容不符合格式（如说话人未知）时抛出 ScriptFormatError，
+        否则会被当成没有任何台词的 Markdown 静默吞掉
+        """
+        stripped = content.lstrip()
+        if stripped.startswith(("{", "[", "```")):
+            try:
+                return self.parse_json(stripped)
+            except ScriptDecodeError:
+                pass
+        return self.parse_markdown(content)
+
+    def to_markdown(self, turns: Iterable[Turn]) -> str:
+        """Turn 列表 -> **标签：**台词"""
+        return "\n".join(
+            f"**{self.labels.get(t.speaker, t.speaker)}：**{t.text}" for t in turns
+        )
+
+
+def _strip_code_fence(content: str) -> str:
+    text = content.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+
+def parse_script(content: Union[str, list], aliases: Optional[Dict[str, str]] = None) -> List[Turn]:
+    """解析逐字稿文本（JSON 或 Markdown）或 [{"speaker", "text"}] 列表"""
+    parser = ScriptParser(aliases)
+    if isinstance(content, list):
+        return parser.from_dicts(content)
+    return parser.parse(content)
+
+
+def dump_turns(turns: Iterable[Turn]) -> List[dict]:
+    """Turn 列表 -> 可存入 JSON 列的列表"""
+    return [t.to_dict() for t in turns]
@@ -0,0 +1,76 @@
+"""Cheap heuristic scoring of generated scripts
+
+Used to rank script variants without another LLM call:
+- format: share of non-empty lines that start with a valid speaker tag
+- balance: how evenly the hosts split the spoken characters
+- length: closeness to the target script length
+"""
+import math
+from dataclasses import asdict, dataclass
+
+from app.services.script_format import ScriptParser
+
+# Target spoken length (characters) of a per-news script
+TARGET_CHARS = 1200
+
+WEIGHTS = {"format": 0.4, "balance": 0.3, "length": 0.3}
+
+# Variants scoring at least this are good enough to return without waiting for the rest
+ACCEPT_SCORE = 0.85
+
+
+@dataclass
+class ScriptScore:
+    total: float
+    format: float
+    balance: float
+    length: float
+    turns: int
+    chars: int
+
+    def to_dict(self) -> dict:
+        return {k: round(v, 4) if isinstance(v, float) else v for k, v in asdict(self).items()}
+
+
+def score_script(script: str, target_chars: int = TARGET_CHARS) -> ScriptScore:
+    """
+    Score a script in [0, 1]
+
+    Args:
+        script: Generated script
+        target_chars: Desired spoken length
+
+    Returns:
+        ScriptScore with the weighted total and its components
+    """
+    parser = ScriptParser()
+    lines = [line for line in script.splitlines() if line.strip()]
+    valid = sum(1 for line in lines if parser.match_label(line))
+    format_score = valid / len(lines) if lines else 0.0
+
+    turns = parser.parse_markdown(script)
+    chars: dict = {}
+    for turn in turns:
+        chars[turn.speaker] = chars.get(turn.speaker, 0) + len(turn.text)
+
+    spoken = sum(chars.values())
+    # A script with a single speaker has no balance at all
+    if len(chars) >= 2:
+        balance = 1.0 - (max(chars.values()) - min(chars.values())) / spoken
+    else:
+        balance = 0.0
+    length = math.exp(-abs(spoken - target_chars) / target_chars) if spoken else 0.0
+
+    total = (
+        WEIGHTS["format"] * format_score
+        + WEIGHTS["balance"] * balance
+        + WEIGHTS["length"] * length
+    )
+    return ScriptScore(
+        total=total,
+        format=format_score,
+        balance=balance,
+        length=length,
+        turns=len(turns),
+        chars=spoken,
+    )
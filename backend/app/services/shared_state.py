@@ -0,0 +1,331 @@
+"""
+跨进程共享状态
+多个 API worker（uvicorn --workers N）或多个流水线进程共用同一份限流配额和租约
+
+存储只使用 Redis 命令的一个子集（方法名、参数与 redis-py 一致）：
+- incr / expire / get：计数器（按分钟窗口统计请求数、配置版本号）
+- zadd / zrem / zremrangebyscore / zcard / zscore：有序集合（并发租约，score 为过期时间）
+- zrangebyscore / zremrangebyrank：有序集合按序读取和裁剪（进度事件日志，score 为事件 ID）
+
+因此 redis-py 客户端可以直接使用，另有两个实现：
+- SQLiteStore：单机多进程，共享一个 SQLite 文件
+- MemoryStore：进程内实现，用作测试和本地替身
+
+配置 SHARED_STATE_URL：
+- 未设置：不共享（限流器回退到进程内实现，行为与单进程一致）
+- memory://                      → MemoryStore
+- sqlite:///data/shared_state.db → SQLiteStore
+- redis://localhost:6379/0       → redis-py（可选依赖，pip install redis）
+"""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 并发租约的默认有效期（秒）：持有者崩溃后，租约最多占用这么久
+LEASE_TTL = 300
+
+
+class MemoryStore:
+    """进程内的 Redis 命令子集实现"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, list] = {}  # key -> [value, expires_at]
+        self._zsets: Dict[str, Dict[str, float]] = {}
+
+    def _live_counter(self, key: str) -> Optional[list]:
+        counter = self._counters.get(key)
+        if counter and counter[1] is not None and counter[1] <= time.time():
+            del self._counters[key]
+            return None
+        return counter
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            counter = self._live_counter(key)
+            if counter is None:
+                counter = self._counters[key] = [0, None]
+            counter[0] += amount
+            return counter[0]
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            counter = self._live_counter(key)
+            return counter[0] if counter else None
+
+    def expire(self, key: str, seconds: int) -> bool:
+        with self._lock:
+            counter = self._live_counter(key)
+            if counter is None:
+                return False
+            counter[1] = time.time() + seconds
+            return True
+
+    def zadd(self, key: str, mapping: Dict[str, float]) -> int:
+        with self._lock:
+            zset = self._zsets.setdefault(key, {})
+            added = sum(1 for member in mapping if member not in zset)
+            zset.update(mapping)
+            return added
+
+    def zrem(self, key: str, *members: str) -> int:
+        with self._lock:
+            zset = self._zsets.get(key, {})
+            return sum(1 for member in members if zset.pop(member, None) is not None)
+
+    def zremrangebyscore(self, key: str, min: float, max: float) -> int:
+        with self._lock:
+            zset = self._zsets.get(key, {})
+            expired = [m for m, score in zset.items() if float(min) <= score <= float(max)]
+            for member in expired:
+                del zset[member]
+            return len(expired)
+
+    def zrangebyscore(self, key: str, min: float, max: float) -> List[str]:
+        with self._lock:
+            zset = self._zsets.get(key, {})
+            hits = [(score, m) for m, score in zset.items() if float(min) <= score <= float(max)]
+        return [m for _, m in sorted(hits)]
+
+    def zremrangebyrank(self, key: str, start: int, stop: int) -> int:
+        with self._lock:
+            zset = self._zsets.get(key, {})
+            ranked = [m for _, m in sorted((score, m) for m, score in zset.items())]
+            doomed = ranked[slice(*_rank_slice(start, stop, len(ranked)))]
+            for member in doomed:
+                del zset[member]
+            return len(doomed)
+
+    def zcard(self, key: str) -> int:
+        with self._lock:
+            return len(self._zsets.get(key, {}))
+
+    def zscore(self, key: str, member: str) -> Optional[float]:
+        with self._lock:
+            return self._zsets.get(key, {}).get(member)
+
+
+class SQLiteStore:
+    """
+    SQLite 上的 Redis 命令子集实现（单机多进程共享）
+
+    每条命令是一个 BEGIN IMMEDIATE 事务，跨进程原子；每个线程使用自己的连接。
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = os.path.abspath(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters "
+                "(key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS zsets "
+                "(key TEXT NOT NULL, member TEXT NOT NULL, score REAL NOT NULL, PRIMARY KEY (key, member))"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM counters WHERE key = ? AND expires_at <= ?", (key, time.time()))
+            conn.execute(
+                "INSERT INTO counters (key, value, expires_at) VALUES (?, ?, NULL) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+                (key, amount)
+            )
+            return conn.execute("SELECT value FROM counters WHERE key = ?", (key,)).fetchone()[0]
+
+    def get(self, key: str) -> Optional[int]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value FROM counters WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def expire(self, key: str, seconds: int) -> bool:
+        with self._transaction() as conn:
+            now = time.time()
+            conn.execute("DELETE FROM counters WHERE expires_at <= ?", (now,))
+            cursor = conn.execute("UPDATE counters SET expires_at = ? WHERE key = ?", (now + seconds, key))
+            return cursor.rowcount > 0
+
+    def zadd(self, key: str, mapping: Dict[str, float]) -> int:
+        with self._transaction() as conn:
+            added = 0
+            for member, score in mapping.items():
+                exists = conn.execute(
+                    "SELECT 1 FROM zsets WHERE key = ? AND member = ?", (key, member)
+                ).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO zsets (key, member, score) VALUES (?, ?, ?)",
+                    (key, member, float(score))
+                )
+                added += 0 if exists else 1
+            return added
+
+    def zrem(self, key: str, *members: str) -> int:
+        with self._transaction() as conn:
+            return sum(
+                conn.execute("DELETE FROM zsets WHERE key = ? AND member = ?", (key, member)).rowcount
+                for member in members
+            )
+
+    def zremrangebyscore(self, key: str, min: float, max: float) -> int:
+        with self._transaction() as conn:
+            return conn.execute(
+                "DELETE FROM zsets WHERE key = ? AND score >= ? AND score <= ?",
+                (key, float(min), float(max))
+            ).rowcount
+
+    def zrangebyscore(self, key: str, min: float, max: float) -> List[str]:
+        conn = self._connection()
+        rows = conn.execute(
+            "SELECT member FROM zsets WHERE key = ? AND score >= ? AND score <= ? ORDER BY score, member",
+            (key, float(min), float(max))
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def zremrangebyrank(self, key: str, start: int, stop: int) -> int:
+        with self._transaction() as conn:
+            size = conn.execute("SELECT COUNT(*) FROM zsets WHERE key = ?", (key,)).fetchone()[0]
+            first, end = _rank_slice(start, stop, size)
+            if end <= first:
+                return 0
+            return conn.execute(
+                "DELETE FROM zsets WHERE key = ? AND member IN "
+                "(SELECT member FROM zsets WHERE key = ? ORDER BY score, member LIMIT ? OFFSET ?)",
+                (key, key, end - first, first)
+            ).rowcount
+
+    def zcard(self, key: str) -> int:
+        conn = self._connection()
+        return conn.execute("SELECT COUNT(*) FROM zsets WHERE key = ?", (key,)).fetchone()[0]
+
+    def zscore(self, key: str, member: str) -> Optional[float]:
+        conn = self._connection()
+        row = conn.execute("SELECT score FROM zsets WHERE key = ? AND member = ?", (key, member)).fetchone()
+        return row[0] if row else None
+
+
+def _rank_slice(start: int, stop: int, size: int) -> Tuple[int, int]:
+    """Redis 排名区间（含两端，负数从末尾数）-> [first, end)"""
+    first = start + size if start < 0 else start
+    last = stop + size if stop < 0 else stop
+    return max(first, 0), min(last, size - 1) + 1
+
+
+# ==================== 租约 ====================
+
+def try_acquire(store, key: str, limit: int, ttl: float = LEASE_TTL) -> Optional[str]:
+    """
+    尝试占用 key 下的一个名额（最多 limit 个），成功返回租约 ID，否则返回 None
+
+    先清理过期租约，加入自己的租约后再计数：并发加入的进程中，后计数的一方
+    一定能看到先加入的租约，超出 limit 时自行退出，因此持有者不会超过 limit。
+    """
+    now = time.time()
+    lease = uuid.uuid4().hex
+    store.zremrangebyscore(key, "-inf", now)
+    store.zadd(key, {lease: now + ttl})
+    if store.zcard(key) <= limit:
+        return lease
+    store.zrem(key, lease)
+    return None
+
+
+def refresh(store, key: str, lease: str, ttl: float = LEASE_TTL) -> bool:
+    """
+    延长租约有效期，租约已过期被清理时返回 False（名额可能已被别人占用）
+
+    只有持有者会更新自己的租约；在过期前刷新，检查和更新之间不会丢失名额。
+    """
+    now = time.time()
+    score = store.zscore(key, lease)
+    if score is None or float(score) <= now:
+        return False
+    store.zadd(key, {lease: now + ttl})
+    return True
+
+
+def release(store, key: str, lease: str):
+    """释放租约"""
+    store.zrem(key, lease)
+
+
+def count_in_window(store, key: str, window: float) -> int:
+    """当前时间窗口内的第几次请求（窗口结束后计数自动过期）"""
+    window_key = f"{key}:{int(time.time() // window)}"
+    count = store.incr(window_key)
+    if count == 1:
+        store.expire(window_key, int(window * 2))
+    return count
+
+
+# ==================== 全局存储 ====================
+
+_store = None
+_store_lock = threading.Lock()
+_store_loaded = False
+
+
+def create_store(url: str):
+    """按 URL 创建共享存储，空字符串返回 None（不共享）"""
+    url = (url or "").strip()
+    if not url:
+        return None
+    if url == "memory://":
+        return MemoryStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SHARED_STATE_URL 使用 Redis 需要 redis: pip install redis")
+        return redis.Redis.from_url(url)
+    raise ValueError(f"不支持的 SHARED_STATE_URL: {url}")
+
+
+def get_shared_store():
+    """按环境变量 SHARED_STATE_URL 创建的共享存储（单例），未配置时返回 None"""
+    global _store, _store_loaded
+    if not _store_loaded:
+        with _store_lock:
+            if not _store_loaded:
+                _store = create_store(os.getenv("SHARED_STATE_URL", ""))
+                _store_loaded = True
+    return _store
+
+
+def set_shared_store(store):
+    """替换共享存储（测试或嵌入使用；None 表示不共享）"""
+    global _store, _store_loaded
+    with _store_lock:
+        _store = store
+        _store_loaded = True
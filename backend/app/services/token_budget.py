@@ -0,0 +1,183 @@
+"""Token budgeting for news material sent to the LLM
+
+- Tokens are counted with DeepSeek's tokenizer when `tokenizers` is
+  installed and DEEPSEEK_TOKENIZER_PATH points to its tokenizer.json;
+  otherwise DeepSeek's published ratios are used (~0.6 token per CJK
+  character, ~0.3 per other character)
+- Material over budget is condensed extractively: the lead sentence plus
+  the highest-scoring sentences are kept in their original order, then
+  hard-truncated if needed
+- Condensed text is cached per News.id (NewsDigest), keyed by content hash
+  and budget
+"""
+import hashlib
+import logging
+import math
+import re
+from collections import Counter
+from typing import List, Optional
+
+from app.core.config import settings
+from app.services.segment_planner import split_sentences
+
+logger = logging.getLogger(__name__)
+
+CJK_TOKENS_PER_CHAR = 0.6
+OTHER_TOKENS_PER_CHAR = 0.3
+
+_CJK = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3000-\u303f\uff00-\uffef]")
+_WORD = re.compile(r"[A-Za-z0-9]+")
+
+
+class TokenCounter:
+    """Count tokens with DeepSeek's tokenizer, or estimate when unavailable"""
+
+    def __init__(self, tokenizer_path: str = ""):
+        self._tokenizer = None
+        if tokenizer_path:
+            try:
+                from tokenizers import Tokenizer
+                self._tokenizer = Tokenizer.from_file(tokenizer_path)
+            except ImportError:
+                logger.warning("tokenizers not installed, falling back to token estimation")
+            except Exception as e:
+                logger.warning(f"Failed to load tokenizer {tokenizer_path}: {e}")
+
+    @property
+    def exact(self) -> bool:
+        return self._tokenizer is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._tokenizer is not None:
+            return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+        cjk = len(_CJK.findall(text))
+        return math.ceil(cjk * CJK_TOKENS_PER_CHAR + (len(text) - cjk) * OTHER_TOKENS_PER_CHAR)
+
+
+_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Shared counter (the tokenizer file is loaded once)"""
+    global _counter
+    if _counter is None:
+        _counter = TokenCounter(settings.DEEPSEEK_TOKENIZER_PATH)
+    return _counter
+
+
+def _sentences(text: str) -> List[str]:
+    sentences = []
+    for paragraph in text.splitlines():
+        sentences.extend(s.strip() for s in split_sentences(paragraph) if s.strip())
+    return sentences
+
+
+def _terms(sentence: str) -> List[str]:
+    """English words plus CJK character bigrams"""
+    terms = [w.lower() for w in _WORD.findall(sentence)]
+    cjk = "".join(_CJK.findall(sentence))
+    terms.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return terms
+
+
+def truncate_to_budget(text: str, budget: int, counter: TokenCounter) -> str:
+    """Longest prefix of text that fits the budget"""
+    if counter.count(text) <= budget:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if counter.count(text[:mid]) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo]
+
+
+def condense(text: str, budget: int, counter: Optional[TokenCounter] = None) -> str:
+    """
+    Fit text into a token budget
+
+    Args:
+        text: News material
+        budget: Maximum tokens
+        counter: Token counter (defaults to the shared one)
+
+    Returns:
+        The text unchanged if it fits, otherwise an extractive summary
+    """
+    counter = counter or get_token_counter()
+    if counter.count(text) <= budget:
+        return text
+
+    sentences = _sentences(text)
+    if len(sentences) <= 1:
+        return truncate_to_budget(text, budget, counter)
+
+    frequencies = Counter(t for s in sentences for t in _terms(s))
+
+    def score(i: int) -> float:
+        terms = _terms(sentences[i])
+        density = sum(frequencies[t] for t in terms) / math.sqrt(len(terms) or 1)
+        # Earlier sentences of news articles carry more information
+        return density * (1.0 + 1.0 / (i + 1))
+
+    # The lead sentence is always kept when it fits
+    ranked = [0] + sorted(range(1, len(sentences)), key=score, reverse=True)
+
+    chosen = set()
+    used = 0
+    for i in ranked:
+        cost = counter.count(sentences[i]) + 1  # joining newline
+        if used + cost <= budget:
+            chosen.add(i)
+            used += cost
+
+    if not chosen:
+        return truncate_to_budget(sentences[0], budget, counter)
+
+    return "\n".join(sentences[i] for i in sorted(chosen))
+
+
+def news_material(db, news, budget: Optional[int] = None) -> str:
+    """
+    Budgeted material for a News row, cached per News.id
+
+    Args:
+        db: Database session
+        news: News row
+        budget: Token budget (defaults to NEWS_TOKEN_BUDGET)
+
+    Returns:
+        Text to put into the script prompt
+    """
+    from app.db.models import NewsDigest
+
+    budget = budget or settings.NEWS_TOKEN_BUDGET
+    text = news.content or news.summary or news.title
+    content_hash = hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    digest = db.query(NewsDigest).filter(NewsDigest.news_id == news.id).first()
+    if digest and digest.content_hash == content_hash and digest.budget == budget:
+        return digest.text
+
+    counter = get_token_counter()
+    condensed = condense(text, budget, counter)
+    tokens = counter.count(condensed)
+    if condensed != text:
+        logger.info(
+            f"Condensed news {news.id}: {counter.count(text)} -> {tokens} tokens (budget {budget})"
+        )
+
+    if digest is None:
+        digest = NewsDigest(news_id=news.id)
+        db.add(digest)
+    digest.content_hash = content_hash
+    digest.budget = budget
+    digest.text = condensed
+    digest.tokens = tokens
+    db.commit()
+
+    return condensed
@@ -11,6 +11,9 @@ import abc
 from typing import List
 from dataclasses import dataclass
 
+from .audio_utils import CHUNK_SIZE, download_to_file, stream_to_file, write_atomic
+from .voice_roster import ELEVENLABS, MINIMAX, get_voice_roster
+
 # 加载环境变量
 from dotenv import load_dotenv
 load_dotenv()
@@ -49,19 +52,15 @@ class BaseTTSService(abc.ABC):
 class MiniMaxTTSService(BaseTTSService):
     """MiniMax TTS 服务"""
 
-    # 音色配置
-    VOICE_IDS = {
-        "luoyonghao": "luoyonghao2",
-        "wangziru": "wangziru_test"
-    }
-
     API_KEY = os.getenv("MINIMAX_API_KEY")
     UPLOAD_URL = "https://api.minimaxi.com/v1/files/upload"
     T2A_URL = "https://api.minimaxi.com/v1/t2a_async_v2"
+    T2A_SYNC_URL = "https://api.minimaxi.com/v1/t2a_v2"
     QUERY_URL = "https://api.minimaxi.com/v1/query/t2a_async_query_v2"
 
-    def __init__(self, max_concurrent: int = 5):
+    def __init__(self, max_concurrent: int = 5, inline_max_chars: int = 300):
         self.max_concurrent = max_concurrent
+        self.inline_max_chars = inline_max_chars
         self._init_client()
 
     def _init_client(self):
@@ -73,51 +72,54 @@ class MiniMaxTTSService(BaseTTSService):
         self.semaphore = threading.Semaphore(self.max_concurrent)
 
     def generate(self, text: str, speaker: str, output_path: str) -> str:
-        """同步生成音频（需要上传 + 轮询）"""
-        import tempfile
+        """生成音频：短文本走同步接口，长文本上传 + 轮询"""
+        import io
+        import time
 
-        with self.semaphore:
-            # 上传文本
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-                f.write(text)
-                temp_path = f.name
+        headers = {"Authorization": f"Bearer {self.API_KEY}"}
+        voice_setting = get_voice_roster().voice(speaker, MINIMAX)
+        audio_setting = {
+            "sample_rate": 32000, "format": "mp3", "bitrate": 128000, "channel": 1
+        }
 
-            try:
-                # 上传
-                with open(temp_path, 'rb') as f:
-                    files = {"file": ("text.txt", f)}
-                    data = {"purpose": "t2a_async_input"}
-                    resp = self.requests.post(
-                        self.UPLOAD_URL,
-                        headers={"Authorization": f"Bearer {self.API_KEY}"},
-                        data=data, files=files
-                    )
+        with self.semaphore:
+            if len(text) <= self.inline_max_chars:
+                # 同步接口：文本直接放在请求体里，音频以 hex 返回
+                payload = {
+                    "model": "speech-2.6-hd",
+                    "text": text,
+                    "stream": False,
+                    "voice_setting": voice_setting,
+                    "audio_setting": audio_setting,
+                    "output_format": "hex"
+                }
+                result = self.requests.post(self.T2A_SYNC_URL, headers=headers, json=payload).json()
+                base_resp = result.get("base_resp") or {}
+                if base_resp.get("status_code", 0) != 0:
+                    raise Exception(f"MiniMax 同步合成失败: {base_resp.get('status_msg')}")
+                return write_atomic(bytes.fromhex(result["data"]["audio"]), output_path)
+            else:
+                # 上传（从内存直接上传，不写临时文件）
+                files = {"file": ("text.txt", io.BytesIO(text.encode("utf-8")), "text/plain")}
+                data = {"purpose": "t2a_async_input"}
+                resp = self.requests.post(self.UPLOAD_URL, headers=headers, data=data, files=files)
                 file_id = resp.json()["file"]["file_id"]
 
                 # 创建任务
                 payload = {
                     "model": "speech-2.6-hd",
                     "text_file_id": file_id,
-                    "voice_setting": {
-                        "voice_id": self.VOICE_IDS[speaker],
-                        "speed": 1.0, "vol": 1.0, "pitch": 0
-                    },
-                    "audio_setting": {
-                        "sample_rate": 32000, "format": "mp3", "bitrate": 128000, "channel": 1
-                    }
+                    "voice_setting": voice_setting,
+                    "audio_setting": audio_setting
                 }
-                resp = self.requests.post(
-                    self.T2A_URL,
-                    headers={"Authorization": f"Bearer {self.API_KEY}"},
-                    json=payload
-                )
+                resp = self.requests.post(self.T2A_URL, headers=headers, json=payload)
                 task_id = resp.json().get("task_id")
 
                 # 轮询等待
                 while True:
                     result = self.requests.get(
                         f"{self.QUERY_URL}?task_id={task_id}",
-                        headers={"Authorization": f"Bearer {self.API_KEY}"}
+                        headers=headers
                     ).json()
                     status = result.get("status", "")
                     if status == "Success":
@@ -127,17 +129,9 @@ class MiniMaxTTSService(BaseTTSService):
                         raise Exception(f"MiniMax 任务失败: {task_id}")
                     time.sleep(2)
 
-                # 下载
+                # 流式下载到文件
                 audio_url = f"https://api.minimaxi.com/v1/files/retrieve_content?file_id={file_id}"
-                audio = self.requests.get(audio_url).content
-
-                with open(output_path, 'wb') as f:
-                    f.write(audio)
-
-                return output_path
-
-            finally:
-                os.unlink(temp_path)
+                return download_to_file(audio_url, output_path, headers=headers)
 
     def batch_generate(
         self,
@@ -183,12 +177,6 @@ class MiniMaxTTSService(BaseTTSService):
 class ElevenLabsTTSService(BaseTTSService):
     """ElevenLabs TTS 服务"""
 
-    # 默认音色（可替换为克隆音色 ID）
-    VOICE_IDS = {
-        "luoyonghao": os.getenv("ELEVENLABS_VOICE_LUO", ""),      # 需替换为克隆音色 ID
-        "wangziru": os.getenv("ELEVENLABS_VOICE_ZIRU", "")       # 需替换为克隆音色 ID
-    }
-
     API_KEY = os.getenv("ELEVENLABS_API_KEY")
     BASE_URL = "https://api.elevenlabs.io/v1"
 
@@ -207,9 +195,9 @@ class ElevenLabsTTSService(BaseTTSService):
 
     def generate(self, text: str, speaker: str, output_path: str) -> str:
         """同步生成音频（ElevenLabs 直接返回音频流）"""
-        voice_id = self.VOICE_IDS.get(speaker)
-        if not voice_id:
-            raise ValueError(f"未配置 {speaker} 的 ElevenLabs 音色 ID")
+        # 音色 ID 与参数来自主播名册（未配置时抛出 VoiceNotConfigured）
+        voice_settings = get_voice_roster().voice(speaker, ELEVENLABS)
+        voice_id = voice_settings.pop("voice_id")
 
         url = f"{self.BASE_URL}/text-to-speech/{voice_id}"
 
@@ -222,27 +210,22 @@ class ElevenLabsTTSService(BaseTTSService):
         payload = {
             "text": text,
             "model_id": self.model,
-            "voice_settings": {
-                "stability": 0.5,
-                "similarity_boost": 0.5,
-                "style": 0.0,
-                "use_speaker_boost": True
-            }
+            "voice_settings": voice_settings
         }
 
         max_retries = 3
         for attempt in range(max_retries):
             try:
                 with self.semaphore:
-                    client = self.httpx.Client(timeout=self.timeout)
-                    resp = client.post(url, json=payload, headers=headers)
-                    resp.raise_for_status()
-
-                    with open(output_path, 'wb') as f:
-                        f.write(resp.content)
-
-                    client.close()
-                    return output_path
+                    with self.httpx.Client(timeout=self.timeout) as client:
+                        with client.stream("POST", url, json=payload, headers=headers) as resp:
+                            resp.raise_for_status()
+                            expected = None if resp.headers.get("content-encoding") else resp.headers.get("content-length")
+                            return stream_to_file(
+                                resp.iter_bytes(chunk_size=CHUNK_SIZE),
+                                output_path,
+                                expected_length=expected
+                            )
 
             except Exception as e:
                 print(f"  ⚠️ 尝试 {attempt + 1}/{max_retries} 失败: {e}")
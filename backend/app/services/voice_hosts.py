@@ -0,0 +1,130 @@
+"""Voice roster persistence
+
+Hosts live in the voice_hosts table. At startup the table is seeded with
+the built-in hosts if empty and loaded into the in-memory VoiceRoster used
+by script parsing and TTS; every change through the API reloads it.
+
+With SHARED_STATE_URL set, each change also bumps a roster generation
+counter in the shared store. Other workers compare it with the generation
+they loaded (at most every ROSTER_CHECK_INTERVAL seconds, see
+sync_voice_roster) and re-read the table when it moved.
+"""
+import logging
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.models import VoiceHost
+from app.services.shared_state import get_shared_store
+from app.services.voice_roster import DEFAULT_HOSTS, Host, VoiceRoster, set_voice_roster
+
+logger = logging.getLogger(__name__)
+
+ROSTER_GENERATION_KEY = "voice-roster:generation"
+# Seconds between checks of the shared roster generation
+ROSTER_CHECK_INTERVAL = 2.0
+
+_sync_lock = threading.Lock()
+_loaded_generation: Optional[int] = None
+_last_check = 0.0
+
+
+def seed_voice_hosts(db: Session) -> int:
+    """Insert the built-in hosts into an empty table; returns rows added"""
+    if db.query(VoiceHost).count():
+        return 0
+    for host in DEFAULT_HOSTS:
+        db.add(VoiceHost(**host))
+    db.commit()
+    logger.info(f"Seeded {len(DEFAULT_HOSTS)} voice hosts")
+    return len(DEFAULT_HOSTS)
+
+
+def _shared_generation(store) -> int:
+    value = store.get(ROSTER_GENERATION_KEY)
+    return int(value) if value is not None else 0
+
+
+def reload_voice_roster(db: Session, publish: bool = False) -> VoiceRoster:
+    """
+    Rebuild the in-memory roster from the table and swap it in
+
+    Args:
+        publish: The table was just changed; bump the shared generation so
+            other workers reload too
+    """
+    global _loaded_generation, _last_check
+    store = get_shared_store()
+    generation = None
+    if store is not None:
+        # Read before loading: a change committed meanwhile is picked up on the next check
+        generation = store.incr(ROSTER_GENERATION_KEY) if publish else _shared_generation(store)
+
+    roster = VoiceRoster(
+        Host(
+            key=row.key,
+            name=row.name,
+            aliases=list(row.aliases or []),
+            voices=dict(row.voices or {}),
+            enabled=row.enabled,
+        )
+        for row in db.query(VoiceHost).order_by(VoiceHost.id).all()
+    )
+    set_voice_roster(roster)
+    with _sync_lock:
+        _loaded_generation = generation
+        _last_check = time.monotonic()
+    logger.info(f"Voice roster loaded: {', '.join(roster.hosts) or 'no hosts'}")
+    return roster
+
+
+def roster_check_due() -> bool:
+    """Whether sync_voice_roster would consult the shared store now (no I/O)"""
+    return time.monotonic() - _last_check >= ROSTER_CHECK_INTERVAL
+
+
+def sync_voice_roster(force: bool = False) -> bool:
+    """
+    Reload the roster if another worker changed it
+
+    Cheap to call per request: the shared store is read at most every
+    ROSTER_CHECK_INTERVAL seconds, and only a moved generation touches the
+    database. Without a shared store there is nothing to sync.
+
+    Returns:
+        True if the roster was reloaded
+    """
+    global _last_check
+    with _sync_lock:
+        now = time.monotonic()
+        if not force and now - _last_check < ROSTER_CHECK_INTERVAL:
+            return False
+        _last_check = now
+        loaded = _loaded_generation
+    store = get_shared_store()
+    if store is None or _shared_generation(store) == loaded:
+        return False
+
+    from app.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        reload_voice_roster(db)
+    return True
+
+
+def find_label_conflicts(
+    db: Session,
+    labels: Iterable[str],
+    exclude_id: Optional[int] = None
+) -> List[str]:
+    """Labels already used by another host (a label must map to one speaker)"""
+    wanted = {label.strip() for label in labels if label.strip()}
+    conflicts = []
+    for row in db.query(VoiceHost).all():
+        if row.id == exclude_id:
+            continue
+        taken = {row.name, *(row.aliases or [])}
+        conflicts.extend(sorted(wanted & taken))
+    return conflicts
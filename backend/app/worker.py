@@ -0,0 +1,53 @@
+"""Standalone auto-mode worker
+
+Runs the auto-mode scheduler outside the API process:
+
+    python -m app.worker          # poll forever
+    python -m app.worker --once   # single pass (e.g. from cron)
+
+Leave AUTO_SCHEDULER_ENABLED off in the API when this worker is running.
+"""
+import argparse
+import asyncio
+import logging
+
+from app.db.session import engine, Base, SessionLocal
+from app.db.migrations import upgrade_schema
+from app.db import models  # noqa: F401
+from app.services.auto_scheduler import get_auto_scheduler
+from app.services.podcast import get_podcast_service
+from app.services.voice_hosts import reload_voice_roster
+
+logger = logging.getLogger(__name__)
+
+
+async def main(once: bool = False):
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    with SessionLocal() as db:
+        reload_voice_roster(db)
+
+    podcast_service = get_podcast_service()
+    await podcast_service.startup()
+    scheduler = get_auto_scheduler()
+    try:
+        if once:
+            result = await scheduler.run_once()
+            logger.info(f"Auto-mode pass finished: {result}")
+        else:
+            await scheduler.run_forever()
+    finally:
+        await scheduler.stop()
+        await podcast_service.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Auto-mode ingestion worker")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        asyncio.run(main(once=args.once))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,23 @@
+"""Shared test setup"""
+import os
+import tempfile
+
+# Point the app at a throwaway database before app.db.session builds its
+# engine, so the suite never migrates or writes the developer's database
+_test_db_dir = tempfile.TemporaryDirectory(prefix="podcast-studio-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_test_db_dir.name, 'test.db')}"
+
+import pytest  # noqa: E402
+from app.db.session import engine, Base  # noqa: E402
+from app.db.migrations import upgrade_schema  # noqa: E402
+from app.db import models  # noqa: F401,E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database_schema():
+    """Create the current schema in the test database, as the app lifespan does"""
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    yield
+    engine.dispose()
+    _test_db_dir.cleanup()
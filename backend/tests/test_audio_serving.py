@@ -0,0 +1,98 @@
+"""Tests for range-request audio serving"""
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from app.services.audio_serving import (
+    IMMUTABLE_CACHE, REVALIDATE_CACHE, AudioFileResponse, RangeNotSatisfiable,
+    audio_response, audio_version, parse_range,
+)
+
+CONTENT = bytes(range(256)) * 40  # 10240 bytes
+
+
+class TestAudioServing:
+    """Test Range, ETag and caching behaviour"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        path = tmp_path / "episode.mp3"
+        path.write_bytes(CONTENT)
+        app = FastAPI()
+
+        @app.api_route("/audio", methods=["GET", "HEAD"])
+        def serve(request: Request, v: str = None):
+            return audio_response(str(path), request.headers, version=v, method=request.method)
+
+        return TestClient(app), str(path)
+
+    def test_parse_range(self):
+        """Test open, suffix and clamped ranges; multi-range is ignored"""
+        assert parse_range("bytes=0-99", 1000) == (0, 99)
+        assert parse_range("bytes=900-", 1000) == (900, 999)
+        assert parse_range("bytes=-100", 1000) == (900, 999)
+        assert parse_range("bytes=950-5000", 1000) == (950, 999)
+        assert parse_range("bytes=0-1,5-9", 1000) is None
+        assert parse_range("items=0-1", 1000) is None
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range("bytes=1000-", 1000)
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range("bytes=-100", 0)
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range("bytes=0-", 0)
+
+    def test_range_request(self, client):
+        """Test a seek only transfers the requested bytes"""
+        http, _ = client
+        resp = http.get("/audio", headers={"Range": "bytes=1000-1999"})
+
+        assert resp.status_code == 206
+        assert resp.content == CONTENT[1000:2000]
+        assert resp.headers["content-range"] == f"bytes 1000-1999/{len(CONTENT)}"
+        assert resp.headers["content-length"] == "1000"
+        assert resp.headers["accept-ranges"] == "bytes"
+
+        resp = http.get("/audio", headers={"Range": f"bytes={len(CONTENT)}-"})
+        assert resp.status_code == 416
+        assert resp.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+    def test_etag_and_cache_control(self, client):
+        """Test revalidation, If-Range and immutable versioned URLs"""
+        http, path = client
+        full = http.get("/audio")
+        etag = full.headers["etag"]
+
+        assert full.status_code == 200
+        assert full.content == CONTENT
+        assert full.headers["cache-control"] == REVALIDATE_CACHE
+        assert etag == f'"{audio_version(path)}"'
+
+        assert http.get("/audio", headers={"If-None-Match": etag}).status_code == 304
+        # Stale If-Range: the client gets the whole new file, not a spliced range
+        stale = http.get("/audio", headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+        assert stale.status_code == 200
+
+        versioned = http.get(f"/audio?v={audio_version(path)}")
+        assert versioned.headers["cache-control"] == IMMUTABLE_CACHE
+
+        head = http.head("/audio", headers={"Range": "bytes=0-9"})
+        assert head.status_code == 206
+        assert head.headers["content-length"] == "10"
+        assert head.content == b""
+
+    @pytest.mark.asyncio
+    async def test_zero_copy_send(self, tmp_path):
+        """Test servers advertising zerocopysend receive the file and byte window"""
+        path = tmp_path / "episode.mp3"
+        path.write_bytes(CONTENT)
+        response = AudioFileResponse(str(path), 206, byte_range=(100, 199), size=len(CONTENT))
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "extensions": {"http.response.zerocopysend": {}}}
+        await response(scope, None, send)
+
+        body = messages[1]
+        assert body["type"] == "http.response.zerocopysend"
+        assert (body["offset"], body["count"]) == (100, 100)
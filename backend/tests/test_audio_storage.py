@@ -0,0 +1,127 @@
+"""Tests for the isolated audio storage layout"""
+import asyncio
+import os
+import time
+import pytest
+from app.services.audio_storage import AudioStorage
+from app.services.podcast import PodcastService
+from app.services.tts import Dialogue
+
+
+class FakeTTS:
+    """Writes each line's text as its 'audio' so outputs can be told apart"""
+
+    def parse_script(self, script):
+        return [Dialogue(speaker="luoyonghao", text=line, index=i) for i, line in enumerate(script.split("\n"))]
+
+    def plan_segments(self, dialogues):
+        return dialogues
+
+    def batch_generate(self, segments, output_dir, skip_existing=True, progress=None):
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        for d in segments:
+            path = os.path.join(output_dir, f"part_{d.index + 1:03d}.mp3")
+            with open(path, "w") as f:
+                f.write(d.text)
+            paths.append(path)
+            time.sleep(0.01)
+        return paths
+
+    def merge_audio(self, parts, output_path, skip_existing=True, progress=None):
+        with open(output_path, "w") as f:
+            f.write("|".join(open(p).read() for p in parts))
+        return True
+
+
+class TestAudioStorage:
+    """Test per-item paths, atomic commits and garbage collection"""
+
+    def test_commit_is_content_addressed(self, tmp_path):
+        """Test files land under episode/news keyed by hash, identical content stored once"""
+        storage = AudioStorage(str(tmp_path))
+        paths = []
+        for _ in range(2):
+            with storage.workspace(1, 7) as work:
+                temp = os.path.join(work, "merged.mp3")
+                with open(temp, "wb") as f:
+                    f.write(b"same audio")
+                paths.append(storage.commit(1, 7, temp))
+
+        assert paths[0] == paths[1]
+        assert os.path.dirname(paths[0]) == os.path.join(str(tmp_path), "1", "7")
+        assert os.listdir(os.path.dirname(paths[0])) == [os.path.basename(paths[0])]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_generation_is_isolated(self, tmp_path):
+        """Test simultaneous jobs for different news items never share files"""
+        service = PodcastService()
+        service.tts = FakeTTS()
+        service.storage = AudioStorage(str(tmp_path))
+
+        first, second = await asyncio.gather(
+            service.generate_audio("a1\na2", episode_id=1, episode_news_id=10),
+            service.generate_audio("b1\nb2", episode_id=1, episode_news_id=11),
+        )
+
+        assert open(first).read() == "a1|a2"
+        assert open(second).read() == "b1|b2"
+        assert "/1/10/" in first and "/1/11/" in second
+        # Scratch directories are gone
+        assert sorted(os.listdir(tmp_path / "1" / "10")) == [os.path.basename(first)]
+
+    @pytest.mark.asyncio
+    async def test_explicit_output_path_replaced_atomically(self, tmp_path):
+        """Test an explicit destination is swapped in whole, leaving no temp files behind"""
+        service = PodcastService()
+        service.tts = FakeTTS()
+        service.storage = AudioStorage(str(tmp_path / "store"))
+        output = tmp_path / "out" / "episode.mp3"
+        output.parent.mkdir()
+        output.write_text("old")
+
+        path = await service.generate_audio("a1\na2", output_path=str(output), episode_id=1, episode_news_id=10)
+
+        assert path == str(output)
+        assert output.read_text() == "a1|a2"
+        assert os.listdir(output.parent) == ["episode.mp3"]
+
+    def test_collect_garbage(self, tmp_path):
+        """Test unreferenced files and stale scratch dirs go, referenced and fresh ones stay"""
+        storage = AudioStorage(str(tmp_path))
+        item = storage.item_dir(2, 5)
+        os.makedirs(os.path.join(item, ".work-stale"))
+        old_time = time.time() - 7200
+        for name in ("current.mp3", "previous.mp3"):
+            with open(os.path.join(item, name), "wb") as f:
+                f.write(name.encode())
+            os.utime(os.path.join(item, name), (old_time, old_time))
+        os.utime(os.path.join(item, ".work-stale"), (old_time, old_time))
+        with open(os.path.join(item, "just-committed.mp3"), "wb") as f:
+            f.write(b"new")
+
+        current = os.path.join(item, "current.mp3")
+        report = storage.collect_garbage([current], dry_run=True)
+        assert len(report.removed) == 2 and os.path.exists(os.path.join(item, "previous.mp3"))
+
+        result = storage.collect_garbage([current])
+
+        assert sorted(os.listdir(item)) == ["current.mp3", "just-committed.mp3"]
+        assert result.freed_bytes == len(b"previous.mp3")
+        assert result.kept == 2
+
+    def test_live_workspace_survives_gc(self, tmp_path):
+        """Test a long job's scratch dir is kept while its heartbeat runs, however old its mtime"""
+        storage = AudioStorage(str(tmp_path), heartbeat_seconds=0.05)
+        old_time = time.time() - 7200
+
+        with storage.workspace(3, 9) as work:
+            for path in (work, os.path.join(work, ".heartbeat")):
+                os.utime(path, (old_time, old_time))
+            time.sleep(0.2)
+
+            result = storage.collect_garbage([], grace_seconds=60)
+
+            assert result.removed == []
+            assert os.path.isdir(work)
+        assert not os.path.exists(work)
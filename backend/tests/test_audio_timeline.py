@@ -0,0 +1,99 @@
+"""Tests for audio timeline and loudness caching"""
+import pytest
+from app.services import audio_timeline
+from app.services.audio_timeline import AudioTimeline, concat_list, load_manifest
+
+# MPEG1 Layer III, 128 kbps, 44.1 kHz -> 417 bytes / 1152 samples per frame
+FRAME = bytes([0xFF, 0xFB, 0x90, 0x00]) + b"\x00" * 413
+
+
+class TestAudioTimeline:
+    """Test segment measurement and gain offsets"""
+
+    @pytest.fixture
+    def segments(self, tmp_path):
+        paths = []
+        for i, frames in enumerate([10, 20], start=1):
+            path = tmp_path / f"part_{i:03d}.mp3"
+            path.write_bytes(FRAME * frames + bytes([i]))
+            paths.append(str(path))
+        return paths
+
+    def test_offsets_and_gain(self, tmp_path, segments, monkeypatch):
+        """Test start offsets come from frame counts and gain from loudness"""
+        loudness = {segments[0]: -20.0, segments[1]: -14.0}
+        monkeypatch.setattr(audio_timeline, "measure_loudness", lambda p: loudness[p])
+
+        timeline = AudioTimeline.build(segments, str(tmp_path), target_lufs=-16.0)
+
+        assert timeline.entries[0].start == 0.0
+        assert timeline.entries[1].start == pytest.approx(10 * 1152 / 44100)
+        assert timeline.total_duration == pytest.approx(30 * 1152 / 44100)
+        assert timeline.entries[0].gain_db == pytest.approx(4.0)
+        assert timeline.entries[1].gain_db == pytest.approx(-2.0)
+
+    def test_analysis_cached_by_hash(self, tmp_path, segments, monkeypatch):
+        """Test re-render reads cached loudness instead of re-analysing"""
+        calls = []
+
+        def fake_measure(path):
+            calls.append(path)
+            return -18.0
+
+        monkeypatch.setattr(audio_timeline, "measure_loudness", fake_measure)
+
+        AudioTimeline.build(segments, str(tmp_path))
+        AudioTimeline.build(segments, str(tmp_path))
+
+        assert len(calls) == 2
+        assert len(load_manifest(str(tmp_path))["analyses"]) == 2
+
+    def test_normalize_command_applies_gain(self, tmp_path, segments, monkeypatch):
+        """Test each segment is transcoded on its own with its gain"""
+        monkeypatch.setattr(audio_timeline, "measure_loudness", lambda p: -19.0)
+
+        timeline = AudioTimeline.build(segments, str(tmp_path))
+        cmd = timeline.normalize_command(timeline.entries[0], "out.mp3")
+        audio_filter = cmd[cmd.index("-af") + 1]
+
+        assert cmd.count("-i") == 1
+        assert audio_filter.startswith("volume=3.00dB,")
+        assert timeline.normalized_name(timeline.entries[0]).endswith("_+3.00dB.mp3")
+
+    def test_render_uses_concat_demuxer(self, tmp_path, segments, monkeypatch):
+        """Test render opens one input per command and reuses normalized segments"""
+        monkeypatch.setattr(audio_timeline, "measure_loudness", lambda p: -19.0)
+        commands = []
+        lists = []
+
+        class Result:
+            returncode = 0
+            stderr = ""
+
+        def fake_run(cmd, **kwargs):
+            commands.append(cmd)
+            if "concat" in cmd:
+                with open(cmd[cmd.index("-i") + 1], encoding="utf-8") as f:
+                    lists.append(f.read())
+            with open(cmd[-1], "wb") as f:
+                f.write(b"mp3")
+            return Result()
+
+        monkeypatch.setattr(audio_timeline.subprocess, "run", fake_run)
+        timeline = AudioTimeline.build(segments, str(tmp_path))
+
+        assert timeline.render(str(tmp_path / "out.mp3"))
+        assert all(cmd.count("-i") == 1 for cmd in commands)
+        assert len(commands) == 3
+        cached = [str(tmp_path / "normalized" / timeline.normalized_name(e)) for e in timeline.entries]
+        assert lists == ["".join(f"file '{path}'\n" for path in cached)]
+        assert (tmp_path / "out.mp3").read_bytes() == b"mp3"
+        assert not [p for p in tmp_path.rglob("*") if p.name.endswith((".part.mp3", ".concat.txt"))]
+
+        commands.clear()
+        assert timeline.render(str(tmp_path / "out.mp3"))
+        assert len(commands) == 1
+
+    def test_concat_list_escapes_quotes(self):
+        """Test single quotes in paths are escaped for the concat demuxer"""
+        assert concat_list(["/a/it's.mp3"]) == "file '/a/it'\\''s.mp3'\n"
@@ -0,0 +1,75 @@
+"""Tests for audio file utilities"""
+import os
+import pytest
+from app.services.audio_utils import (
+    AudioIntegrityError,
+    parse_frame_header,
+    scan_mp3,
+    stream_to_file,
+    write_atomic,
+)
+
+# MPEG1 Layer III, 128 kbps, 44.1 kHz, no padding -> 417 bytes per frame
+FRAME_HEADER = bytes([0xFF, 0xFB, 0x90, 0x00])
+FRAME = FRAME_HEADER + b"\x00" * 413
+
+
+def make_mp3(frames: int) -> bytes:
+    return FRAME * frames
+
+
+class TestMP3Scan:
+    """Test MP3 frame scanning"""
+
+    def test_parse_frame_header(self):
+        """Test frame length and sample count from header"""
+        assert parse_frame_header(FRAME_HEADER) == (417, 1152, 44100)
+        assert parse_frame_header(b"TAG\x00") is None
+
+    def test_duration_from_frame_count(self, tmp_path):
+        """Test duration is derived from frame count"""
+        path = tmp_path / "ok.mp3"
+        path.write_bytes(b"ID3\x03\x00\x00\x00\x00\x00\x05" + b"\x00" * 5 + make_mp3(10))
+
+        info = scan_mp3(str(path))
+
+        assert info.frames == 10
+        assert not info.truncated
+        assert info.duration == pytest.approx(10 * 1152 / 44100)
+
+    def test_truncated_file_detected(self, tmp_path):
+        """Test a cut-off last frame is reported as truncated"""
+        path = tmp_path / "cut.mp3"
+        path.write_bytes(make_mp3(3)[:-100])
+
+        assert scan_mp3(str(path)).truncated
+
+
+class TestAtomicWrite:
+    """Test streaming writes"""
+
+    def test_write_atomic(self, tmp_path):
+        """Test valid audio is renamed into place"""
+        path = str(tmp_path / "part_001.mp3")
+        write_atomic(make_mp3(2), path)
+
+        assert os.path.getsize(path) == 2 * 417
+        assert os.listdir(tmp_path) == ["part_001.mp3"]
+
+    def test_length_mismatch_rejected(self, tmp_path):
+        """Test short downloads leave no file behind"""
+        path = str(tmp_path / "part_001.mp3")
+
+        with pytest.raises(AudioIntegrityError):
+            stream_to_file([make_mp3(2)], path, expected_length=2 * 417 + 10)
+
+        assert os.listdir(tmp_path) == []
+
+    def test_truncated_rejected(self, tmp_path):
+        """Test truncated audio is rejected"""
+        path = str(tmp_path / "part_001.mp3")
+
+        with pytest.raises(AudioIntegrityError):
+            write_atomic(make_mp3(2)[:-1], path)
+
+        assert not os.path.exists(path)
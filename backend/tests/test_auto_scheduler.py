@@ -0,0 +1,260 @@
+"""Tests for the auto-mode scheduler"""
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.db.base import Base
+from app.db.models import EpisodeNews, News, NewsStatus, RSSSource
+from app.services.auto_scheduler import (
+    AutoScheduler, auto_episode, cluster_news, next_interval, observed_gap, parse_published
+)
+from app.services import shared_state
+from app.services.rss import RSSItem
+
+NOW = datetime(2026, 2, 5, 8, 0, 0)
+
+
+class FakeFetcher:
+    def __init__(self, feeds):
+        self.feeds = feeds
+        self.calls = []
+
+    async def fetch(self, url, limit=20):
+        self.calls.append(url)
+        feed = self.feeds[url]
+        if isinstance(feed, Exception):
+            raise feed
+        return feed[:limit]
+
+
+class FakeLLM:
+    model = "fake"
+
+
+class FakePodcastService:
+    llm = FakeLLM()
+
+    def __init__(self, on_request=None):
+        self.requests = []
+        self.on_request = on_request
+
+    async def generate_script(self, news_content, progress=None, **kwargs):
+        self.requests.append(news_content)
+        if self.on_request:
+            self.on_request()
+        return "**彪悍罗**: 大家好\n\n**王子如**: 今天聊聊"
+
+
+def _item(title, url, hours_ago=None):
+    published = None
+    if hours_ago is not None:
+        published = (NOW - timedelta(hours=hours_ago)).strftime("%a, %d %b %Y %H:%M:%S +0000")
+    return RSSItem(title=title, url=url, summary=title * 20, published_at=published)
+
+
+class TestPollInterval:
+    """Test per-source interval adaptation"""
+
+    def test_parse_published(self):
+        """Test RSS and Atom dates become naive UTC"""
+        assert parse_published("Thu, 05 Feb 2026 16:00:00 +0800") == datetime(2026, 2, 5, 8, 0)
+        assert parse_published("2026-02-05T08:00:00Z") == datetime(2026, 2, 5, 8, 0)
+        assert parse_published("not a date") is None
+        assert parse_published(None) is None
+
+    def test_observed_gap(self):
+        """Test the median gap ignores missing dates"""
+        times = [NOW, NOW - timedelta(hours=2), None, NOW - timedelta(hours=3)]
+        assert observed_gap(times) == 5400
+        assert observed_gap([NOW]) is None
+
+    def test_active_feed_follows_cadence(self):
+        """Test a feed with new items is polled at half its publishing gap"""
+        published = [NOW - timedelta(hours=h) for h in (0, 1, 2, 3)]
+        assert next_interval(7200, 3, published) == 1800
+
+    def test_clamped_to_bounds(self):
+        """Test intervals stay within the configured range"""
+        burst = [NOW - timedelta(minutes=m) for m in (0, 1, 2)]
+        assert next_interval(3600, 2, burst) == settings.AUTO_MIN_INTERVAL
+        assert next_interval(settings.AUTO_MAX_INTERVAL, 0) == settings.AUTO_MAX_INTERVAL
+
+    def test_quiet_feed_backs_off(self):
+        """Test a fetch with nothing new lengthens the interval"""
+        assert next_interval(3600, 0) == int(3600 * settings.AUTO_BACKOFF_FACTOR)
+        assert next_interval(None, 0) == int(settings.AUTO_DEFAULT_INTERVAL * settings.AUTO_BACKOFF_FACTOR)
+
+    def test_undated_feed_halves(self):
+        """Test feeds without pubDates halve the interval on new items"""
+        assert next_interval(7200, 1, [None, None]) == 3600
+
+
+class TestClustering:
+    """Test grouping of the same story across feeds"""
+
+    def test_same_story_grouped(self):
+        """Test similar titles share a cluster led by the best-scored item"""
+        a = News(title="英伟达发布新一代AI芯片", score=70)
+        b = News(title="英伟达发布新一代AI芯片 性能提升三倍", score=85)
+        c = News(title="苹果推出新款 MacBook", score=60)
+
+        clusters = cluster_news([a, b, c])
+
+        assert [len(cl) for cl in clusters] == [2, 1]
+        assert clusters[0][0] is b
+        assert clusters[1][0] is c
+
+
+class TestAutoScheduler:
+    """Test scheduled polling and script pre-generation"""
+
+    @pytest.fixture
+    def session_factory(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        return sessionmaker(bind=engine)
+
+    def _scheduler(self, session_factory, feeds, clock=lambda: NOW):
+        return AutoScheduler(
+            session_factory=session_factory,
+            fetcher=FakeFetcher(feeds),
+            podcast_service=FakePodcastService(),
+            clock=clock
+        )
+
+    def _add_source(self, session_factory, url, **kwargs):
+        with session_factory() as db:
+            source = RSSSource(name=url, url=url, auto_mode=True, **kwargs)
+            db.add(source)
+            db.commit()
+            return source.id
+
+    def test_polls_only_due_auto_sources(self, session_factory):
+        """Test manual-mode, disabled and not-yet-due sources are skipped"""
+        self._add_source(session_factory, "due")
+        self._add_source(session_factory, "later", next_fetch_at=NOW + timedelta(minutes=5))
+        self._add_source(session_factory, "disabled", enabled=False)
+        with session_factory() as db:
+            db.add(RSSSource(name="manual", url="manual", auto_mode=False))
+            db.commit()
+        scheduler = self._scheduler(session_factory, {"due": []})
+
+        result = asyncio.run(scheduler.run_once())
+
+        assert scheduler.fetcher.calls == ["due"]
+        assert result.polled == ["due"]
+
+    def test_schedules_next_fetch(self, session_factory):
+        """Test a quiet source is pushed back and a failing one is not retried at once"""
+        quiet_id = self._add_source(session_factory, "quiet", fetch_interval=3600)
+        broken_id = self._add_source(session_factory, "broken", fetch_interval=3600)
+        scheduler = self._scheduler(session_factory, {"quiet": [], "broken": IOError("timeout")})
+
+        result = asyncio.run(scheduler.run_once())
+
+        assert result.failed == ["broken"]
+        with session_factory() as db:
+            for source_id in (quiet_id, broken_id):
+                source = db.get(RSSSource, source_id)
+                assert source.fetch_interval == 5400
+                assert source.last_fetched_at == NOW
+                assert source.next_fetch_at == NOW + timedelta(seconds=5400)
+
+    def test_pregenerates_top_stories(self, session_factory, monkeypatch):
+        """Test new stories are deduplicated across feeds and scripted once"""
+        monkeypatch.setattr(settings, "AUTO_MIN_SCORE", 0)
+        monkeypatch.setattr(settings, "AUTO_TOP_ITEMS", 2)
+        self._add_source(session_factory, "a")
+        self._add_source(session_factory, "b")
+        scheduler = self._scheduler(session_factory, {
+            "a": [_item("英伟达发布新一代AI芯片", "https://a/1", 1), _item("苹果推出新款 MacBook", "https://a/2", 2)],
+            "b": [_item("英伟达发布新一代AI芯片", "https://b/1", 1), _item("特斯拉召回部分车型", "https://b/2", 3)],
+        })
+
+        result = asyncio.run(scheduler.run_once())
+
+        assert result.new_items == 4
+        assert result.clusters == 3
+        assert len(result.pregenerated) == 2
+        assert len(scheduler.podcast_service.requests) == 2
+        with session_factory() as db:
+            episode = auto_episode(db, NOW.date())
+            rows = db.query(EpisodeNews).filter(EpisodeNews.episode_id == episode.id).all()
+            assert len(rows) == 2
+            assert all(en.status == NewsStatus.SCRIPT_DONE for en in rows)
+            assert all(en.script_json for en in rows)
+            titles = [en.news.title for en in rows]
+            assert titles.count("英伟达发布新一代AI芯片") == 1
+
+    def test_known_items_not_regenerated(self, session_factory, monkeypatch):
+        """Test a second pass over the same feed adds nothing"""
+        monkeypatch.setattr(settings, "AUTO_MIN_SCORE", 0)
+        self._add_source(session_factory, "a")
+        clock = [NOW]
+        scheduler = self._scheduler(
+            session_factory, {"a": [_item("英伟达发布新一代AI芯片", "https://a/1", 1)]}, clock=lambda: clock[0]
+        )
+
+        asyncio.run(scheduler.run_once())
+        clock[0] = NOW + timedelta(days=1)
+        result = asyncio.run(scheduler.run_once())
+
+        assert result.new_items == 0
+        assert len(scheduler.podcast_service.requests) == 1
+        with session_factory() as db:
+            assert db.query(News).count() == 1
+
+    def test_single_pass_across_workers(self, session_factory, monkeypatch):
+        """Test a pass is skipped while another worker holds the shared lease"""
+        store = shared_state.MemoryStore()
+        monkeypatch.setattr(shared_state, "_store", store)
+        monkeypatch.setattr(shared_state, "_store_loaded", True)
+        self._add_source(session_factory, "a")
+        scheduler = self._scheduler(session_factory, {"a": []})
+
+        lease = shared_state.try_acquire(store, "auto-scheduler:pass", 1)
+        assert asyncio.run(scheduler.run_once()).skipped
+        assert scheduler.fetcher.calls == []
+
+        shared_state.release(store, "auto-scheduler:pass", lease)
+        result = asyncio.run(scheduler.run_once())
+        assert not result.skipped
+        assert scheduler.fetcher.calls == ["a"]
+        assert store.zcard("auto-scheduler:pass") == 0
+
+    def test_lease_refreshed_during_pass(self, session_factory, monkeypatch):
+        """Test the lease is extended before each script and a lost lease stops the pass"""
+        store = shared_state.MemoryStore()
+        monkeypatch.setattr(shared_state, "_store", store)
+        monkeypatch.setattr(shared_state, "_store_loaded", True)
+        monkeypatch.setattr(settings, "AUTO_MIN_SCORE", 0)
+        self._add_source(session_factory, "a")
+        feeds = {"a": [_item("英伟达发布新一代AI芯片", "https://a/1", 1), _item("苹果推出新款 MacBook", "https://a/2", 2)]}
+        scheduler = self._scheduler(session_factory, feeds)
+        expiries = []
+        scheduler.podcast_service.on_request = lambda: expiries.append(
+            max(store._zsets["auto-scheduler:pass"].values())
+        )
+
+        result = asyncio.run(scheduler.run_once())
+
+        assert len(result.pregenerated) == 2
+        assert expiries[1] > expiries[0]
+
+    def test_lost_lease_stops_pass(self, session_factory, monkeypatch):
+        """Test a pass whose lease expired does not keep generating"""
+        store = shared_state.MemoryStore()
+        monkeypatch.setattr(shared_state, "_store", store)
+        monkeypatch.setattr(shared_state, "_store_loaded", True)
+        monkeypatch.setattr(settings, "AUTO_MIN_SCORE", 0)
+        self._add_source(session_factory, "a")
+        feeds = {"a": [_item("英伟达发布新一代AI芯片", "https://a/1", 1), _item("苹果推出新款 MacBook", "https://a/2", 2)]}
+        scheduler = self._scheduler(session_factory, feeds)
+        scheduler.podcast_service.on_request = lambda: store.zremrangebyscore("auto-scheduler:pass", "-inf", "+inf")
+
+        result = asyncio.run(scheduler.run_once())
+
+        assert len(result.pregenerated) == 1
+        assert len(scheduler.podcast_service.requests) == 1
@@ -0,0 +1,114 @@
+"""Tests for the paginated episode overview"""
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.db.base import Base
+from app.db.models import Episode, EpisodeNews, EpisodeStatus, News, NewsStatus
+from app.db.session import get_db
+from app.main import app
+
+
+class TestEpisodeOverview:
+    """Test episode listing with per-episode news aggregates"""
+
+    @pytest.fixture
+    def engine(self):
+        engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        Base.metadata.create_all(bind=engine)
+        return engine
+
+    @pytest.fixture
+    def client(self, engine):
+        session_factory = sessionmaker(bind=engine)
+
+        def override_get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        yield TestClient(app)
+        app.dependency_overrides.pop(get_db, None)
+
+    @pytest.fixture
+    def episodes(self, engine):
+        with sessionmaker(bind=engine)() as db:
+            news = [News(title=f"news {i}", url=f"https://n/{i}") for i in range(4)]
+            first = Episode(title="first", scheduled_date=datetime(2026, 2, 3, 12))
+            second = Episode(
+                title="second", status=EpisodeStatus.PUBLISHED, scheduled_date=datetime(2026, 2, 10, 12)
+            )
+            later = Episode(title="later", scheduled_date=datetime(2026, 3, 2, 12))
+            db.add_all(news + [first, second, later])
+            db.flush()
+            db.add_all([
+                EpisodeNews(episode_id=first.id, news_id=news[0].id, status=NewsStatus.AUDIO_DONE,
+                            script="abcd", audio_duration=30.5),
+                EpisodeNews(episode_id=first.id, news_id=news[1].id, status=NewsStatus.SCRIPT_DONE,
+                            script="abcdef"),
+                EpisodeNews(episode_id=first.id, news_id=news[2].id, status=NewsStatus.PENDING),
+                EpisodeNews(episode_id=first.id, news_id=news[3].id, status=NewsStatus.AUDIO_DONE,
+                            script="deleted", audio_duration=99, deleted_at=datetime(2026, 2, 4)),
+                EpisodeNews(episode_id=second.id, news_id=news[3].id, status=NewsStatus.AUDIO_DONE,
+                            script="xy", audio_duration=12.25),
+            ])
+            db.commit()
+            return {"first": first.id, "second": second.id, "later": later.id}
+
+    def test_aggregates(self, client, episodes):
+        """Test news counts, script length and duration per episode, soft-deleted news excluded"""
+        response = client.get("/api/v1/episodes/overview")
+        assert response.status_code == 200
+        page = response.json()
+
+        assert page["total"] == 3
+        assert page["status_counts"] == {"draft": 2, "editing": 0, "published": 1}
+        assert [item["title"] for item in page["items"]] == ["later", "second", "first"]
+
+        later, second, first = page["items"]
+        assert first["news_total"] == 3
+        assert first["news_counts"] == {
+            "pending": 1, "generating": 0, "script_done": 1, "audio_done": 1, "error": 0
+        }
+        assert first["script_chars"] == 10
+        assert first["audio_duration"] == 30.5
+        assert second["news_counts"]["audio_done"] == 1
+        assert second["audio_duration"] == 12.25
+        assert later["news_total"] == 0
+        assert later["news_counts"]["pending"] == 0
+        assert later["audio_duration"] == 0.0
+
+    def test_filters_and_pagination(self, client, episodes):
+        """Test date range, status filter and paging; status counts follow the date range only"""
+        page = client.get(
+            "/api/v1/episodes/overview",
+            params={"date_from": "2026-02-01T00:00:00", "date_to": "2026-03-01T00:00:00", "limit": 1}
+        ).json()
+        assert page["total"] == 2
+        assert [item["id"] for item in page["items"]] == [episodes["second"]]
+        assert page["status_counts"] == {"draft": 1, "editing": 0, "published": 1}
+
+        page = client.get(
+            "/api/v1/episodes/overview",
+            params={"date_from": "2026-02-01T00:00:00", "limit": 1, "offset": 1, "status": "draft"}
+        ).json()
+        assert page["total"] == 2
+        assert [item["id"] for item in page["items"]] == [episodes["first"]]
+        assert page["status_counts"] == {"draft": 2, "editing": 0, "published": 1}
+
+    def test_single_query_for_items(self, client, engine, episodes):
+        """Test the page costs a fixed number of queries regardless of episode count"""
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        client.get("/api/v1/episodes/overview")
+
+        selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == 3  # count, page with aggregates, status counts
@@ -0,0 +1,67 @@
+"""Tests for API import cost (python -X importtime)"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Preloaded first, so the measured time covers only the app's own import work
+FRAMEWORK_IMPORTS = "fastapi, fastapi.routing, sqlalchemy, sqlalchemy.orm, pydantic_settings, dotenv, starlette.responses"
+
+# Loaded on first use or in the lifespan, never by importing the app
+DEFERRED_MODULES = {"openai", "httpx", "requests", "boto3"}
+
+# Importing app.main took ~950ms before services were made lazy, ~400ms after.
+# The default leaves ~2.5x headroom for slow machines; each attempt runs in a
+# fresh interpreter and the best of IMPORT_ATTEMPTS counts, so one noisy run
+# does not fail the suite
+APP_IMPORT_BUDGET_MS = float(os.getenv("APP_IMPORT_BUDGET_MS", "1000"))
+IMPORT_ATTEMPTS = 3
+
+
+def _import_app():
+    code = (
+        f"import {FRAMEWORK_IMPORTS}\n"
+        "import app.main\n"
+        "import app.services.podcast as podcast\n"
+        "print(podcast._podcast_service is None)\n"
+    )
+    env = dict(os.environ, DEEPSEEK_API_KEY="sk-test", MINIMAX_API_KEY="test")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return result.stdout.strip(), times
+
+
+class TestImportTime:
+    """Test importing the API stays cheap"""
+
+    def test_app_import(self):
+        """Test heavy clients are deferred and no service is built"""
+        service_unset, times = _import_app()
+
+        assert service_unset == "True"
+        assert not DEFERRED_MODULES & set(times)
+
+    def test_import_budget(self):
+        """Test importing app.main stays within APP_IMPORT_BUDGET_MS"""
+        best = None
+        for _ in range(IMPORT_ATTEMPTS):
+            _, times = _import_app()
+            elapsed = times["app.main"] / 1000
+            best = elapsed if best is None else min(best, elapsed)
+            if best < APP_IMPORT_BUDGET_MS:
+                break
+
+        assert best < APP_IMPORT_BUDGET_MS, f"app.main took {best:.0f}ms (budget {APP_IMPORT_BUDGET_MS:.0f}ms)"
@@ -71,3 +71,197 @@ class TestDeepSeekService:
         assert script is not None
         assert len(script) > 0
         print(f"\nGenerated script: {script[:200]}...")
+
+
+class TestScriptMessages:
+    """Test prefix-stable message layout"""
+
+    def test_static_prefix_is_identical(self):
+        """Test that different news share a byte-identical prefix"""
+        from app.services.llm import build_script_messages
+
+        a = build_script_messages("苹果发布iPhone 16 Pro")
+        b = build_script_messages("特斯拉发布新款Model Y", role_prompt="多聊聊续航")
+
+        assert a[0] == b[0]
+        assert "彪悍罗" in a[0]["content"]
+
+        rules_a, rules_b = a[1]["content"], b[1]["content"]
+        prefix_len = rules_a.index("新闻素材：")
+        assert rules_b[:prefix_len] == rules_a[:prefix_len]
+
+    def test_variable_content_last(self):
+        """Test that news and custom instructions come after the rules"""
+        from app.services.llm import build_script_messages
+
+        messages = build_script_messages("苹果发布iPhone 16 Pro", role_prompt="多聊聊价格")
+        user = messages[1]["content"]
+
+        assert user.endswith("苹果发布iPhone 16 Pro")
+        assert user.index("要求：") < user.index("补充要求：") < user.index("新闻素材：")
+
+    def test_json_mode_format_in_static_prefix(self):
+        """Test JSON mode asks for turns before the per-item content"""
+        from app.services.llm import build_script_messages
+
+        user = build_script_messages("苹果发布iPhone 16 Pro", json_mode=True)[1]["content"]
+
+        assert "JSON" in user
+        assert user.index('"turns"') < user.index("新闻素材：")
+
+
+class TestJSONModeScript:
+    """Test how JSON-mode output becomes the stored script"""
+
+    class _FakeLLM:
+        model = "fake"
+
+        def __init__(self, text):
+            self.text = text
+
+        async def agenerate_messages(self, messages, **kwargs):
+            from app.services.llm import LLMResponse
+            return LLMResponse(text=self.text)
+
+    def _generate(self, text):
+        import asyncio
+        from app.services.podcast import PodcastService
+
+        service = PodcastService()
+        service.llm = self._FakeLLM(text)
+        return asyncio.run(service.generate_script("苹果发布iPhone 16 Pro", json_mode=True))
+
+    def test_json_rendered_as_markdown(self):
+        """Test valid turns are rendered to the markdown script format"""
+        script = self._generate('{"turns": [{"speaker": "彪悍罗", "text": "你好"}]}')
+
+        assert script == "**彪悍罗：**你好"
+
+    def test_non_json_falls_back_to_text(self):
+        """Test output that is not JSON at all is kept as markdown"""
+        assert self._generate("**彪悍罗：**你好") == "**彪悍罗：**你好"
+
+    def test_unknown_speaker_fails(self):
+        """Test valid JSON with an unknown speaker fails instead of storing raw JSON"""
+        with pytest.raises(RuntimeError, match="路人"):
+            self._generate('{"turns": [{"speaker": "路人", "text": "hi"}]}')
+
+
+class TestAsyncClient:
+    """Test the pooled async client, health probe and cancellation"""
+
+    class _FakeModels:
+        def __init__(self):
+            self.calls = 0
+
+        async def list(self, timeout=None):
+            self.calls += 1
+            return []
+
+    class _FakeCompletions:
+        def __init__(self):
+            self.kwargs = None
+
+        async def create(self, **kwargs):
+            from types import SimpleNamespace
+            self.kwargs = kwargs
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content="**彪悍罗：**你好"))],
+                usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15),
+            )
+
+    @pytest.fixture
+    def service(self):
+        from types import SimpleNamespace
+        service = DeepSeekService(api_key="sk-test", timeout=30)
+        service._async_client = SimpleNamespace(
+            models=self._FakeModels(),
+            chat=SimpleNamespace(completions=self._FakeCompletions()),
+        )
+        return service
+
+    @pytest.mark.asyncio
+    async def test_probe_is_cached(self, service):
+        """Test the status probe lists models once per TTL instead of completing"""
+        assert (await service.probe())["connected"] is True
+        await service.probe()
+        assert service._async_client.models.calls == 1
+
+        await service.probe(force=True)
+        assert service._async_client.models.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_agenerate_passes_timeout(self, service):
+        """Test per-call timeouts reach the request, defaulting to the service timeout"""
+        completions = service._async_client.chat.completions
+
+        response = await service.agenerate_messages([{"role": "user", "content": "hi"}])
+        assert response.text == "**彪悍罗：**你好"
+        assert completions.kwargs["timeout"] == 30
+
+        await service.agenerate_messages([{"role": "user", "content": "hi"}], timeout=5)
+        assert completions.kwargs["timeout"] == 5
+
+    @pytest.mark.asyncio
+    async def test_requests_share_deepseek_limiter(self, service):
+        """Test sync and async calls take a slot from the process-wide DeepSeek limiter"""
+        import asyncio
+        from types import SimpleNamespace
+        from app.services.rate_limit import DEEPSEEK, RateLimiter, set_rate_limiter
+
+        active, peak = [0], [0]
+        reply = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+            usage=SimpleNamespace(prompt_tokens=1, completion_tokens=1, total_tokens=2),
+        )
+
+        async def create(**kwargs):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.02)
+            active[0] -= 1
+            return reply
+
+        service._async_client.chat.completions.create = create
+        service._client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: reply))
+        )
+        limiter = RateLimiter(DEEPSEEK, max_concurrent=1)
+        set_rate_limiter(DEEPSEEK, limiter)
+        try:
+            messages = [{"role": "user", "content": "hi"}]
+            await asyncio.gather(*(service.agenerate_messages(messages) for _ in range(3)))
+            service.generate_messages(messages)
+        finally:
+            set_rate_limiter(DEEPSEEK, None)
+
+        assert peak[0] == 1
+        assert limiter.requests == 4
+
+    @pytest.mark.asyncio
+    async def test_cancel_on_disconnect(self):
+        """Test generation is cancelled when the client goes away"""
+        import asyncio
+        from app.api.v1.endpoints import episodes
+
+        class FakeRequest:
+            async def is_disconnected(self):
+                return True
+
+        cancelled = asyncio.Event()
+
+        async def slow_generation():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        episodes.DISCONNECT_POLL_INTERVAL, original = 0.01, episodes.DISCONNECT_POLL_INTERVAL
+        try:
+            with pytest.raises(episodes.ClientDisconnected):
+                await episodes._cancel_on_disconnect(FakeRequest(), slow_generation())
+            await asyncio.sleep(0)
+            assert cancelled.is_set()
+        finally:
+            episodes.DISCONNECT_POLL_INTERVAL = original
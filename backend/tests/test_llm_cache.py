@@ -0,0 +1,60 @@
+"""Tests for LLM response cache"""
+import time
+import pytest
+from app.services.llm_cache import LLMCache
+
+
+class TestLLMCache:
+    """Test cache keys, TTL and eviction"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return LLMCache(str(tmp_path / "llm_cache.db"), ttl_seconds=60, max_entries=2)
+
+    def test_key_depends_on_sampling_params(self):
+        """Test that temperature and max_tokens change the key"""
+        messages = [{"role": "user", "content": "hi"}]
+
+        base = LLMCache.make_key("deepseek-chat", messages, 0.8, 4096)
+
+        assert base == LLMCache.make_key("deepseek-chat", messages, 0.8, 4096)
+        assert base != LLMCache.make_key("deepseek-chat", messages, 0.7, 4096)
+        assert base != LLMCache.make_key("deepseek-chat", messages, 0.8, 2048)
+        assert base != LLMCache.make_key("deepseek-reasoner", messages, 0.8, 4096)
+
+    def test_hit_and_miss_metrics(self, cache):
+        """Test hits return stored text and metrics are counted"""
+        assert cache.get("k1") is None
+
+        cache.set("k1", "**彪悍罗：**你好", {"total_tokens": 10})
+        hit = cache.get("k1")
+
+        assert hit["text"] == "**彪悍罗：**你好"
+        assert hit["usage"] == {"total_tokens": 10}
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_ttl_expiry(self, tmp_path):
+        """Test expired entries are treated as misses"""
+        cache = LLMCache(str(tmp_path / "ttl.db"), ttl_seconds=0)
+        cache.set("k1", "text")
+        time.sleep(0.01)
+
+        assert cache.get("k1") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction(self, cache):
+        """Test least recently used entries are evicted over the limit"""
+        cache.set("k1", "a")
+        time.sleep(0.01)
+        cache.set("k2", "b")
+        time.sleep(0.01)
+        cache.get("k1")
+        time.sleep(0.01)
+        cache.set("k3", "c")
+
+        assert cache.get("k2") is None
+        assert cache.get("k1") is not None
+        assert cache.get("k3") is not None
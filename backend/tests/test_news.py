@@ -122,8 +122,16 @@ class TestNewsAPI:
         
         client = TestClient(app)
         
-        # 抓取新闻
-        response = client.post("/api/v1/news/fetch?source_id=3")
+        # 测试库是空的，先建一个 RSS 源
+        db = SessionLocal()
+        source = RSSSource(name="金十数据 - Telegram Channel", url="http://192.168.3.20:1200/telegram/channel/jin10data")
+        db.add(source)
+        db.commit()
+        source_id = source.id
+        db.close()
+        
+        # 抓取新闻（单个源抓取失败不影响接口返回）
+        response = client.post(f"/api/v1/news/fetch?source_id={source_id}")
         
         assert response.status_code == 200, f"API 应该返回 200, 实际: {response.status_code}"
         
@@ -0,0 +1,172 @@
+"""Tests for generation progress events"""
+import asyncio
+import json
+import threading
+import pytest
+from app.services import progress
+from app.services.progress import ProgressBus, format_sse
+from app.services.shared_state import SQLiteStore
+from app.services.tts import Dialogue, MiniMaxTTSService
+
+
+class TestProgressBus:
+    """Test per-episode pub/sub used by the SSE endpoint"""
+
+    @pytest.mark.asyncio
+    async def test_events_from_worker_threads(self):
+        """Test events published from threads reach the subscriber in order"""
+        bus = ProgressBus()
+        with bus.subscribe(1) as sub:
+            report = bus.reporter(1, episode_news_id=7)
+            worker = threading.Thread(target=lambda: [report("tts.downloaded", done=i) for i in range(3)])
+            worker.start()
+            worker.join()
+            bus.publish(2, "job.started")  # other episode
+
+            events = [await sub.next(timeout=1) for _ in range(3)]
+
+            assert [e["done"] for e in events] == [0, 1, 2]
+            assert all(e["episode_news_id"] == 7 and e["episode_id"] == 1 for e in events)
+            assert await sub.next(timeout=0.05) is None
+
+    @pytest.mark.asyncio
+    async def test_replay_after_last_event_id(self):
+        """Test a reconnecting client gets the events it missed"""
+        bus = ProgressBus(history_size=3)
+        ids = [bus.publish(1, "job.started", n=i)["id"] for i in range(5)]
+
+        with bus.subscribe(1, last_event_id=ids[2]) as sub:
+            assert (await sub.next(timeout=1))["n"] == 3
+            assert (await sub.next(timeout=1))["n"] == 4
+            assert await sub.next(timeout=0.05) is None
+
+        assert bus._subscribers == {}
+
+    @pytest.mark.asyncio
+    async def test_history_evicted_after_jobs_end(self):
+        """Test an episode's history is dropped some time after its last job ends"""
+        now = [0.0]
+        bus = ProgressBus(history_ttl=60, clock=lambda: now[0])
+        bus.publish(1, "job.started")
+        bus.publish(1, "job.finished")
+        bus.publish(2, "job.started")
+
+        now[0] = 61
+        with bus.subscribe(2):
+            bus.publish(2, "job.finished")
+            now[0] = 200
+            bus.publish(3, "job.started")
+            assert bus.history(1) == []
+            assert len(bus.history(2)) == 2  # subscribed, kept
+
+        bus.publish(3, "tts.downloaded")
+        assert bus.history(2) == []
+        assert len(bus.history(3)) == 2  # job still running
+
+    def test_episode_count_bounded(self):
+        """Test only the most recently active episodes keep history"""
+        bus = ProgressBus(max_episodes=2)
+        for episode_id in (1, 2, 1, 3):
+            bus.publish(episode_id, "job.started")
+
+        assert list(bus._history) == [1, 3]
+
+    def test_format_sse(self):
+        """Test SSE framing carries id, event name and JSON data"""
+        frame = format_sse({"id": 3, "event": "tts.merged", "duration": 12.5})
+        lines = frame.split("\n")
+
+        assert lines[0] == "id: 3"
+        assert lines[1] == "event: tts.merged"
+        assert json.loads(lines[2][len("data: "):])["duration"] == 12.5
+        assert frame.endswith("\n\n")
+
+
+class TestSharedProgress:
+    """Test events crossing worker processes through the shared store"""
+
+    @pytest.fixture
+    def workers(self, tmp_path):
+        store = SQLiteStore(str(tmp_path / "state.db"))
+        return ProgressBus(store=store, poll_interval=0.01), ProgressBus(store=store, poll_interval=0.01)
+
+    @pytest.mark.asyncio
+    async def test_stream_on_another_worker(self, workers):
+        """Test a stream served by one worker sees jobs running in another"""
+        a, b = workers
+        b.start()
+        try:
+            with b.subscribe(1) as sub:
+                a.publish(1, "job.started", job="audio")
+                a.publish(2, "job.started")
+                a.publish(1, "job.finished", job="audio")
+
+                events = [await sub.next(timeout=2) for _ in range(2)]
+                assert [e["event"] for e in events] == ["job.started", "job.finished"]
+                assert await sub.next(timeout=0.05) is None
+        finally:
+            b.stop()
+
+    @pytest.mark.asyncio
+    async def test_ids_shared_and_resume_anywhere(self, workers):
+        """Test ids are unique across workers and Last-Event-ID resumes on either"""
+        a, b = workers
+        ids = [a.publish(1, "tts.downloaded", n=0)["id"], b.publish(1, "tts.downloaded", n=1)["id"]]
+        ids.append(a.publish(1, "tts.downloaded", n=2)["id"])
+        assert ids == sorted(set(ids))
+
+        assert a.poll() == 1  # only b's event is new to a
+        assert b.poll() == 2
+        assert a.poll() == 0
+        assert [e["n"] for e in a.history(1)] == [0, 2, 1]
+        assert [e["n"] for e in b.history(1)] == [1, 0, 2]
+
+        with b.subscribe(1, last_event_id=ids[0]) as sub:
+            assert {(await sub.next(timeout=1))["n"], (await sub.next(timeout=1))["n"]} == {1, 2}
+
+    def test_log_trimmed(self, workers, monkeypatch):
+        """Test the shared log keeps only the newest SHARED_LOG_SIZE events"""
+        monkeypatch.setattr(progress, "SHARED_LOG_SIZE", 5)
+        monkeypatch.setattr(progress, "TRIM_EVERY", 4)
+        a, b = workers
+        for i in range(8):
+            a.publish(1, "tts.downloaded", n=i)
+
+        assert a.store.zcard(progress.EVENT_LOG_KEY) == 5
+        b.poll()
+        assert [e["n"] for e in b.history(1)] == [3, 4, 5, 6, 7]
+
+
+class TestTTSProgress:
+    """Test segment-level events emitted by batch_generate"""
+
+    def test_segment_events(self, tmp_path):
+        """Test each segment reports submission and completion with counts"""
+        tts = MiniMaxTTSService()
+        events = []
+        lock = threading.Lock()
+
+        def progress(event, **data):
+            with lock:
+                events.append((event, data))
+
+        def fake_generate(text, speaker, output_path):
+            with open(output_path, "wb") as f:
+                f.write(b"")
+            return output_path
+
+        tts.generate = fake_generate
+
+        dialogues = [
+            Dialogue(speaker="luoyonghao", text="你好", index=0),
+            Dialogue(speaker="wangziru", text="ok", index=1),
+        ]
+        parts = tts.batch_generate(dialogues, str(tmp_path), skip_existing=False, progress=progress)
+
+        assert len(parts) == 2
+        submitted = [d for e, d in events if e == "tts.submitted"]
+        downloaded = [d for e, d in events if e == "tts.downloaded"]
+        assert {d["index"] for d in submitted} == {1, 2}
+        assert all(d["route"] == "inline" for d in submitted)
+        assert sorted(d["done"] for d in downloaded) == [1, 2]
+        assert all(d["total"] == 2 and "elapsed" in d for d in downloaded)
@@ -0,0 +1,88 @@
+"""Tests for the prompt registry"""
+import os
+import pytest
+from app.services.prompt_registry import PromptError, PromptRegistry, compile_prompt
+
+
+def _write(path, text, mtime_ns=None):
+    path.write_text(text, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestPromptRegistry:
+    """Test compilation, hot reload and overrides"""
+
+    @pytest.fixture
+    def prompts_file(self, tmp_path):
+        path = tmp_path / "prompts.yaml"
+        _write(
+            path,
+            "intro_text: 科技双响炮\n"
+            "podcast_user_template: \"新闻素材：{news_text}\"\n",
+            mtime_ns=1_000_000_000,
+        )
+        return path
+
+    def test_compile_extracts_fields(self):
+        """Test template fields are extracted and required fields enforced"""
+        prompt = compile_prompt("podcast_user_template", "素材：{news_text}")
+
+        assert prompt.fields == {"news_text"}
+        assert prompt.render(news_text="A") == "素材：A"
+        with pytest.raises(PromptError):
+            compile_prompt("podcast_user_template", "素材：{news}")
+
+    def test_plain_prompt_with_braces(self):
+        """Test prompts that are not templates are returned verbatim"""
+        prompt = compile_prompt("intro_text", "JSON 示例：{\"a\": 1} 和 {")
+
+        assert prompt.render() == "JSON 示例：{\"a\": 1} 和 {"
+
+    def test_hot_reload_on_mtime_change(self, prompts_file):
+        """Test the registry reloads when the file changes"""
+        registry = PromptRegistry(str(prompts_file), check_interval=0)
+        old_version = registry.versions()["intro_text"]
+
+        _write(prompts_file, "intro_text: 新的开场白\n", mtime_ns=2_000_000_000)
+
+        assert registry.get("intro_text") == "新的开场白"
+        assert registry.generation == 2
+        assert registry.versions()["intro_text"] != old_version
+
+    def test_invalid_edit_keeps_previous_version(self, prompts_file):
+        """Test a broken template is rejected and the old prompts stay active"""
+        registry = PromptRegistry(str(prompts_file), check_interval=0)
+
+        _write(prompts_file, "podcast_user_template: \"{missing}\"\n", mtime_ns=2_000_000_000)
+
+        assert registry.render("podcast_user_template", news_text="X") == "新闻素材：X"
+        assert registry.generation == 1
+
+    def test_no_reread_within_interval(self, prompts_file):
+        """Test lookups inside the check interval do not touch the file"""
+        registry = PromptRegistry(str(prompts_file), check_interval=3600)
+
+        _write(prompts_file, "intro_text: 新的开场白\n", mtime_ns=2_000_000_000)
+
+        assert registry.get("intro_text") == "科技双响炮"
+
+    def test_override_layered_on_base(self, prompts_file, tmp_path):
+        """Test runtime overrides are persisted and win over the base file"""
+        override = tmp_path / "prompts.override.yaml"
+        registry = PromptRegistry(str(prompts_file), override_path=str(override), check_interval=0)
+
+        registry.set_override("script_prompt", "多聊聊行业影响")
+
+        assert registry.get("script_prompt") == "多聊聊行业影响"
+        assert registry.get("intro_text") == "科技双响炮"
+        assert PromptRegistry(str(prompts_file), override_path=str(override)).get("script_prompt") == "多聊聊行业影响"
+
+    def test_override_rejects_invalid_template(self, prompts_file, tmp_path):
+        """Test invalid overrides are not written"""
+        override = tmp_path / "prompts.override.yaml"
+        registry = PromptRegistry(str(prompts_file), override_path=str(override))
+
+        with pytest.raises(PromptError):
+            registry.set_override("podcast_user_template", "{news}")
+        assert not override.exists()
@@ -0,0 +1,94 @@
+"""Tests for the structured script format and parser"""
+import pytest
+from app.services.script_format import ScriptDecodeError, ScriptFormatError, ScriptParser, Turn, parse_script
+
+
+class TestScriptParser:
+    """Test markdown/JSON parsing and rendering"""
+
+    @pytest.fixture
+    def parser(self):
+        return ScriptParser()
+
+    def test_markdown_keeps_asterisks(self, parser):
+        """Test turns containing * are not truncated"""
+        turns = parser.parse_markdown("**彪悍罗：**这个 5*8 的屏幕，*真的*离谱\n**OK王：**ok？")
+
+        assert turns == [
+            Turn("luoyonghao", "这个 5*8 的屏幕，*真的*离谱"),
+            Turn("wangziru", "ok？"),
+        ]
+
+    def test_markdown_label_variants(self, parser):
+        """Test bold/plain labels, both colons and continuation lines"""
+        script = (
+            "科技双响炮，焦点早知道！\n\n"
+            "**罗永浩**：第一行\n第二行\n\n"
+            "王自如: 半角冒号\n"
+            "## 第二条新闻\n"
+            "这行不属于任何台词\n"
+            "**OK王：**最后一句"
+        )
+        turns = parser.parse_markdown(script)
+
+        assert [t.speaker for t in turns] == ["luoyonghao", "wangziru", "wangziru"]
+        assert turns[0].text == "第一行\n第二行"
+        assert turns[1].text == "半角冒号"
+        assert turns[2].text == "最后一句"
+
+    def test_custom_hosts(self):
+        """Test new hosts are configured through aliases, not regexes"""
+        parser = ScriptParser({"主持人": "host_a", "嘉宾": "host_b"})
+        turns = parser.parse_markdown("**主持人：**你好\n**嘉宾：**你好\n**彪悍罗：**不认识")
+
+        assert [t.speaker for t in turns] == ["host_a", "host_b"]
+        assert turns[1].text == "你好\n**彪悍罗：**不认识"
+
+    def test_json_formats(self, parser):
+        """Test object, fenced and JSON Lines input"""
+        expected = [Turn("luoyonghao", "你好"), Turn("wangziru", "ok？")]
+
+        assert parser.parse_json(
+            '{"turns": [{"speaker": "彪悍罗", "text": "你好"}, {"speaker": "OK王", "text": "ok？"}]}'
+        ) == expected
+        assert parser.parse_json(
+            '```json\n[{"speaker": "luoyonghao", "text": "你好"}, {"speaker": "OK王", "text": "ok？"}]\n```'
+        ) == expected
+        assert parser.parse_json(
+            '{"speaker": "彪悍罗", "text": "你好"}\n{"speaker": "王自如", "text": "ok？"}'
+        ) == expected
+
+    def test_json_validation(self, parser):
+        """Test unknown speakers and malformed JSON are rejected"""
+        with pytest.raises(ScriptFormatError):
+            parser.parse_json('{"turns": [{"speaker": "路人", "text": "hi"}]}')
+        with pytest.raises(ScriptFormatError):
+            parser.parse_json('{"turns": "oops"}')
+        with pytest.raises(ScriptDecodeError):
+            parser.parse_json("{not json")
+
+    def test_decode_error_distinguished(self, parser):
+        """Test only undecodable text raises ScriptDecodeError"""
+        with pytest.raises(ScriptFormatError) as exc_info:
+            parser.parse_json('{"turns": [{"speaker": "路人", "text": "hi"}]}')
+        assert not isinstance(exc_info.value, ScriptDecodeError)
+
+    def test_round_trip(self, parser):
+        """Test markdown rendering parses back to the same turns"""
+        turns = [Turn("luoyonghao", "5*8=40，**重点**"), Turn("wangziru", "确实")]
+        markdown = parser.to_markdown(turns)
+
+        assert markdown.startswith("**彪悍罗：**")
+        assert parser.parse_markdown(markdown) == turns
+        assert parse_script([t.to_dict() for t in turns]) == turns
+
+    def test_parse_autodetects(self):
+        """Test parse_script accepts both formats"""
+        assert parse_script('{"turns": [{"speaker": "OK王", "text": "hi"}]}') == [Turn("wangziru", "hi")]
+        assert parse_script("**OK王：**hi") == [Turn("wangziru", "hi")]
+
+    def test_parse_rejects_invalid_json_content(self):
+        """Test valid JSON with an unknown speaker raises instead of falling back to markdown"""
+        with pytest.raises(ScriptFormatError, match="说话人未知"):
+            parse_script('{"turns": [{"speaker": "路人", "text": "hi"}]}')
+        assert parse_script('[开场]\n**OK王：**hi') == [Turn("wangziru", "hi")]
@@ -0,0 +1,85 @@
+"""Tests for script variant scoring and schema upgrades"""
+from sqlalchemy import create_engine, inspect, text
+from app.db.migrations import upgrade_schema
+from app.services.script_scorer import ACCEPT_SCORE, score_script
+
+
+def _script(luo_chars: int, wang_chars: int, turns: int = 4) -> str:
+    lines = []
+    for _ in range(turns // 2):
+        lines.append(f"**彪悍罗：**{'罗' * (luo_chars // (turns // 2))}")
+        lines.append(f"**OK王：**{'王' * (wang_chars // (turns // 2))}")
+    return "\n".join(lines)
+
+
+class TestScriptScorer:
+    """Test heuristic scoring used to rank variants"""
+
+    def test_well_formed_script_accepted(self):
+        """Test a balanced script of target length clears the accept threshold"""
+        score = score_script(_script(600, 600))
+
+        assert score.format == 1.0
+        assert score.balance == 1.0
+        assert score.turns == 4
+        assert score.chars == 1200
+        assert score.total >= ACCEPT_SCORE
+
+    def test_one_sided_script_scores_lower(self):
+        """Test a monologue loses the balance component"""
+        balanced = score_script(_script(600, 600))
+        one_sided = score_script(_script(1100, 100))
+
+        assert one_sided.balance < 0.3
+        assert one_sided.total < balanced.total
+
+    def test_malformed_lines_penalized(self):
+        """Test lines without speaker tags lower the format score"""
+        script = _script(600, 600) + "\n（以下为旁白）\n这一段没有说话人"
+        score = score_script(script)
+
+        assert score.format == 4 / 6
+        assert score.total < score_script(_script(600, 600)).total
+
+    def test_length_deviation(self):
+        """Test scripts far from the target length are penalized"""
+        assert score_script(_script(100, 100)).length < score_script(_script(500, 500)).length
+        assert score_script("").total == 0.0
+
+
+class TestUpgradeSchema:
+    """Test missing columns are added to existing tables"""
+
+    def test_adds_missing_column(self):
+        """Test an old episodes table gains script_variants with its default"""
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE episodes (id INTEGER PRIMARY KEY, title VARCHAR(200))"
+            ))
+            conn.execute(text("INSERT INTO episodes (id, title) VALUES (1, 'old')"))
+
+        added = upgrade_schema(engine)
+
+        assert "episodes.script_variants" in added
+        columns = {c["name"] for c in inspect(engine).get_columns("episodes")}
+        assert "script_variants" in columns
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT script_variants FROM episodes")).scalar() == 1
+
+        # Idempotent
+        assert upgrade_schema(engine) == []
+
+    def test_adds_missing_index(self):
+        """Test an old episode_news table gains the episode_id index and the duration column"""
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE episode_news (id INTEGER PRIMARY KEY, episode_id INTEGER)"))
+
+        added = upgrade_schema(engine)
+
+        assert "episode_news.audio_duration" in added
+        assert "episode_news.ix_episode_news_episode_id" in added
+        indexes = {i["name"] for i in inspect(engine).get_indexes("episode_news")}
+        assert "ix_episode_news_episode_id" in indexes
+        assert upgrade_schema(engine) == []
@@ -0,0 +1,45 @@
+"""Tests for TTS segment planning"""
+from app.services.tts import Dialogue
+from app.services.segment_planner import plan_segments
+
+
+class TestSegmentPlanner:
+    """Test merging and splitting of dialogue turns"""
+
+    def test_merge_consecutive_same_speaker(self):
+        """Test adjacent short turns from one speaker become one job"""
+        dialogues = [
+            Dialogue(speaker="luoyonghao", text="对。", index=0),
+            Dialogue(speaker="luoyonghao", text="说实话，这事太扯了。", index=1),
+            Dialogue(speaker="wangziru", text="ok？", index=2),
+        ]
+
+        segments = plan_segments(dialogues)
+
+        assert len(segments) == 2
+        assert segments[0].source_indices == [0, 1]
+        assert segments[0].text == "对。\n说实话，这事太扯了。"
+        assert segments[1].source_indices == [2]
+        assert [s.index for s in segments] == [0, 1]
+
+    def test_alternating_speakers_not_merged(self):
+        """Test turns from different speakers stay separate"""
+        dialogues = [
+            Dialogue(speaker="luoyonghao", text="老罗说。", index=0),
+            Dialogue(speaker="wangziru", text="自如说。", index=1),
+        ]
+
+        assert len(plan_segments(dialogues)) == 2
+
+    def test_split_long_turn_at_sentence_boundary(self):
+        """Test overlong turns split on sentence ends and keep the mapping"""
+        text = "这是第一句话。" * 10
+        dialogues = [Dialogue(speaker="wangziru", text=text, index=7)]
+
+        segments = plan_segments(dialogues, max_chars=30)
+
+        assert len(segments) > 1
+        assert all(len(s.text) <= 30 for s in segments)
+        assert all(s.text.endswith("。") for s in segments)
+        assert all(s.source_indices == [7] for s in segments)
+        assert "".join(s.text for s in segments) == text
@@ -0,0 +1,178 @@
+"""Tests for cross-process shared state and shared rate limits"""
+import asyncio
+import threading
+import time
+import pytest
+from app.services import rate_limit, shared_state
+from app.services.rate_limit import RateLimiter
+from app.services.shared_state import (
+    MemoryStore, SQLiteStore, count_in_window, create_store, refresh, release, try_acquire
+)
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestSharedStore:
+    """Test the Redis command subset on each backend"""
+
+    @pytest.fixture(params=["memory", "sqlite"])
+    def store(self, request, tmp_path):
+        if request.param == "memory":
+            return MemoryStore()
+        return SQLiteStore(str(tmp_path / "state.db"))
+
+    def test_counter(self, store):
+        """Test incr counts up and expire drops the counter"""
+        assert store.incr("c") == 1
+        assert store.incr("c") == 2
+        assert store.expire("c", -1)
+        assert store.incr("c") == 1
+        assert store.get("c") == 1
+        assert store.get("missing") is None
+        assert not store.expire("missing", 10)
+
+    def test_sorted_set(self, store):
+        """Test zadd / zrem / zcard / zremrangebyscore / zscore"""
+        assert store.zadd("z", {"a": 1, "b": 2}) == 2
+        assert store.zadd("z", {"a": 3}) == 0
+        assert store.zcard("z") == 2
+        assert store.zremrangebyscore("z", "-inf", 2) == 1
+        assert store.zscore("z", "a") == 3
+        assert store.zscore("z", "b") is None
+        assert store.zrem("z", "a", "missing") == 1
+        assert store.zcard("z") == 0
+
+    def test_sorted_set_ranges(self, store):
+        """Test zrangebyscore reads in score order and zremrangebyrank trims the lowest"""
+        store.zadd("log", {"c": 3, "a": 1, "d": 4, "b": 2})
+
+        assert store.zrangebyscore("log", 2, "+inf") == ["b", "c", "d"]
+        assert store.zrangebyscore("log", "-inf", 1) == ["a"]
+        assert store.zremrangebyrank("log", 0, -3) == 2
+        assert store.zrangebyscore("log", "-inf", "+inf") == ["c", "d"]
+        assert store.zremrangebyrank("log", 0, -3) == 0
+        assert store.zremrangebyrank("missing", 0, -1) == 0
+
+    def test_lease_limit(self, store):
+        """Test leases never exceed the limit and are reusable once released"""
+        first = try_acquire(store, "job", 2)
+        second = try_acquire(store, "job", 2)
+        assert first and second
+        assert try_acquire(store, "job", 2) is None
+
+        release(store, "job", first)
+        assert try_acquire(store, "job", 2)
+
+    def test_lease_refresh(self, store):
+        """Test a held lease is extended and an expired one is reported lost"""
+        lease = try_acquire(store, "job", 1, ttl=10)
+        before = store.zscore("job", lease)
+
+        assert refresh(store, "job", lease, ttl=100)
+        assert store.zscore("job", lease) > before + 50
+
+        expired = try_acquire(store, "other", 1, ttl=-1)
+        assert not refresh(store, "other", expired)
+        assert not refresh(store, "job", "missing")
+
+    def test_expired_lease_reclaimed(self, store):
+        """Test a lease left by a dead holder expires"""
+        assert try_acquire(store, "job", 1, ttl=-1)
+        assert try_acquire(store, "job", 1)
+
+    def test_window_count(self, store, monkeypatch):
+        """Test requests are counted per window"""
+        clock = FakeClock(120.0)
+        monkeypatch.setattr(shared_state, "time", clock)
+
+        assert [count_in_window(store, "rpm", 60) for _ in range(3)] == [1, 2, 3]
+        clock.sleep(60)
+        assert count_in_window(store, "rpm", 60) == 1
+
+    def test_create_store(self, tmp_path):
+        """Test SHARED_STATE_URL parsing"""
+        assert create_store("") is None
+        assert isinstance(create_store("memory://"), MemoryStore)
+        assert isinstance(create_store(f"sqlite:///{tmp_path}/s.db"), SQLiteStore)
+        with pytest.raises(ValueError):
+            create_store("mysql://localhost")
+
+
+class TestSharedRateLimiter:
+    """Test provider limits hold across limiter instances (one per worker)"""
+
+    def test_concurrency_across_workers(self, tmp_path):
+        """Test workers sharing a SQLite file never exceed the combined limit"""
+        path = str(tmp_path / "state.db")
+        workers = [RateLimiter("minimax", max_concurrent=2, store=SQLiteStore(path)) for _ in range(3)]
+        lock = threading.Lock()
+        active, peak = [0], [0]
+
+        def call(limiter):
+            with limiter.slot():
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.05)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=call, args=(w,)) for w in workers for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert peak[0] == 2
+        assert sum(w.requests for w in workers) == 9
+
+    @pytest.mark.asyncio
+    async def test_async_slot_released_on_cancel(self):
+        """Test a caller cancelled while waiting for a slot does not leak it"""
+        limiter = RateLimiter("deepseek", max_concurrent=1)
+
+        async with limiter.aslot():
+            waiter = asyncio.ensure_future(limiter.aslot().__aenter__())
+            await asyncio.sleep(0.05)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+        async def reuse():
+            async with limiter.aslot():
+                pass
+
+        await asyncio.wait_for(reuse(), timeout=2)
+        assert limiter.requests == 2
+
+    def test_rpm_across_workers(self, monkeypatch):
+        """Test the per-minute quota is shared, and the overflow waits for the next window"""
+        clock = FakeClock(60.0)
+        monkeypatch.setattr(shared_state, "time", clock)
+        monkeypatch.setattr(rate_limit, "time", clock)
+        monkeypatch.setattr(rate_limit.random, "uniform", lambda a, b: 0)
+        store = MemoryStore()
+        a = RateLimiter("deepseek", per_minute=2, store=store)
+        b = RateLimiter("deepseek", per_minute=2, store=store)
+
+        for limiter in (a, b):
+            with limiter.slot():
+                pass
+        assert clock.now == 60.0
+
+        with a.slot():
+            pass
+        assert clock.now == 120.0
+        assert a.waited == 60.0
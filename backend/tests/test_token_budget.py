@@ -0,0 +1,71 @@
+"""Tests for news material token budgeting"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.models import News, NewsDigest
+from app.services.token_budget import TokenCounter, condense, news_material
+
+
+class TestTokenBudget:
+    """Test token estimation and extractive condensation"""
+
+    @pytest.fixture
+    def counter(self):
+        return TokenCounter()
+
+    @pytest.fixture
+    def db(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine, tables=[News.__table__, NewsDigest.__table__])
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+
+    def test_estimate(self, counter):
+        """Test CJK and other characters use DeepSeek's ratios"""
+        assert counter.count("") == 0
+        assert counter.count("科技新闻") == 3  # 4 * 0.6 = 2.4
+        assert counter.count("hello world") == 4  # 11 * 0.3 = 3.3
+        assert not counter.exact
+
+    def test_short_text_unchanged(self, counter):
+        """Test material within budget is passed through"""
+        text = "苹果发布了新款手机。"
+        assert condense(text, 100, counter) == text
+
+    def test_condense_fits_budget(self, counter):
+        """Test long articles are condensed to the budget, keeping sentence order"""
+        lead = "英伟达发布新一代AI芯片，性能提升三倍。"
+        filler = "".join(f"第{i}段是与主题无关的背景信息。" for i in range(200))
+        text = lead + filler
+
+        result = condense(text, 100, counter)
+
+        assert counter.count(result) <= 100
+        assert result.startswith(lead)
+        lines = result.split("\n")
+        assert lines == [s for s in lines if s in text]
+
+    def test_single_long_sentence_truncated(self, counter):
+        """Test text without sentence boundaries is hard-truncated"""
+        result = condense("字" * 1000, 60, counter)
+
+        assert 0 < len(result) <= 100
+        assert counter.count(result) <= 60
+
+    def test_digest_cached_per_news(self, db):
+        """Test condensed text is cached and invalidated when content changes"""
+        news = News(title="标题", url="https://example.com", content="很长的正文。" * 500)
+        db.add(news)
+        db.commit()
+
+        first = news_material(db, news, budget=50)
+        digest = db.query(NewsDigest).filter(NewsDigest.news_id == news.id).one()
+        assert digest.text == first
+        assert digest.tokens <= 50
+
+        news.content = "新的正文。"
+        db.commit()
+        assert news_material(db, news, budget=50) == "新的正文。"
+        assert db.query(NewsDigest).count() == 1
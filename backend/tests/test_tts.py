@@ -1,7 +1,8 @@
 """Tests for TTS Service"""
 import pytest
 import os
-from app.services.tts import MiniMaxTTSService, Dialogue, VOICE_IDS
+from app.services.tts import MiniMaxTTSService, Dialogue
+from app.services.voice_roster import MINIMAX, get_voice_roster
 
 
 class TestMiniMaxTTSService:
@@ -9,10 +10,10 @@ class TestMiniMaxTTSService:
 
     def test_voice_ids_loaded(self):
         """Test that voice IDs are loaded"""
-        assert "luoyonghao" in VOICE_IDS
-        assert "wangziru" in VOICE_IDS
-        assert VOICE_IDS["luoyonghao"] == "luoyonghao2"
-        assert VOICE_IDS["wangziru"] == "wangziru_test"
+        roster = get_voice_roster()
+        assert roster.voice("luoyonghao", MINIMAX)["voice_id"] == "luoyonghao2"
+        assert roster.voice("wangziru", MINIMAX)["voice_id"] == "wangziru_test"
+        assert MiniMaxTTSService()._voice_setting("wangziru")["speed"] == 1.0
 
     def test_parse_dialogues(self):
         """Test parsing dialogues from script"""
@@ -37,6 +38,43 @@ class TestMiniMaxTTSService:
         dialogues = tts.parse_script("")
         assert len(dialogues) == 0
 
+    def test_route_by_length(self):
+        """Test inline vs async routing by text length"""
+        tts = MiniMaxTTSService(inline_max_chars=10)
+
+        assert tts._route("好的") == "inline"
+        assert tts._route("这是一段明显超过十个字符的长台词内容") == "async"
+
+    def test_batch_generate_per_voice_queues(self, tmp_path):
+        """Test voices are scheduled on independent queues with stats"""
+        tts = MiniMaxTTSService(voice_concurrency={"luoyonghao": 1, "wangziru": 2})
+        order = []
+
+        def fake_generate(text, speaker, output_path):
+            order.append((speaker, text))
+            with open(output_path, "wb") as f:
+                f.write(b"")
+            return output_path
+
+        tts.generate = fake_generate
+
+        dialogues = [
+            Dialogue(speaker="luoyonghao", text="短", index=0),
+            Dialogue(speaker="wangziru", text="王自如", index=1),
+            Dialogue(speaker="luoyonghao", text="长一点的台词", index=2),
+        ]
+
+        audio_files = tts.batch_generate(dialogues, str(tmp_path))
+
+        assert [os.path.basename(p) for p in audio_files] == [
+            "part_001.mp3", "part_002.mp3", "part_003.mp3"
+        ]
+        # Longest-first within a voice queue
+        luo_order = [text for speaker, text in order if speaker == "luoyonghao"]
+        assert luo_order == ["长一点的台词", "短"]
+        assert tts.voice_stats["luoyonghao"].completed == 2
+        assert tts.voice_stats["wangziru"].completed == 1
+
     @pytest.mark.slow
     def test_batch_generate(self):
         """Test batch audio generation (requires API key)"""
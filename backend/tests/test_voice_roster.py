@@ -0,0 +1,116 @@
+"""Tests for the host/voice roster"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.db.base import Base
+from app.db.models import VoiceHost
+from app.services.script_format import parse_script
+from app.services.tts import MiniMaxTTSService
+from app.services import voice_hosts
+from app.services.shared_state import MemoryStore, set_shared_store
+from app.services.voice_hosts import find_label_conflicts, reload_voice_roster, seed_voice_hosts, sync_voice_roster
+from app.services.voice_roster import (
+    DEFAULT_HOSTS, ELEVENLABS, MINIMAX, VoiceNotConfigured, VoiceRoster,
+    get_voice_roster, set_voice_roster,
+)
+
+
+class TestVoiceRoster:
+    """Test roster lookups and DB-backed reloads"""
+
+    @pytest.fixture
+    def engine(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine, tables=[VoiceHost.__table__])
+        return engine
+
+    @pytest.fixture
+    def db(self, engine):
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+        set_voice_roster(VoiceRoster(DEFAULT_HOSTS))
+
+    def test_default_lookups(self):
+        """Test labels resolve to speakers and voices merge provider defaults"""
+        roster = VoiceRoster(DEFAULT_HOSTS)
+
+        assert roster.resolve("罗永浩") == "luoyonghao"
+        assert roster.resolve("OK王") == "wangziru"
+        assert roster.resolve("路人") is None
+        assert roster.label("wangziru") == "OK王"
+        assert roster.voice("luoyonghao", MINIMAX) == {
+            "voice_id": "luoyonghao2", "speed": 1.0, "vol": 1.0, "pitch": 0,
+        }
+
+    def test_missing_voice(self):
+        """Test unconfigured speakers/providers raise instead of sending an empty voice"""
+        roster = VoiceRoster([{"key": "guest", "name": "嘉宾", "voices": {}}])
+
+        with pytest.raises(VoiceNotConfigured):
+            roster.voice("guest", ELEVENLABS)
+        with pytest.raises(VoiceNotConfigured):
+            roster.voice("nobody", MINIMAX)
+
+    def test_guest_host_from_db(self, db):
+        """Test a host added to the table is used by parsing and synthesis without code changes"""
+        assert seed_voice_hosts(db) == len(DEFAULT_HOSTS)
+        assert seed_voice_hosts(db) == 0
+
+        db.add(VoiceHost(
+            key="guest",
+            name="小李",
+            aliases=["李老师"],
+            voices={MINIMAX: {"voice_id": "guest_voice", "speed": 1.1}},
+        ))
+        db.commit()
+        reload_voice_roster(db)
+
+        turns = parse_script("**彪悍罗：**欢迎\n**李老师：**谢谢邀请")
+        assert [t.speaker for t in turns] == ["luoyonghao", "guest"]
+
+        setting = MiniMaxTTSService()._voice_setting("guest")
+        assert setting["voice_id"] == "guest_voice"
+        assert setting["speed"] == 1.1
+        assert get_voice_roster().label("guest") == "小李"
+
+    def test_disabled_host_and_conflicts(self, db):
+        """Test disabled hosts drop out and labels must stay unique"""
+        seed_voice_hosts(db)
+        row = db.query(VoiceHost).filter(VoiceHost.key == "wangziru").one()
+
+        assert find_label_conflicts(db, ["王自如", "新标签"]) == ["王自如"]
+        assert find_label_conflicts(db, ["王自如"], exclude_id=row.id) == []
+
+        row.enabled = False
+        db.commit()
+        reload_voice_roster(db)
+        assert parse_script("**OK王：**ok") == []
+
+    def test_edit_reaches_other_workers(self, engine, db, monkeypatch):
+        """Test a host edit bumps the shared generation and other workers reload on their next check"""
+        monkeypatch.setattr("app.db.session.SessionLocal", sessionmaker(bind=engine))
+        set_shared_store(MemoryStore())
+        try:
+            seed_voice_hosts(db)
+            reload_voice_roster(db)
+            assert not sync_voice_roster(force=True)
+
+            # Another worker adds a host: its roster reloads and the generation moves
+            db.add(VoiceHost(key="guest", name="小李", voices={MINIMAX: {"voice_id": "guest_voice"}}))
+            db.commit()
+            reload_voice_roster(db, publish=True)
+            loaded_here = voice_hosts._loaded_generation
+
+            # This worker still has the roster from before the edit
+            set_voice_roster(VoiceRoster(DEFAULT_HOSTS))
+            monkeypatch.setattr(voice_hosts, "_loaded_generation", loaded_here - 1)
+            monkeypatch.setattr(voice_hosts, "_last_check", voice_hosts.time.monotonic())
+            assert not sync_voice_roster()  # within the check interval
+
+            assert sync_voice_roster(force=True)
+            assert get_voice_roster().resolve("小李") == "guest"
+            assert not sync_voice_roster(force=True)
+        finally:
+            set_shared_store(None)
@@ -46,22 +46,31 @@ export default function Dashboard({ currentMode }) {
 
   useEffect(() => {
     fetchEpisodes()
-  }, [])
+  }, [currentDate])
 
+  // 只加载日历可见范围（6 周）内的节目，统计和进度由后端一次汇总返回
   const fetchEpisodes = async () => {
+    const gridStart = new Date(currentDate.getFullYear(), currentDate.getMonth(), 1)
+    gridStart.setDate(gridStart.getDate() - gridStart.getDay())
+    const gridEnd = new Date(gridStart)
+    gridEnd.setDate(gridEnd.getDate() + 42)
+
     try {
       setLoading(true)
-      const data = await episodesApi.list()
-      setEpisodes(data || [])
-
-      // 计算统计数据
-      const counts = {
-        total: data?.length || 0,
-        draft: data?.filter(e => e.status === 'draft').length || 0,
-        editing: data?.filter(e => e.status === 'editing').length || 0,
-        published: data?.filter(e => e.status === 'published').length || 0,
-      }
-      setStats(counts)
+      const data = await episodesApi.overview({
+        dateFrom: gridStart.toISOString(),
+        dateTo: gridEnd.toISOString(),
+        limit: 500,
+      })
+      setEpisodes(data?.items || [])
+
+      const counts = data?.status_counts || {}
+      setStats({
+        total: Object.values(counts).reduce((sum, n) => sum + n, 0),
+        draft: counts.draft || 0,
+        editing: counts.editing || 0,
+        published: counts.published || 0,
+      })
     } catch (err) {
       console.error('Failed to fetch episodes:', err)
     } finally {
@@ -211,7 +220,7 @@ export default function Dashboard({ currentMode }) {
         {/* 统计卡片 */}
         <div className="grid grid-cols-4 gap-4">
           <div className="bg-cream-100 rounded-xl p-4 border border-cream-300">
-            <p className="text-sm text-ink-50 mb-1">全部节目</p>
+            <p className="text-sm text-ink-50 mb-1">日历内节目</p>
             <p className="text-2xl font-display font-semibold text-ink-300">{stats.total}</p>
           </div>
           <div className="bg-cream-100 rounded-xl p-4 border border-cream-300">
@@ -303,9 +312,12 @@ export default function Dashboard({ currentMode }) {
                         key={ep.id}
                         onClick={() => navigate(`/episode/${ep.id}`)}
                         className={`px-2 py-1 rounded text-xs cursor-pointer truncate ${colors.bg} ${colors.text} hover:opacity-80 transition-opacity`}
-                        title={ep.title}
+                        title={ep.news_total ? `${ep.title} · 音频 ${ep.news_counts.audio_done}/${ep.news_total}` : ep.title}
                       >
                         {ep.title || '未命名节目'}
+                        {ep.news_total > 0 && (
+                          <span className="ml-1 opacity-70">{ep.news_counts.audio_done}/{ep.news_total}</span>
+                        )}
                       </div>
                     )
                   })}
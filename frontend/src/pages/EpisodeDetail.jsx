@@ -76,6 +76,12 @@ export default function EpisodeDetail() {
   // 当前选中的新闻（用于精编）
   const [selectedNews, setSelectedNews] = useState(null)
 
+  // 逐字稿候选
+  const [scriptVariants, setScriptVariants] = useState([])
+
+  // 生成进度（按 episode_news_id，来自 SSE 事件流）
+  const [jobProgress, setJobProgress] = useState({})
+
   // 弹窗状态
   const [showPromptModal, setShowPromptModal] = useState(false)
   const [showRawContentModal, setShowRawContentModal] = useState(false)
@@ -134,6 +140,65 @@ export default function EpisodeDetail() {
     fetchEpisode()
   }, [id])
 
+  // 订阅生成进度事件，替代轮询新闻列表
+  useEffect(() => {
+    const source = new EventSource(episodesApi.eventsUrl(parseInt(id)))
+
+    const onJob = (e) => {
+      const data = JSON.parse(e.data)
+      if (data.status) {
+        setEpisodeNews(prev => prev.map(en =>
+          en.id === data.episode_news_id ? { ...en, status: data.status } : en
+        ))
+        setSelectedNews(prev =>
+          prev && prev.id === data.episode_news_id ? { ...prev, status: data.status } : prev
+        )
+      }
+      setJobProgress(prev => {
+        const next = { ...prev }
+        if (e.type === 'job.started') {
+          next[data.episode_news_id] = { job: data.job, label: data.job === 'script' ? '正在生成脚本' : '正在合成音频' }
+        } else {
+          delete next[data.episode_news_id]
+        }
+        return next
+      })
+      if (e.type === 'job.cancelled') {
+        fetchEpisode()
+      }
+    }
+
+    const onStep = (e) => {
+      const data = JSON.parse(e.data)
+      setJobProgress(prev => {
+        const current = prev[data.episode_news_id]
+        if (!current) return prev
+        const update = { ...current }
+        if (e.type === 'llm.response') update.label = `脚本已返回（${data.elapsed}s）`
+        if (e.type === 'tts.planned') Object.assign(update, { label: '正在合成音频', done: 0, total: data.segments })
+        if (e.type === 'tts.downloaded') Object.assign(update, { done: data.done, total: data.total })
+        if (e.type === 'tts.merged') update.label = `正在保存（${data.duration}s 音频）`
+        return { ...prev, [data.episode_news_id]: update }
+      })
+    }
+
+    const jobEvents = ['job.started', 'job.finished', 'job.failed', 'job.cancelled']
+    const stepEvents = ['llm.response', 'tts.planned', 'tts.downloaded', 'tts.merged']
+    jobEvents.forEach(type => source.addEventListener(type, onJob))
+    stepEvents.forEach(type => source.addEventListener(type, onStep))
+
+    return () => source.close()
+  }, [id])
+
+  // 切换新闻时加载其逐字稿候选
+  useEffect(() => {
+    if (selectedNews) {
+      fetchScriptVariants(selectedNews.news_id)
+    } else {
+      setScriptVariants([])
+    }
+  }, [selectedNews?.news_id])
+
   // SortableJS 拖拽结束
   const handleSortEnd = (evt) => {
     if (evt.oldIndex !== evt.newIndex) {
@@ -275,13 +340,44 @@ export default function EpisodeDetail() {
     console.log('Remove news:', newsId)
   }
 
+  // 获取逐字稿候选
+  const fetchScriptVariants = async (newsId) => {
+    try {
+      const variants = await episodesApi.listScriptVariants(parseInt(id), newsId)
+      setScriptVariants(variants)
+    } catch (err) {
+      console.error('Failed to fetch script variants:', err)
+      setScriptVariants([])
+    }
+  }
+
+  // 采用某个候选
+  const selectScriptVariant = async (variant) => {
+    try {
+      await episodesApi.selectScriptVariant(parseInt(id), selectedNews.news_id, variant.id)
+      setSelectedNews({ ...selectedNews, script: variant.script, status: 'script_done' })
+      setScriptVariants(scriptVariants.map(v => ({ ...v, selected: v.id === variant.id })))
+      setEpisodeNews(episodeNews.map(en =>
+        en.id === selectedNews.id ? { ...en, script: variant.script, status: 'script_done' } : en
+      ))
+    } catch (err) {
+      console.error('Failed to select script variant:', err)
+    }
+  }
+
   // 生成脚本
-  const generateScript = async (newsId) => {
+  const generateScript = async (newsId, regenerate = false) => {
     try {
       setGenerating(true)
-      const result = await episodesApi.generateScript(parseInt(id), newsId)
+      const result = await episodesApi.generateScript(parseInt(id), newsId, regenerate)
+      if (selectedNews) {
+        setSelectedNews({ ...selectedNews, script: result.script, status: result.status })
+      }
       // Refresh page data
       await fetchEpisode()
+      if (result.batch_id) {
+        await fetchScriptVariants(newsId)
+      }
     } catch (err) {
       console.error('Failed to generate script:', err)
     } finally {
@@ -290,18 +386,20 @@ export default function EpisodeDetail() {
   }
 
   // 生成音频
-  const generateAudio = async (episodeNewsId) => {
+  const generateAudio = async (target) => {
+    const episodeNewsId = target.id
     try {
       setGenerating(true)
-      const result = await episodesApi.generateAudio(parseInt(id), episodeNewsId)
+      const result = await episodesApi.generateAudio(parseInt(id), target.news_id)
+      const audio = { status: 'audio_done', audio_url: result.audio_url, audio_version: result.audio_version }
       
       // 更新本地状态
       setEpisodeNews(episodeNews.map(en => 
-        en.id === episodeNewsId ? { ...en, status: 'audio_done', audio_url: result.audio_url } : en
+        en.id === episodeNewsId ? { ...en, ...audio } : en
       ))
       
       if (selectedNews?.id === episodeNewsId) {
-        setSelectedNews({ ...selectedNews, status: 'audio_done', audio_url: result.audio_url })
+        setSelectedNews({ ...selectedNews, ...audio })
       }
     } catch (err) {
       console.error('Failed to generate audio:', err)
@@ -740,15 +838,26 @@ export default function EpisodeDetail() {
             {/* 操作按钮 -->
             <div className="flex gap-3 mb-6">
               <button
-                onClick={() => generateScript(selectedNews.news_id)}
+                onClick={() => generateScript(selectedNews.news_id, Boolean(selectedNews.script))}
                 disabled={generating}
                 className="flex items-center gap-2 px-4 py-2 bg-accent-coral text-cream-100 rounded-xl font-medium hover:bg-accent-coral/90 disabled:opacity-50"
               >
                 <FileText className="w-4 h-4" />
                 生成脚本
               </button>
+              <select
+                value={episode?.script_variants || 1}
+                onChange={(e) => updateEpisode({ script_variants: parseInt(e.target.value) })}
+                disabled={generating}
+                className="px-3 py-2 bg-cream-100 border border-cream-300 rounded-xl text-sm text-ink-300 focus:outline-none focus:border-accent-coral"
+                title="每次生成的候选数"
+              >
+                {[1, 2, 3, 4, 5].map(n => (
+                  <option key={n} value={n}>{n === 1 ? '单个候选' : `${n} 个候选`}</option>
+                ))}
+              </select>
               <button
-                onClick={() => generateAudio(selectedNews.id)}
+                onClick={() => generateAudio(selectedNews)}
                 disabled={generating || selectedNews.status !== 'script_done'}
                 className="flex items-center gap-2 px-4 py-2 bg-accent-sage text-white rounded-xl font-medium hover:bg-accent-sage/90 disabled:opacity-50"
               >
@@ -757,6 +866,60 @@ export default function EpisodeDetail() {
               </button>
             </div>
 
+            {/* 音频播放（Range 请求，拖动进度不会下载整个文件） */}
+            {selectedNews.audio_url && (
+              <audio
+                key={selectedNews.audio_version || selectedNews.id}
+                controls
+                preload="metadata"
+                src={episodesApi.audioUrl(parseInt(id), selectedNews.news_id, selectedNews.audio_version)}
+                className="w-full mb-4"
+              />
+            )}
+
+            {/* 生成进度 */}
+            {jobProgress[selectedNews.id] && (
+              <div className="mb-4 text-sm text-ink-50">
+                <div className="flex items-center gap-2">
+                  <Loader2 className="w-4 h-4 animate-spin" />
+                  {jobProgress[selectedNews.id].label}
+                  {jobProgress[selectedNews.id].total > 0 && (
+                    <span>{jobProgress[selectedNews.id].done}/{jobProgress[selectedNews.id].total} 段</span>
+                  )}
+                </div>
+                {jobProgress[selectedNews.id].total > 0 && (
+                  <div className="mt-2 h-1.5 bg-cream-300 rounded-full overflow-hidden">
+                    <div
+                      className="h-full bg-accent-sage transition-all"
+                      style={{ width: `${Math.round(jobProgress[selectedNews.id].done / jobProgress[selectedNews.id].total * 100)}%` }}
+                    />
+                  </div>
+                )}
+              </div>
+            )}
+
+            {/* 逐字稿候选 */}
+            {scriptVariants.length > 1 && (
+              <div className="flex flex-wrap items-center gap-2 mb-4">
+                <span className="text-sm text-ink-50">候选</span>
+                {scriptVariants.map(v => (
+                  <button
+                    key={v.id}
+                    onClick={() => selectScriptVariant(v)}
+                    disabled={v.selected}
+                    className={`px-3 py-1 rounded-full text-sm ${
+                      v.selected
+                        ? 'bg-accent-coral text-cream-100'
+                        : 'bg-cream-200 text-ink-300 hover:bg-cream-300'
+                    }`}
+                    title={`温度 ${v.temperature}`}
+                  >
+                    #{v.variant_index + 1} · {Math.round(v.score * 100)} 分
+                  </button>
+                ))}
+              </div>
+            )}
+
             {/* 脚本区域 */}
             <div className="bg-cream-100 rounded-xl p-6">
               <div className="flex items-center justify-between mb-3">
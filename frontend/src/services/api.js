@@ -86,6 +86,17 @@ export const newsApi = {
 // Episodes API
 export const episodesApi = {
   list: () => request('/episodes/'),
+  // 分页列表 + 新闻进度汇总（一次请求）
+  overview: (params = {}) => {
+    const queryParams = new URLSearchParams()
+    if (params.limit) queryParams.append('limit', params.limit)
+    if (params.offset) queryParams.append('offset', params.offset)
+    if (params.status) queryParams.append('status', params.status)
+    if (params.dateFrom) queryParams.append('date_from', params.dateFrom)
+    if (params.dateTo) queryParams.append('date_to', params.dateTo)
+    const query = queryParams.toString()
+    return request(`/episodes/overview${query ? `?${query}` : ''}`)
+  },
   get: (id) => request(`/episodes/${id}`),
   create: (data) => request('/episodes/', { method: 'POST', body: data }),
   update: (id, data) => request(`/episodes/${id}`, { method: 'PUT', body: data }),
@@ -110,11 +121,22 @@ export const episodesApi = {
     }),
   
   // Generation
-  generateScript: (episodeId, newsId) => request(`/episodes/${episodeId}/news/${newsId}/generate-script`, { method: 'POST' }),
+  generateScript: (episodeId, newsId, regenerate = false) =>
+    request(`/episodes/${episodeId}/news/${newsId}/generate-script${regenerate ? '?regenerate=true' : ''}`, { method: 'POST' }),
+  listScriptVariants: (episodeId, newsId) =>
+    request(`/episodes/${episodeId}/news/${newsId}/script-variants`),
+  selectScriptVariant: (episodeId, newsId, variantId) =>
+    request(`/episodes/${episodeId}/news/${newsId}/script-variants/${variantId}/select`, { method: 'POST' }),
   generateAudio: (episodeId, newsId, voiceId = 'luoyonghao') => 
     request(`/episodes/${episodeId}/news/${newsId}/generate-audio?voice_id=${voiceId}`, { method: 'POST' }),
+  // 音频播放地址（支持 Range；带 version 时可被浏览器长缓存）
+  audioUrl: (episodeId, newsId, version) =>
+    `${API_BASE}/episodes/${episodeId}/news/${newsId}/audio${version ? `?v=${version}` : ''}`,
   generateAll: (episodeId) => request(`/episodes/${episodeId}/generate-all`, { method: 'POST' }),
   
+  // 生成进度事件流（SSE，配合 EventSource 使用）
+  eventsUrl: (episodeId) => `${API_BASE}/episodes/${episodeId}/events`,
+
   // Batch generation
   batchGenerate: (episodeId, data) => request(`/episodes/${episodeId}/batch-generate`, { 
     method: 'POST', 
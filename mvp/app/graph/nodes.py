@@ -0,0 +1,185 @@
+"""流水线节点
+
+每个节点接收 PodcastState，返回需要更新的字段。
+逐条新闻的节点（summarize_story / segment_script）通过 Send 并行执行，
+输入为 {"index", "item"}；summarize_story 只按句子截断素材，不调用 LLM。
+"""
+import logging
+import os
+from typing import Dict
+
+from app.graph.state import PodcastState
+from app.services.artifact_io import NEWS_FILE, NewsRecord, load_news, write_news, write_script
+
+logger = logging.getLogger(__name__)
+
+# 每期节目最多选取的新闻条数
+MAX_STORIES = 10
+# 单条新闻素材的最大字数（按句子边界截断）
+SUMMARY_MAX_CHARS = 400
+
+
+def _paths(state: PodcastState) -> Dict[str, str]:
+    base_dir = state["base_dir"]
+    return {
+        "news": os.path.join(base_dir, NEWS_FILE),
+        "show_notes": os.path.join(base_dir, "show_notes.md"),
+        "talks": os.path.join(base_dir, "talks.txt"),
+        "splits": os.path.join(base_dir, "splits"),
+        "audio": os.path.join(base_dir, f"{state['date']}.mp3"),
+    }
+
+
+# ==================== 抓取新闻 ====================
+
+def fetch_node(state: PodcastState) -> Dict:
+    """抓取 RSS（或读取已有的 news.jsonl）"""
+    news_path = _paths(state)["news"]
+
+    if state.get("skip_fetch"):
+        news_list = load_news(state["base_dir"])
+        print(f"跳过抓取，已加载 {len(news_list)} 条新闻")
+        return {"news_list": news_list}
+
+    from app.services.rss import RSSService
+
+    items = RSSService().fetch_sync(state["rss_url"], limit=MAX_STORIES)
+    news_list = [NewsRecord.from_item(item).to_dict() for item in items]
+    write_news(news_path, news_list, date=state["date"], rss_url=state["rss_url"])
+
+    print(f"获取到 {len(news_list)} 条新闻，已保存: {news_path}")
+    return {"news_list": news_list}
+
+
+# ==================== 筛选新闻 ====================
+
+def select_node(state: PodcastState) -> Dict:
+    """去掉空标题和重复标题，最多保留 MAX_STORIES 条"""
+    seen = set()
+    selected = []
+    for item in state.get("news_list", []):
+        title = item.get("title", "").strip()
+        if not title or title in seen:
+            continue
+        seen.add(title)
+        selected.append(item)
+
+    selected = selected[:MAX_STORIES]
+    print(f"筛选后 {len(selected)} 条新闻")
+    return {"selected": selected}
+
+
+# ==================== 节目笔记 ====================
+
+def show_notes_node(state: PodcastState) -> Dict:
+    """生成 show_notes.md（逐字稿完成后与音频合成同一步执行）"""
+    from app.podcast_pipeline import _generate_show_notes
+
+    path = _paths(state)["show_notes"]
+    _generate_show_notes(state["selected"], path, state["date"])
+    return {"show_notes_path": path}
+
+
+# ==================== 单条新闻素材（并行） ====================
+
+def summarize_story_node(packet: Dict) -> Dict:
+    """整理单条新闻素材：过长的摘要按句子边界截断"""
+    from app.services.segment_planner import split_sentences
+
+    index, item = packet["index"], packet["item"]
+    summary = item.get("summary", "").strip()
+
+    if len(summary) > SUMMARY_MAX_CHARS:
+        kept = ""
+        for sentence in split_sentences(summary):
+            if len(kept) + len(sentence) > SUMMARY_MAX_CHARS:
+                break
+            kept += sentence
+        summary = kept or summary[:SUMMARY_MAX_CHARS]
+
+    return {"summaries": [{
+        "index": index,
+        "title": item.get("title", ""),
+        "url": item.get("url", ""),
+        "summary": summary,
+        "published_at": item.get("published_at"),
+    }]}
+
+
+# ==================== 节目大纲 ====================
+
+def outline_node(state: PodcastState) -> Dict:
+    """按新闻顺序生成节目大纲"""
+    lines = [f"{s['index'] + 1}. {s['title']}" for s in state["summaries"]]
+    return {"outline": "\n".join(lines)}
+
+
+# ==================== 逐字稿 ====================
+
+def _llm():
+    from app.services.llm import get_llm
+    return get_llm()
+
+
+def _save_script(state: PodcastState, body: str) -> Dict:
+    from app.services.llm import get_intro
+
+    script = f"{get_intro()}\n\n{body}"
+    turns = write_script(state["base_dir"], script, date=state["date"])
+
+    print(f"逐字稿已生成 ({len(script)} 字，{len(turns)} 句台词)，已保存: {_paths(state)['talks']}")
+    return {"final_script": script}
+
+
+def write_script_node(state: PodcastState) -> Dict:
+    """单次请求生成整篇逐字稿"""
+    from app.services.llm import generate_podcast_script
+
+    return _save_script(state, generate_podcast_script(state["summaries"], llm=_llm()))
+
+
+def segment_script_node(packet: Dict) -> Dict:
+    """Map：为单条新闻生成对话片段（并行）"""
+    from app.services.llm import generate_script_segment
+
+    segment = generate_script_segment(packet["index"], packet["item"], _llm())
+    return {"script_segments": [segment]}
+
+
+def stitch_node(state: PodcastState) -> Dict:
+    """Reduce：补写开场、过渡和结束语并拼接片段"""
+    from app.services.llm import stitch_script_segments
+
+    return _save_script(state, stitch_script_segments(state["script_segments"], _llm()))
+
+
+# ==================== 音频 ====================
+
+def tts_node(state: PodcastState) -> Dict:
+    """解析逐字稿并合成音频片段"""
+    from app.podcast_pipeline import _plan_segments, _synthesize_segments
+    from app.services.tts import MiniMaxTTSService
+
+    splits_dir = _paths(state)["splits"]
+    os.makedirs(splits_dir, exist_ok=True)
+
+    tts = MiniMaxTTSService()
+    dialogues = tts.parse_script(state["final_script"])
+    print(f"解析到 {len(dialogues)} 段对话")
+
+    segments = _plan_segments(tts, dialogues, splits_dir)
+    return {"audio_parts": _synthesize_segments(tts, segments, splits_dir)}
+
+
+def merge_node(state: PodcastState) -> Dict:
+    """拼接开场白与正文音频"""
+    from app.podcast_pipeline import _prepend_intro
+
+    paths = _paths(state)
+    if not state.get("audio_parts"):
+        raise RuntimeError("没有可合并的音频片段")
+    if not _prepend_intro(paths["splits"], state["audio_parts"], paths["audio"]):
+        raise RuntimeError(f"音频合并失败: {paths['audio']}")
+
+    print(f"完成! 输出: {paths['audio']}")
+    return {"audio_path": paths["audio"]}
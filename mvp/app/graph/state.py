@@ -1,14 +1,36 @@
 from typing import Annotated, TypedDict, List
-from langgraph.graph.message import add_messages
 
-class PodcastState(TypedDict):
+
+def merge_by_index(left: List[dict], right: List[dict]) -> List[dict]:
+    """合并并行节点的输出：按 index 去重（后写覆盖）并排序"""
+    merged = {item["index"]: item for item in (left or [])}
+    merged.update({item["index"]: item for item in (right or [])})
+    return [merged[i] for i in sorted(merged)]
+
+
+class PodcastState(TypedDict, total=False):
+    # ===== 运行参数 =====
+    date: str
+    rss_url: str
+    base_dir: str
+    skip_fetch: bool
+    map_reduce: bool
+    no_tts: bool
+
     # 原始抓取的新闻列表
     news_list: List[dict]
-    # 精选并生成的深度摘要
-    summaries: List[str]
+    # 筛选后进入节目的新闻
+    selected: List[dict]
+    # 逐条整理的新闻素材（按句子截断，每条并行整理，按 index 合并）
+    summaries: Annotated[List[dict], merge_by_index]
     # 节目大纲
     outline: str
     # 逐步生成的对话脚本片段 (用于长文本逻辑)
-    script_segments: List[dict]
+    script_segments: Annotated[List[dict], merge_by_index]
     # 最终合并的全文
     final_script: str
+
+    # ===== 产物 =====
+    show_notes_path: str
+    audio_parts: List[str]
+    audio_path: str
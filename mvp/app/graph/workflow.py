@@ -0,0 +1,144 @@
+"""流水线工作流（LangGraph）
+
+    fetch → select → summarize_story × N → plan_outline ─┬→ write_script ────────────────┬→ tts → merge → END
+                                                         └→ segment_script × N → stitch ─┴→ show_notes → END
+
+- LangGraph 按步（superstep）执行：同一步内的节点并发，全部完成后才进入下一步
+- summarize_story 只整理素材（按句子截断，不调用 LLM），逐条新闻通过 Send 并行；
+  Map-Reduce 模式下的逐条片段同样通过 Send 并行
+- show_notes 与 tts 在同一步执行：节目笔记的 LLM 调用与耗时最长的音频合成重叠，
+  不再拖慢逐字稿；merge 在下一步执行，只有节目笔记慢于 TTS 时才需要等待。
+  no_tts 时 show_notes 在逐字稿之后单独执行
+- 每一步结束后状态写入 {base_dir}/checkpoints.sqlite；
+  失败后重新运行会从最后一个检查点继续，而不是重新抓取 RSS
+"""
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from typing import List, Optional, Union
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.constants import Send
+from langgraph.graph import END, StateGraph
+
+from app.graph import nodes
+from app.graph.state import PodcastState
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "checkpoints.sqlite"
+
+
+def _fan_out_stories(state: PodcastState) -> List[Union[str, Send]]:
+    """select 之后：逐条整理新闻素材"""
+    selected = state.get("selected") or []
+    if not selected:
+        return [END]
+    return [
+        Send("summarize_story", {"index": i, "item": item})
+        for i, item in enumerate(selected)
+    ]
+
+
+def _route_script(state: PodcastState) -> Union[str, List[Send]]:
+    """plan_outline 之后：整篇生成或逐条 Map-Reduce"""
+    if not state.get("map_reduce"):
+        return "write_script"
+    return [
+        Send("segment_script", {"index": s["index"], "item": s})
+        for s in state["summaries"]
+    ]
+
+
+def _route_audio(state: PodcastState) -> List[str]:
+    """逐字稿完成后：节目笔记与音频合成同一步执行"""
+    return ["show_notes"] if state.get("no_tts") else ["tts", "show_notes"]
+
+
+def build_workflow() -> StateGraph:
+    """构建流水线图"""
+    graph = StateGraph(PodcastState)
+
+    graph.add_node("fetch", nodes.fetch_node)
+    graph.add_node("select", nodes.select_node)
+    graph.add_node("show_notes", nodes.show_notes_node)
+    graph.add_node("summarize_story", nodes.summarize_story_node)
+    graph.add_node("plan_outline", nodes.outline_node)
+    graph.add_node("write_script", nodes.write_script_node)
+    graph.add_node("segment_script", nodes.segment_script_node)
+    graph.add_node("stitch", nodes.stitch_node)
+    graph.add_node("tts", nodes.tts_node)
+    graph.add_node("merge", nodes.merge_node)
+
+    graph.set_entry_point("fetch")
+    graph.add_edge("fetch", "select")
+    graph.add_conditional_edges("select", _fan_out_stories)
+    graph.add_edge("show_notes", END)
+    graph.add_edge("summarize_story", "plan_outline")
+    graph.add_conditional_edges("plan_outline", _route_script)
+    graph.add_edge("segment_script", "stitch")
+    graph.add_conditional_edges("write_script", _route_audio)
+    graph.add_conditional_edges("stitch", _route_audio)
+    graph.add_edge("tts", "merge")
+    graph.add_edge("merge", END)
+
+    return graph
+
+
+def _compile(conn: sqlite3.Connection):
+    return build_workflow().compile(checkpointer=SqliteSaver(conn))
+
+
+def run_workflow(
+    date: str,
+    base_dir: str,
+    rss_url: str = "",
+    skip_fetch: bool = False,
+    map_reduce: bool = False,
+    no_tts: bool = False,
+    resume: bool = True
+) -> Optional[PodcastState]:
+    """
+    运行流水线
+
+    Args:
+        date: 日期（同时作为检查点的 thread_id）
+        base_dir: 输出目录
+        resume: 上次运行未完成时从检查点继续；False 则丢弃检查点重新开始
+
+    Returns:
+        最终状态
+    """
+    os.makedirs(base_dir, exist_ok=True)
+    checkpoint_path = os.path.join(base_dir, CHECKPOINT_FILE)
+    config = {"configurable": {"thread_id": date}}
+
+    inputs = None
+    with closing(sqlite3.connect(checkpoint_path, check_same_thread=False)) as conn:
+        snapshot = _compile(conn).get_state(config)
+        fresh = not (resume and snapshot.next)
+
+    if fresh:
+        # 新的一次运行：丢弃旧检查点，避免按 index 合并的字段残留上次的结果
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(checkpoint_path + suffix):
+                os.remove(checkpoint_path + suffix)
+        inputs = {
+            "date": date,
+            "rss_url": rss_url,
+            "base_dir": base_dir,
+            "skip_fetch": skip_fetch,
+            "map_reduce": map_reduce,
+            "no_tts": no_tts,
+        }
+    else:
+        print(f"从检查点继续，待执行节点: {', '.join(snapshot.next)}")
+
+    with closing(sqlite3.connect(checkpoint_path, check_same_thread=False)) as conn:
+        app = _compile(conn)
+        for step in app.stream(inputs, config, stream_mode="updates"):
+            for node in step:
+                logger.info(f"节点完成: {node}")
+
+        return app.get_state(config).values
@@ -2,21 +2,33 @@
 播客生成流水线
 整合：RSS -> LLM -> TTS -> 合并音频
 
-目录结构：
-data/output/{date}/
-    - news.txt      (抓取的新闻源稿)
+目录结构（根目录由 OUTPUT_DIR 指定，默认 data/output）：
+{OUTPUT_DIR}/{date}/
+    - news.jsonl    (抓取的新闻，格式见 app/services/artifact_io.py)
     - show_notes.md (节目笔记)
-    - talks.txt      (生成的逐字稿)
-    - splits/        (音频片段)
+    - talks.txt      (生成的逐字稿原文)
+    - talks.jsonl    (解析后的台词)
+    - splits/        (音频片段，segments.jsonl 为分段清单)
     - {date}.mp3     (合并后的音频)
+    - checkpoints.sqlite (流水线检查点，失败后从此处继续)
+
+配置 ARTIFACT_STORE 后（见 app/services/artifact_store.py），产物同时发布到共享存储：
+其他 worker 缺少新闻 / 逐字稿时从存储取回，已合成的片段按内容复用，不再调用 TTS。
 """
 import os
 import sys
 import json
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
 from dotenv import load_dotenv
 
+from app.services.artifact_io import (
+    LEGACY_NEWS_FILE, NEWS_FILE, SCRIPT_FILE, SCRIPT_TEXT_FILE,
+    load_news, load_script, write_script, write_segments,
+)
+
 load_dotenv()
 
 logging.basicConfig(
@@ -26,6 +38,57 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+OUTPUT_DIR = os.getenv("OUTPUT_DIR", "data/output")
+
+
+def _base_dir(date: str) -> str:
+    return os.path.join(OUTPUT_DIR, date)
+
+
+def _fetch_input(date: str, base_dir: str, *names: str) -> bool:
+    """本地缺少输入文件时，从产物存储取回（names 为候选文件，任一可用即可）"""
+    if any(os.path.exists(os.path.join(base_dir, name)) for name in names):
+        return True
+
+    from app.services.artifact_store import get_artifact_store
+    store = get_artifact_store()
+    if store is None:
+        return False
+    for name in names:
+        if store.get_file(f"{date}/{name}", os.path.join(base_dir, name)):
+            print(f"已从产物存储取回: {date}/{name}")
+            return True
+    return False
+
+
+def _fetch_script(date: str, base_dir: str) -> bool:
+    """取回逐字稿（原文和台词都取，便于之后发布）"""
+    found = [_fetch_input(date, base_dir, name) for name in (SCRIPT_TEXT_FILE, SCRIPT_FILE)]
+    return any(found)
+
+
+def _load_dialogues(base_dir: str) -> list:
+    """读取逐字稿台词为 TTS 对话列表"""
+    from app.services.tts import Dialogue
+    return [
+        Dialogue(speaker=turn.speaker, text=turn.text, index=i)
+        for i, turn in enumerate(load_script(base_dir))
+    ]
+
+
+def _publish_outputs(date: str, base_dir: str, *names: str):
+    """将本地产物发布到产物存储（未配置存储时跳过）"""
+    from app.services.artifact_store import get_artifact_store
+    store = get_artifact_store()
+    if store is None:
+        return
+
+    for name in names:
+        path = os.path.join(base_dir, name)
+        if os.path.exists(path):
+            store.put_file(f"{date}/{name}", path)
+            print(f"已发布: {date}/{name}")
+
 
 def _generate_show_notes(news_items: list, output_path: str, date: str):
     """生成 show_notes.md（仅标题和摘要）"""
@@ -44,7 +107,62 @@ def _generate_show_notes(news_items: list, output_path: str, date: str):
     print(f"已生成: {output_path}")
 
 
-def run_pipeline(date: str = None, rss_url: str = None, no_tts: bool = False, skip_fetch: bool = False):
+def _plan_segments(tts, dialogues: list, splits_dir: str) -> list:
+    """将对话规划为 TTS 分段，并将分段与原始对话的对应关系写入 splits/segments.jsonl"""
+    segments = tts.plan_segments(dialogues)
+    print(f"{len(dialogues)} 段对话规划为 {len(segments)} 个 TTS 任务")
+
+    write_segments(splits_dir, segments, dialogues=len(dialogues))
+
+    return segments
+
+
+def _synthesize_segments(tts, segments: list, splits_dir: str) -> list:
+    """
+    合成音频片段，复用产物存储中内容相同的片段
+
+    片段键由音色参数和文本决定（见 segment_key），其他 worker 合成过的片段直接取回，
+    新合成的片段发布到存储。未配置存储时等同于 tts.batch_generate。
+    """
+    from app.services.artifact_store import get_artifact_store, segment_key
+    from app.services.voice_roster import MINIMAX, get_voice_roster
+
+    store = get_artifact_store()
+    if store is None:
+        return tts.batch_generate(segments, splits_dir)
+
+    os.makedirs(splits_dir, exist_ok=True)
+    roster = get_voice_roster()
+    keyed = [
+        (seg, os.path.join(splits_dir, f"part_{seg.index+1:03d}.mp3"),
+         segment_key(seg.text, roster.voice(seg.speaker, MINIMAX), MINIMAX))
+        for seg in segments
+    ]
+
+    reused = [
+        path for seg, path, key in keyed
+        if not os.path.exists(path) and store.get_file(key, path, link=True)
+    ]
+    if reused:
+        print(f"从产物存储复用 {len(reused)} 个片段")
+
+    audio_parts = tts.batch_generate(segments, splits_dir)
+
+    for seg, path, key in keyed:
+        if os.path.exists(path) and not store.exists(key):
+            store.put_file(key, path)
+
+    return sorted(audio_parts + reused)
+
+
+def run_pipeline(
+    date: str = None,
+    rss_url: str = None,
+    no_tts: bool = False,
+    skip_fetch: bool = False,
+    map_reduce: bool = False,
+    resume: bool = True
+):
     """
     运行完整流水线
 
@@ -52,7 +170,9 @@ def run_pipeline(date: str = None, rss_url: str = None, no_tts: bool = False, sk
         date: 日期字符串，如 "2026-02-05"
         rss_url: RSS 订阅地址
         no_tts: 跳过 TTS 阶段（仅新闻+逐字稿）
-        skip_fetch: 跳过新闻抓取，使用已有的 news.txt
+        skip_fetch: 跳过新闻抓取，使用已有的 news.jsonl
+        map_reduce: 逐条新闻并发生成片段再串联（见 generate_podcast_script）
+        resume: 上次运行失败时从检查点继续（见 app/graph/workflow.py）
     """
     if date is None:
         date = datetime.now().strftime("%Y-%m-%d")
@@ -63,16 +183,10 @@ def run_pipeline(date: str = None, rss_url: str = None, no_tts: bool = False, sk
             print("错误: 请在 .env 文件中配置 RSS_URL")
             return
 
-    # 目录结构
-    base_dir = f"data/output/{date}"
-    news_path = os.path.join(base_dir, "news.txt")
-    show_notes_path = os.path.join(base_dir, "show_notes.md")
-    talks_path = os.path.join(base_dir, "talks.txt")
-    splits_dir = os.path.join(base_dir, "splits")
-    audio_path = os.path.join(base_dir, f"{date}.mp3")
-
-    os.makedirs(base_dir, exist_ok=True)
-    os.makedirs(splits_dir, exist_ok=True)
+    base_dir = _base_dir(date)
+    if skip_fetch:
+        os.makedirs(base_dir, exist_ok=True)
+        _fetch_input(date, base_dir, NEWS_FILE, LEGACY_NEWS_FILE)
 
     print("=" * 70)
     print(f"播客生成流水线 - {date}")
@@ -80,138 +194,183 @@ def run_pipeline(date: str = None, rss_url: str = None, no_tts: bool = False, sk
     print(f"RSS: {rss_url}")
     print(f"输出目录: {base_dir}")
 
-    # === 阶段 1: 获取新闻 ===
-    print("\n" + "=" * 70)
-    print("[阶段 1] 获取新闻...")
-    print("=" * 70)
-
-    from app.services.rss import RSSService, RSSItem
+    from app.graph.workflow import run_workflow
 
-    news_items = []
     try:
-        if skip_fetch:
-            # 跳过抓取，使用已有的 news.txt
-            if not os.path.exists(news_path):
-                print(f"错误: news.txt 不存在: {news_path}")
-                return
-            print(f"跳过抓取，使用已有新闻: {news_path}")
-
-            # 解析已有的 news.txt
-            with open(news_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # 简单解析格式：新闻N: 标题 / URL: xxx / 摘要: xxx
-            items = content.strip().split("\n\n")
-            for item_text in items:
-                lines = item_text.strip().split("\n")
-                news_item = RSSItem(
-                    title=lines[0].split(":", 1)[1].strip() if ":" in lines[0] else "",
-                    url=lines[1].replace("URL:", "").strip() if len(lines) > 1 else "",
-                    summary=lines[2].replace("摘要:", "").strip() if len(lines) > 2 else ""
-                )
-                news_items.append(news_item)
-
-            print(f"已加载 {len(news_items)} 条新闻")
-        else:
-            # 正常抓取
-            rss_service = RSSService()
-            news_items = rss_service.fetch_sync(rss_url, limit=10)
-
-            # 保存新闻源稿
-            with open(news_path, "w", encoding="utf-8") as f:
-                for i, item in enumerate(news_items, 1):
-                    f.write(f"新闻{i}: {item.title}\n")
-                    f.write(f"URL: {item.url}\n")
-                    f.write(f"摘要: {item.summary}\n")
-                    f.write("\n")
-
-            print(f"获取到 {len(news_items)} 条新闻")
-            print(f"已保存: {news_path}")
-
-        # 生成 show_notes.md
-        _generate_show_notes(news_items, show_notes_path, date)
-
+        state = run_workflow(
+            date,
+            base_dir,
+            rss_url=rss_url,
+            skip_fetch=skip_fetch,
+            map_reduce=map_reduce,
+            no_tts=no_tts,
+            resume=resume
+        )
     except Exception as e:
-        logger.error(f"获取新闻失败: {e}")
+        logger.error(f"流水线失败（重新运行将从最后一个检查点继续）: {e}")
         return
 
-    # === 阶段 2: 生成逐字稿 ===
+    _publish_outputs(
+        date, base_dir, NEWS_FILE, "show_notes.md", SCRIPT_TEXT_FILE, SCRIPT_FILE, f"{date}.mp3"
+    )
+
+    # === 完成 ===
     print("\n" + "=" * 70)
-    print("[阶段 2] 生成逐字稿...")
+    print("[完成]")
+    print("=" * 70)
+    print(f"日期: {date}")
+    print(f"新闻: {len(state.get('selected', []))} 条")
+    print(f"逐字稿: {os.path.join(base_dir, SCRIPT_TEXT_FILE)}")
+    if state.get("audio_path"):
+        print(f"音频: {state['audio_path']}")
     print("=" * 70)
 
-    from app.services.llm import generate_podcast_script, get_intro
 
-    try:
-        # 生成正文（不含开场白）
-        body = generate_podcast_script(news_items)
+# ==================== 批量模式 ====================
 
-        # 添加固定开场白
-        intro = get_intro()
-        script = f"{intro}\n\n{body}"
+# 批量模式每个 RSS 源抓取的条数（按发布日期分到各天）
+BATCH_FETCH_LIMIT = 200
+# 同时处理的天数
+BATCH_WORKERS = 3
 
-        # 保存逐字稿
-        with open(talks_path, "w", encoding="utf-8") as f:
-            f.write(script)
 
-        print(f"逐字稿已生成 ({len(script)} 字)")
-        print(f"已保存: {talks_path}")
+def _date_range(start: str, end: str) -> list:
+    """[start, end] 内的日期字符串（含两端）"""
+    first = datetime.strptime(start, "%Y-%m-%d").date()
+    last = datetime.strptime(end, "%Y-%m-%d").date()
+    if last < first:
+        first, last = last, first
+    return [
+        (first + timedelta(days=i)).strftime("%Y-%m-%d")
+        for i in range((last - first).days + 1)
+    ]
 
-    except Exception as e:
-        logger.error(f"生成逐字稿失败: {e}")
-        return
-
-    # === 阶段 3: TTS 生成 ===
-    if no_tts:
-        print("\n" + "=" * 70)
-        print("[跳过] TTS 阶段 (--no-tts)")
-        print("=" * 70)
-        print("\n" + "=" * 70)
-        print("[完成]")
-        print("=" * 70)
-        print(f"日期: {date}")
-        print(f"新闻: {len(news_items)} 条")
-        print(f"逐字稿: {talks_path}")
-        print("=" * 70)
-        return
 
-    print("\n" + "=" * 70)
-    print("[阶段 3] 生成音频...")
-    print("=" * 70)
+def _published_date(value: str) -> str:
+    """RSS pubDate（RFC 822）或 ISO 时间 -> YYYY-MM-DD，无法解析返回空串"""
+    if not value:
+        return ""
+    try:
+        return parsedate_to_datetime(value).strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).strftime("%Y-%m-%d")
+    except ValueError:
+        return ""
 
-    from app.services.tts import MiniMaxTTSService
 
-    tts = MiniMaxTTSService()
+def _prefetch_news(dates: list, rss_urls: list, resume: bool = True) -> list:
+    """
+    每个 RSS 源只抓取一次，按发布日期分到各天的 news.jsonl
 
-    # 解析对话
-    dialogues = tts.parse_script(script)
-    print(f"解析到 {len(dialogues)} 段对话")
+    已有 news.jsonl 且 resume 时保留（重跑不会覆盖上次的素材）。
+    返回有新闻的日期。
+    """
+    from app.services.artifact_io import NewsRecord, write_news
+    from app.services.rss import RSSService
+
+    wanted = set(dates)
+    buckets = {date: [] for date in dates}
+    rss = RSSService()
+    for url in rss_urls:
+        try:
+            items = rss.fetch_sync(url, limit=BATCH_FETCH_LIMIT)
+        except Exception as e:
+            logger.error(f"抓取失败，跳过该源: {url}: {e}")
+            continue
+        undated = 0
+        for item in items:
+            day = _published_date(item.published_at)
+            if not day:
+                undated += 1
+            elif day in wanted:
+                record = NewsRecord.from_item(item)
+                record.source = url
+                buckets[day].append(record.to_dict())
+        print(f"{url}: {len(items)} 条（无发布日期 {undated} 条）")
+
+    ready = []
+    for date in dates:
+        base_dir = _base_dir(date)
+        if resume and os.path.exists(os.path.join(base_dir, NEWS_FILE)):
+            ready.append(date)
+        elif buckets[date]:
+            write_news(os.path.join(base_dir, NEWS_FILE), buckets[date], date=date, rss_urls=rss_urls)
+            ready.append(date)
+        else:
+            print(f"{date}: 没有该日发布的新闻，跳过")
+    return ready
+
+
+def run_batch(
+    start: str,
+    end: str,
+    rss_urls: list,
+    no_tts: bool = False,
+    map_reduce: bool = False,
+    resume: bool = True,
+    workers: int = BATCH_WORKERS
+) -> dict:
+    """
+    批量模式：日期范围 × 多个 RSS 源
 
-    luo = sum(1 for d in dialogues if d.speaker == "luoyonghao")
-    wang = sum(1 for d in dialogues if d.speaker == "wangziru")
-    print(f"罗永浩: {luo} 次，王自如: {wang} 次\n")
+    - 每个源只抓一次，新闻按发布日期分到各天
+    - 多天共用一个 worker 池并行执行（第 1 天的 TTS 与第 2 天的 LLM 同时进行），
+      各天的流水线仍按自己的图执行、各自写检查点
+    - 实际吞吐受服务商全局限流约束（MINIMAX_* / DEEPSEEK_*，见 app/services/rate_limit.py），
+      而不是逐天串行
 
-    # 生成音频片段
-    audio_parts = tts.batch_generate(dialogues, splits_dir)
+    Returns:
+        {date: "done" | "skipped" | "failed: ..."}
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from app.graph.workflow import run_workflow
+    from app.services.rate_limit import DEEPSEEK, MINIMAX, get_rate_limiter
 
-    if audio_parts:
-        # 合并音频
-        print("\n" + "=" * 70)
-        print("[阶段 4] 合并音频...")
-        print("=" * 70)
+    dates = _date_range(start, end)
+    print("=" * 70)
+    print(f"批量生成 - {dates[0]} ~ {dates[-1]}（{len(dates)} 天，{len(rss_urls)} 个源，{workers} 并行）")
+    print("=" * 70)
 
-        _prepend_intro(splits_dir, audio_parts, audio_path)
-        print(f"\n完成! 输出: {audio_path}")
+    results = {date: "skipped" for date in dates}
+    ready = _prefetch_news(dates, rss_urls, resume=resume)
+
+    def run_day(date: str):
+        base_dir = _base_dir(date)
+        run_workflow(
+            date,
+            base_dir,
+            skip_fetch=True,
+            map_reduce=map_reduce,
+            no_tts=no_tts,
+            resume=resume
+        )
+        _publish_outputs(
+            date, base_dir, NEWS_FILE, "show_notes.md", SCRIPT_TEXT_FILE, SCRIPT_FILE, f"{date}.mp3"
+        )
+
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(run_day, date): date for date in ready}
+        for future in as_completed(futures):
+            date = futures[future]
+            try:
+                future.result()
+                results[date] = "done"
+                print(f"[{date}] 完成")
+            except Exception as e:
+                results[date] = f"failed: {e}"
+                logger.error(f"[{date}] 失败（重新运行将从检查点继续）: {e}")
 
-    # === 完成 ===
     print("\n" + "=" * 70)
-    print("[完成]")
-    print("=" * 70)
-    print(f"日期: {date}")
-    print(f"新闻: {len(news_items)} 条")
-    print(f"对话: {len(dialogues)} 段")
-    print(f"音频: {audio_path}")
+    print(f"[批量完成] 用时 {time.time() - start_time:.0f}s")
+    for date in dates:
+        print(f"  {date}: {results[date]}")
+    for provider in (DEEPSEEK, MINIMAX):
+        print(f"  {get_rate_limiter(provider).summary()}")
     print("=" * 70)
+    return results
 
 
 def _prepend_intro(splits_dir: str, audio_parts: list, final_output: str, skip_existing: bool = True) -> bool:
@@ -246,10 +405,10 @@ def generate_audio_only(date: str):
     仅生成音频（跳过 LLM）
     适用于逐字稿已生成的情况
     """
-    base_dir = f"data/output/{date}"
-    talks_path = os.path.join(base_dir, "talks.txt")
+    base_dir = _base_dir(date)
+    talks_path = os.path.join(base_dir, SCRIPT_TEXT_FILE)
 
-    if not os.path.exists(talks_path):
+    if not _fetch_script(date, base_dir):
         print(f"错误: 逐字稿文件不存在: {talks_path}")
         return
 
@@ -260,15 +419,17 @@ def generate_audio_only(date: str):
     from app.services.tts import MiniMaxTTSService
 
     tts = MiniMaxTTSService()
-    dialogues = tts.parse_dialogues(talks_path)
+    dialogues = _load_dialogues(base_dir)
     print(f"解析到 {len(dialogues)} 段对话")
 
     splits_dir = os.path.join(base_dir, "splits")
-    audio_parts = tts.batch_generate(dialogues, splits_dir)
+    segments = _plan_segments(tts, dialogues, splits_dir)
+    audio_parts = _synthesize_segments(tts, segments, splits_dir)
 
     if audio_parts:
         audio_path = os.path.join(base_dir, f"{date}.mp3")
-        _prepend_intro(splits_dir, audio_parts, audio_path)
+        if _prepend_intro(splits_dir, audio_parts, audio_path):
+            _publish_outputs(date, base_dir, f"{date}.mp3")
         print(f"\n完成: {audio_path}")
 
 
@@ -277,7 +438,7 @@ def merge_audio_only(date: str):
     仅合并音频
     适用于音频片段已生成的情况
     """
-    base_dir = f"data/output/{date}"
+    base_dir = _base_dir(date)
     splits_dir = os.path.join(base_dir, "splits")
     audio_path = os.path.join(base_dir, f"{date}.mp3")
 
@@ -299,67 +460,51 @@ def merge_audio_only(date: str):
         os.path.basename(x).split('_')[1].split('.')[0]
     ))
 
-    from app.services.tts import MiniMaxTTSService
-    tts = MiniMaxTTSService()
     _prepend_intro(splits_dir, audio_parts, audio_path)
 
 
-def cmd_generate_script(date: str):
+def cmd_generate_script(date: str, map_reduce: bool = False):
     """
     单步命令：仅生成逐字稿
     """
-    base_dir = f"data/output/{date}"
-    news_path = os.path.join(base_dir, "news.txt")
-    talks_path = os.path.join(base_dir, "talks.txt")
+    base_dir = _base_dir(date)
+    news_path = os.path.join(base_dir, NEWS_FILE)
+    talks_path = os.path.join(base_dir, SCRIPT_TEXT_FILE)
 
-    if not os.path.exists(news_path):
-        print(f"错误: news.txt 不存在: {news_path}")
+    if not _fetch_input(date, base_dir, NEWS_FILE, LEGACY_NEWS_FILE):
+        print(f"错误: {NEWS_FILE} 不存在: {news_path}")
         return
 
     print("=" * 70)
     print(f"生成逐字稿 - {date}")
     print("=" * 70)
 
-    # 解析 news.txt
-    from app.services.rss import RSSItem
-    news_items = []
-    with open(news_path, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    items = content.strip().split("\n\n")
-    for item_text in items:
-        lines = item_text.strip().split("\n")
-        if len(lines) >= 3:
-            news_items.append(RSSItem(
-                title=lines[0].split(":", 1)[1].strip() if ":" in lines[0] else "",
-                url=lines[1].replace("URL:", "").strip(),
-                summary=lines[2].replace("摘要:", "").strip()
-            ))
+    news_items = load_news(base_dir)
 
     print(f"已加载 {len(news_items)} 条新闻")
 
     # 生成逐字稿
     from app.services.llm import generate_podcast_script, get_intro
-    body = generate_podcast_script(news_items)
+    body = generate_podcast_script(news_items, map_reduce=map_reduce)
     intro = get_intro()
     script = f"{intro}\n\n{body}"
 
-    with open(talks_path, "w", encoding="utf-8") as f:
-        f.write(script)
+    turns = write_script(base_dir, script, date=date)
 
     print(f"逐字稿已生成: {talks_path}")
-    print(f"字数: {len(script)}")
+    print(f"字数: {len(script)}，台词: {len(turns)} 句")
+    _publish_outputs(date, base_dir, SCRIPT_TEXT_FILE, SCRIPT_FILE)
 
 
 def cmd_generate_audio(date: str):
     """
     单步命令：仅生成音频（需要逐字稿）
     """
-    base_dir = f"data/output/{date}"
-    talks_path = os.path.join(base_dir, "talks.txt")
+    base_dir = _base_dir(date)
+    talks_path = os.path.join(base_dir, SCRIPT_TEXT_FILE)
     splits_dir = os.path.join(base_dir, "splits")
 
-    if not os.path.exists(talks_path):
+    if not _fetch_script(date, base_dir):
         print(f"错误: talks.txt 不存在: {talks_path}")
         return
 
@@ -370,10 +515,11 @@ def cmd_generate_audio(date: str):
     from app.services.tts import MiniMaxTTSService
     tts = MiniMaxTTSService()
 
-    dialogues = tts.parse_dialogues(talks_path)
+    dialogues = _load_dialogues(base_dir)
     print(f"解析到 {len(dialogues)} 段对话")
 
-    audio_parts = tts.batch_generate(dialogues, splits_dir)
+    segments = _plan_segments(tts, dialogues, splits_dir)
+    audio_parts = _synthesize_segments(tts, segments, splits_dir)
 
     if audio_parts:
         print(f"已生成 {len(audio_parts)} 个音频片段")
@@ -385,38 +531,23 @@ def cmd_generate_shownotes(date: str):
     """
     单步命令：仅生成 show_notes.md
     """
-    base_dir = f"data/output/{date}"
-    news_path = os.path.join(base_dir, "news.txt")
+    base_dir = _base_dir(date)
+    news_path = os.path.join(base_dir, NEWS_FILE)
     show_notes_path = os.path.join(base_dir, "show_notes.md")
 
-    if not os.path.exists(news_path):
-        print(f"错误: news.txt 不存在: {news_path}")
+    if not _fetch_input(date, base_dir, NEWS_FILE, LEGACY_NEWS_FILE):
+        print(f"错误: {NEWS_FILE} 不存在: {news_path}")
         return
 
     print("=" * 70)
     print(f"生成 show_notes - {date}")
     print("=" * 70)
 
-    # 解析 news.txt
-    from app.services.rss import RSSItem
-    news_items = []
-    with open(news_path, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    items = content.strip().split("\n\n")
-    for item_text in items:
-        lines = item_text.strip().split("\n")
-        if len(lines) >= 3:
-            news_items.append(RSSItem(
-                title=lines[0].split(":", 1)[1].strip() if ":" in lines[0] else "",
-                url=lines[1].replace("URL:", "").strip(),
-                summary=lines[2].replace("摘要:", "").strip()
-            ))
+    news_items = load_news(base_dir)
 
     _generate_show_notes(news_items, show_notes_path, date)
     print(f"已生成 {len(news_items)} 条新闻记录")
-    tts = MiniMaxTTSService()
-    _prepend_intro(splits_dir, audio_parts, audio_path)
+    _publish_outputs(date, base_dir, "show_notes.md")
 
 
 def print_help():
@@ -438,11 +569,19 @@ def print_help():
   --audio-only     仅生成音频（跳过 LLM）
   --merge-only     仅合并音频
   --no-tts         跳过 TTS 阶段（仅新闻+逐字稿）
-  --skip-fetch     跳过新闻抓取，使用已有的 news.txt
-  --script         单步：仅生成逐字稿（需要 news.txt）
+  --skip-fetch     跳过新闻抓取，使用已有的 news.jsonl（旧的 news.txt 也可读取）
+  --script         单步：仅生成逐字稿（需要 news.jsonl）
   --audio          单步：仅生成音频片段（需要 talks.txt）
-  --shownotes      单步：仅生成 show_notes（需要 news.txt）
+  --shownotes      单步：仅生成 show_notes（需要 news.jsonl）
   --rss URL        指定 RSS 订阅地址
+  --map-reduce     逐条新闻并发生成对话片段，再串联成完整逐字稿
+  --restart        丢弃上次未完成运行的检查点，从头开始
+
+【批量模式】（指定 --from/--to 或多个 --rss 时启用）
+  --from DATE      起始日期（含）
+  --to DATE        结束日期（含），默认与起始日期相同
+  --rss URL        可重复，多个 RSS 源的新闻按发布日期合并到各天
+  --workers N      同时处理的天数（默认 3），总吞吐由 MINIMAX_RPM / DEEPSEEK_RPM 等全局限流决定
 
 【使用示例】
 
@@ -462,26 +601,33 @@ def print_help():
 
   # 5. 跳过某些阶段
   python podcast_pipeline.py --no-tts           # 跳过 TTS
-  python podcast_pipeline.py --skip-fetch       # 跳过抓取，使用 news.txt
+  python podcast_pipeline.py --skip-fetch       # 跳过抓取，使用 news.jsonl
   python podcast_pipeline.py --audio-only       # 跳过 LLM，直接 TTS
+  python podcast_pipeline.py --map-reduce       # 新闻较多时并发生成逐字稿
 
   # 6. 仅合并音频
   python podcast_pipeline.py --merge-only
 
-【输出目录结构】
+  # 7. 批量回填一周，两个源，4 天并行
+  python podcast_pipeline.py --from 2026-02-01 --to 2026-02-07 --rss URL1 --rss URL2 --workers 4
+
+【输出目录结构】（OUTPUT_DIR 可改根目录）
 
-  data/output/{date}/
-      news.txt      - 抓取的新闻源稿
-      talks.txt     - 生成的逐字稿
+  {OUTPUT_DIR}/{date}/
+      news.jsonl    - 抓取的新闻（JSON Lines，首行为带 schema 版本的文件头）
+      talks.txt     - 生成的逐字稿原文（可手工修改，修改后优先于 talks.jsonl）
+      talks.jsonl   - 解析后的台词
       splits/       - 音频片段 (part_001.mp3...)
       {date}.mp3    - 合并后的音频
 
 【注意事项】
 
   - 每次运行会覆盖同名文件
-  - 使用 --skip-fetch 前需确保 news.txt 已存在
+  - 完整流水线失败后重新运行会从检查点 (checkpoints.sqlite) 继续，--restart 从头开始
+  - 使用 --skip-fetch 前需确保 news.jsonl（或旧的 news.txt）已存在
   - 使用 --audio-only 前需确保 talks.txt 已存在
   - 使用 --merge-only 前需确保 splits/ 目录存在
+  - 配置 ARTIFACT_STORE=local|s3 后，产物发布到共享存储，其他 worker 可取回输入并复用已合成片段
 
 ================================================================================
 """
@@ -499,7 +645,10 @@ def main():
 
     # 解析参数
     date = None
-    rss_url = None
+    rss_urls = []
+    start_date = None
+    end_date = None
+    workers = BATCH_WORKERS
     audio_only = False
     merge_only = False
     no_tts = False
@@ -507,6 +656,8 @@ def main():
     cmd_script = False
     cmd_audio = False
     cmd_shownotes = False
+    map_reduce = False
+    resume = True
 
     i = 0
     while i < len(args):
@@ -516,7 +667,16 @@ def main():
             date = arg
             i += 1
         elif arg == "--rss" and i + 1 < len(args):
-            rss_url = args[i + 1]
+            rss_urls.append(args[i + 1])
+            i += 2
+        elif arg == "--from" and i + 1 < len(args):
+            start_date = args[i + 1]
+            i += 2
+        elif arg == "--to" and i + 1 < len(args):
+            end_date = args[i + 1]
+            i += 2
+        elif arg == "--workers" and i + 1 < len(args):
+            workers = int(args[i + 1])
             i += 2
         elif arg == "--audio-only":
             audio_only = True
@@ -539,6 +699,12 @@ def main():
         elif arg == "--shownotes":
             cmd_shownotes = True
             i += 1
+        elif arg == "--map-reduce":
+            map_reduce = True
+            i += 1
+        elif arg == "--restart":
+            resume = False
+            i += 1
         else:
             i += 1
 
@@ -546,9 +712,27 @@ def main():
     if date is None:
         date = datetime.now().strftime("%Y-%m-%d")
 
+    # 批量模式
+    if start_date or end_date or len(rss_urls) > 1:
+        if not rss_urls:
+            rss_urls = [u.strip() for u in os.getenv("RSS_URL", "").split(",") if u.strip()]
+        if not rss_urls:
+            print("错误: 请用 --rss 指定或在 .env 文件中配置 RSS_URL")
+            return
+        run_batch(
+            start_date or end_date or date,
+            end_date or start_date or date,
+            rss_urls,
+            no_tts=no_tts,
+            map_reduce=map_reduce,
+            resume=resume,
+            workers=workers
+        )
+        return
+
     # 执行单步命令
     if cmd_script:
-        cmd_generate_script(date)
+        cmd_generate_script(date, map_reduce)
     elif cmd_audio:
         cmd_generate_audio(date)
     elif cmd_shownotes:
@@ -558,7 +742,7 @@ def main():
     elif audio_only:
         generate_audio_only(date)
     else:
-        run_pipeline(date, rss_url, no_tts, skip_fetch)
+        run_pipeline(date, rss_urls[0] if rss_urls else None, no_tts, skip_fetch, map_reduce, resume)
 
 
 if __name__ == "__main__":
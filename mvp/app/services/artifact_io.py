@@ -0,0 +1,237 @@
+"""
+流水线产物的结构化格式（JSON Lines）
+
+每个产物文件第一行是文件头，之后每行一条记录：
+
+    {"type": "header", "kind": "news", "schema": 1, "date": "2026-02-05", "created_at": "..."}
+    {"title": "...", "url": "...", "summary": "...", "published_at": "...", "source": "..."}
+
+- news.jsonl：抓取的新闻（NewsRecord），替代 news.txt（多行摘要、published_at 不再丢失）
+- talks.jsonl：逐字稿台词 {speaker, text}；talks.txt 保留原文（含开场白）供阅读和手工修改
+- splits/segments.jsonl：TTS 分段 {index, speaker, text, source_indices}
+
+写入先写同目录临时文件再原子重命名；读取逐行流式解析，并校验 kind 与 schema 版本。
+旧的 news.txt 仍可读取（load_news 自动回退），不再写入。
+"""
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+
+from .script_format import ScriptParser, Turn, parse_script
+
+SCHEMA_VERSION = 1
+
+NEWS = "news"
+SCRIPT = "script"
+SEGMENTS = "segments"
+
+NEWS_FILE = "news.jsonl"
+SCRIPT_FILE = "talks.jsonl"
+SCRIPT_TEXT_FILE = "talks.txt"
+SEGMENTS_FILE = "segments.jsonl"
+LEGACY_NEWS_FILE = "news.txt"
+
+
+class ArtifactFormatError(Exception):
+    """产物文件缺少文件头、类型不符或 schema 版本过新"""
+    pass
+
+
+@dataclass
+class NewsRecord:
+    """一条新闻"""
+    title: str
+    url: str = ""
+    summary: str = ""
+    published_at: Optional[str] = None
+    source: Optional[str] = None
+
+    @classmethod
+    def from_item(cls, item) -> "NewsRecord":
+        """RSSItem 或 dict -> NewsRecord"""
+        def field(name):
+            value = item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+            return value.strip() if isinstance(value, str) else value
+
+        return cls(
+            title=field("title") or "",
+            url=field("url") or "",
+            summary=field("summary") or "",
+            published_at=field("published_at"),
+            source=field("source"),
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# ==================== 通用读写 ====================
+
+def write_jsonl(path: str, kind: str, records: Iterable[dict], **meta) -> int:
+    """
+    流式写入产物文件（原子替换），返回记录数
+
+    Args:
+        path: 目标路径
+        kind: 产物类型（news / script / segments）
+        records: 记录（dict），可以是生成器
+        meta: 写入文件头的附加字段，如 date
+    """
+    output_dir = os.path.dirname(os.path.abspath(path))
+    os.makedirs(output_dir, exist_ok=True)
+    header = {
+        "type": "header",
+        "kind": kind,
+        "schema": SCHEMA_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        **meta,
+    }
+
+    count = 0
+    fd, temp_path = tempfile.mkstemp(dir=output_dir, suffix=".jsonl.part")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return count
+
+
+def read_header(path: str, kind: Optional[str] = None) -> dict:
+    """读取并校验文件头"""
+    with open(path, "r", encoding="utf-8") as f:
+        return _check_header(path, f.readline(), kind)
+
+
+def _check_header(path: str, line: str, kind: Optional[str]) -> dict:
+    try:
+        header = json.loads(line) if line.strip() else None
+    except json.JSONDecodeError:
+        header = None
+    if not isinstance(header, dict) or header.get("type") != "header":
+        raise ArtifactFormatError(f"缺少文件头: {path}")
+    if kind and header.get("kind") != kind:
+        raise ArtifactFormatError(f"产物类型不符: {path} 是 {header.get('kind')}，需要 {kind}")
+    if header.get("schema", 0) > SCHEMA_VERSION:
+        raise ArtifactFormatError(
+            f"{path} 的 schema 版本 {header.get('schema')} 高于当前支持的 {SCHEMA_VERSION}"
+        )
+    return header
+
+
+def iter_jsonl(path: str, kind: Optional[str] = None) -> Iterator[dict]:
+    """逐行读取记录（跳过文件头和空行）"""
+    with open(path, "r", encoding="utf-8") as f:
+        _check_header(path, f.readline(), kind)
+        for line_no, line in enumerate(f, 2):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ArtifactFormatError(f"{path} 第 {line_no} 行不是合法 JSON: {e}")
+
+
+# ==================== 新闻 ====================
+
+def write_news(path: str, items: Iterable, **meta) -> int:
+    """写入 news.jsonl（items 为 RSSItem 或 dict）"""
+    return write_jsonl(path, NEWS, (NewsRecord.from_item(item).to_dict() for item in items), **meta)
+
+
+def read_legacy_news(path: str) -> List[dict]:
+    """解析旧的 news.txt：新闻N: 标题 / URL: xxx / 摘要: xxx（摘要可跨多行）"""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    news = []
+    for block in content.strip().split("\n\n"):
+        lines = block.strip().split("\n")
+        if not lines or not lines[0].strip():
+            continue
+        record = NewsRecord(title=lines[0].split(":", 1)[1].strip() if ":" in lines[0] else "")
+        for line in lines[1:]:
+            if line.startswith("URL:"):
+                record.url = line[len("URL:"):].strip()
+            elif line.startswith("摘要:"):
+                record.summary = line[len("摘要:"):].strip()
+            else:
+                record.summary = f"{record.summary}\n{line.strip()}".strip()
+        news.append(record.to_dict())
+    return news
+
+
+def load_news(base_dir: str) -> List[dict]:
+    """读取一天的新闻：优先 news.jsonl，其次旧的 news.txt"""
+    path = os.path.join(base_dir, NEWS_FILE)
+    if os.path.exists(path):
+        return list(iter_jsonl(path, NEWS))
+
+    legacy_path = os.path.join(base_dir, LEGACY_NEWS_FILE)
+    if os.path.exists(legacy_path):
+        return read_legacy_news(legacy_path)
+
+    raise FileNotFoundError(f"{NEWS_FILE} 不存在: {path}")
+
+
+# ==================== 逐字稿 ====================
+
+def write_script(base_dir: str, script: str, **meta) -> List[Turn]:
+    """
+    保存逐字稿：talks.txt（原文）+ talks.jsonl（解析出的台词）
+
+    解析不出台词时只写 talks.txt，便于排查。
+    """
+    turns = parse_script(script)
+    text_path = os.path.join(base_dir, SCRIPT_TEXT_FILE)
+    os.makedirs(base_dir, exist_ok=True)
+
+    with open(text_path, "w", encoding="utf-8") as f:
+        f.write(script)
+    # 后写 jsonl，使其不早于 talks.txt（见 load_script）
+    if turns:
+        write_jsonl(os.path.join(base_dir, SCRIPT_FILE), SCRIPT, (t.to_dict() for t in turns), **meta)
+    return turns
+
+
+def load_script(base_dir: str) -> List[Turn]:
+    """
+    读取逐字稿台词
+
+    talks.jsonl 不比 talks.txt 旧时直接使用；talks.txt 被手工改过（更新）
+    或只有 talks.txt 时解析它。
+    """
+    path = os.path.join(base_dir, SCRIPT_FILE)
+    text_path = os.path.join(base_dir, SCRIPT_TEXT_FILE)
+    has_text = os.path.exists(text_path)
+
+    if os.path.exists(path) and (not has_text or os.path.getmtime(path) >= os.path.getmtime(text_path)):
+        return ScriptParser().from_dicts(iter_jsonl(path, SCRIPT))
+    if has_text:
+        with open(text_path, "r", encoding="utf-8") as f:
+            return parse_script(f.read())
+    raise FileNotFoundError(f"{SCRIPT_FILE} 不存在: {path}")
+
+
+# ==================== TTS 分段 ====================
+
+def write_segments(splits_dir: str, segments: Iterable, **meta) -> int:
+    """写入 splits/segments.jsonl（segments 为 Segment 或 dict）"""
+    return write_jsonl(
+        os.path.join(splits_dir, SEGMENTS_FILE),
+        SEGMENTS,
+        (seg if isinstance(seg, dict) else seg.to_dict() for seg in segments),
+        **meta,
+    )
+
+
+def read_segments(splits_dir: str) -> List[dict]:
+    return list(iter_jsonl(os.path.join(splits_dir, SEGMENTS_FILE), SEGMENTS))
@@ -0,0 +1,267 @@
+"""
+流水线产物存储
+可插拔的内容寻址存储，让多个 worker / 多台机器共享产物并复用已合成的片段
+
+- 逻辑键：{date}/news.jsonl、{date}/talks.jsonl、{date}/{date}.mp3、segments/{segment_key}.mp3
+- 内容按 SHA-256 去重，相同内容只存一份
+- local：blobs/ 存内容，refs/ 下的逻辑键是指向 blob 的硬链接（相同片段共用一个 inode）；
+  取出片段时也用硬链接，不复制音频
+- s3：兼容 S3 的对象存储（AWS / MinIO），refs/ 对象记录 blob 的哈希
+
+使用方式：
+- 环境变量 ARTIFACT_STORE=local → LocalArtifactStore(ARTIFACT_ROOT)
+- 环境变量 ARTIFACT_STORE=s3    → S3ArtifactStore(ARTIFACT_S3_BUCKET)，
+  ARTIFACT_S3_ENDPOINT 指向 MinIO 等本地兼容服务，凭证走标准 AWS 环境变量
+- 未设置时不启用（get_artifact_store 返回 None），流水线行为不变
+
+注意：get_file(link=True) 取出的文件与 blob 是硬链接，只能整体替换（os.replace），不要原地改写；
+片段由 write_atomic 写入，满足这一点，逐字稿等文本文件按默认方式复制。
+"""
+import abc
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from typing import Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+
+ARTIFACT_STORE = os.getenv("ARTIFACT_STORE", "").lower()
+HASH_CHUNK = 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    """文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def segment_key(text: str, voice: dict, provider: str = "minimax") -> str:
+    """TTS 片段的缓存键：服务商 + 音色参数 + 文本，任一变化都重新合成"""
+    payload = json.dumps(
+        {"provider": provider, "voice": voice, "text": text},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return f"segments/{hashlib.sha256(payload.encode('utf-8')).hexdigest()}.mp3"
+
+
+def _check_key(key: str) -> str:
+    """逻辑键只允许相对路径，不允许 .. 跳出存储根目录"""
+    parts = key.replace("\\", "/").split("/")
+    if not key or key.startswith("/") or any(p in ("", ".", "..") for p in parts):
+        raise ValueError(f"非法的产物键: {key!r}")
+    return "/".join(parts)
+
+
+class ArtifactStore(abc.ABC):
+    """产物存储抽象基类"""
+
+    @abc.abstractmethod
+    def put_file(self, key: str, path: str) -> str:
+        """保存本地文件到逻辑键，返回内容哈希"""
+        pass
+
+    @abc.abstractmethod
+    def get_file(self, key: str, dest_path: str, link: bool = False) -> bool:
+        """取出逻辑键对应的内容到本地路径，不存在返回 False（link：允许硬链接，仅本地存储有效）"""
+        pass
+
+    @abc.abstractmethod
+    def digest(self, key: str) -> Optional[str]:
+        """逻辑键当前指向的内容哈希，不存在返回 None"""
+        pass
+
+    def exists(self, key: str) -> bool:
+        return self.digest(key) is not None
+
+    def put_bytes(self, key: str, data: bytes) -> str:
+        fd, temp_path = tempfile.mkstemp(suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            return self.put_file(key, temp_path)
+        finally:
+            os.remove(temp_path)
+
+
+class LocalArtifactStore(ArtifactStore):
+    """本地内容寻址存储（可放在共享盘上供多个 worker 使用）"""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.blob_dir = os.path.join(self.root, "blobs")
+        self.ref_dir = os.path.join(self.root, "refs")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def _ref_path(self, key: str) -> str:
+        return os.path.join(self.ref_dir, *_check_key(key).split("/"))
+
+    def _place(self, source: str, target: str, link: bool = True):
+        """硬链接或复制到目标路径（先写临时名再 rename，读者不会看到半个文件）；跨设备时复制"""
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temp_path = f"{target}.{uuid.uuid4().hex}.part"
+        try:
+            linked = False
+            if link:
+                try:
+                    os.link(source, temp_path)
+                    linked = True
+                except OSError:
+                    pass
+            if not linked:
+                shutil.copyfile(source, temp_path)
+            os.replace(temp_path, target)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def put_file(self, key: str, path: str) -> str:
+        digest = file_digest(path)
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            # 复制而不是链接：调用方之后可能原地改写自己的文件
+            self._place(path, blob_path, link=False)
+        ref_path = self._ref_path(key)
+        if not (os.path.exists(ref_path) and os.path.samefile(ref_path, blob_path)):
+            self._place(blob_path, ref_path)
+        return digest
+
+    def get_file(self, key: str, dest_path: str, link: bool = False) -> bool:
+        ref_path = self._ref_path(key)
+        if not os.path.exists(ref_path):
+            return False
+        if os.path.exists(dest_path) and os.path.samefile(ref_path, dest_path):
+            return True
+        self._place(ref_path, dest_path, link=link)
+        return True
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._ref_path(key))
+
+    def digest(self, key: str) -> Optional[str]:
+        ref_path = self._ref_path(key)
+        if not os.path.exists(ref_path):
+            return None
+        return file_digest(ref_path)
+
+
+class S3ArtifactStore(ArtifactStore):
+    """
+    兼容 S3 的对象存储
+
+    client 需提供 boto3 S3 客户端的 put_object / get_object / head_object；
+    不传时用 boto3 创建（可选依赖，pip install boto3），endpoint_url 指向 MinIO 等兼容服务。
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        client=None,
+        endpoint_url: Optional[str] = None
+    ):
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise RuntimeError("S3 产物存储需要 boto3: pip install boto3")
+            client = boto3.client("s3", endpoint_url=endpoint_url or None)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+
+    def _blob_key(self, digest: str) -> str:
+        return f"{self.prefix}blobs/{digest[:2]}/{digest}"
+
+    def _ref_key(self, key: str) -> str:
+        return f"{self.prefix}refs/{_check_key(key)}"
+
+    @staticmethod
+    def _is_missing(error: Exception) -> bool:
+        code = str(getattr(error, "response", {}).get("Error", {}).get("Code", ""))
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def _has_object(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except Exception as e:
+            if self._is_missing(e):
+                return False
+            raise
+
+    def put_file(self, key: str, path: str) -> str:
+        digest = file_digest(path)
+        blob_key = self._blob_key(digest)
+        if not self._has_object(blob_key):
+            with open(path, "rb") as f:
+                self.client.put_object(Bucket=self.bucket, Key=blob_key, Body=f)
+        self.client.put_object(Bucket=self.bucket, Key=self._ref_key(key), Body=digest.encode("ascii"))
+        return digest
+
+    def get_file(self, key: str, dest_path: str, link: bool = False) -> bool:
+        digest = self.digest(key)
+        if digest is None:
+            return False
+        if os.path.exists(dest_path) and file_digest(dest_path) == digest:
+            return True
+
+        body = self.client.get_object(Bucket=self.bucket, Key=self._blob_key(digest))["Body"]
+        output_dir = os.path.dirname(os.path.abspath(dest_path))
+        os.makedirs(output_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=output_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in iter(lambda: body.read(HASH_CHUNK), b""):
+                    f.write(chunk)
+            if file_digest(temp_path) != digest:
+                raise IOError(f"产物内容校验失败: {key}")
+            os.replace(temp_path, dest_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return True
+
+    def digest(self, key: str) -> Optional[str]:
+        try:
+            body = self.client.get_object(Bucket=self.bucket, Key=self._ref_key(key))["Body"]
+        except Exception as e:
+            if self._is_missing(e):
+                return None
+            raise
+        return body.read().decode("ascii").strip()
+
+
+_store: Optional[ArtifactStore] = None
+
+
+def get_artifact_store() -> Optional[ArtifactStore]:
+    """按环境变量创建产物存储（单例），未配置时返回 None"""
+    global _store
+    if _store is None and ARTIFACT_STORE:
+        if ARTIFACT_STORE == "local":
+            _store = LocalArtifactStore(os.getenv("ARTIFACT_ROOT", "data/artifacts"))
+        elif ARTIFACT_STORE == "s3":
+            _store = S3ArtifactStore(
+                bucket=os.getenv("ARTIFACT_S3_BUCKET", "podcast-artifacts"),
+                prefix=os.getenv("ARTIFACT_S3_PREFIX", ""),
+                endpoint_url=os.getenv("ARTIFACT_S3_ENDPOINT"),
+            )
+        else:
+            raise ValueError(f"未知的 ARTIFACT_STORE: {ARTIFACT_STORE}")
+    return _store
+
+
+def set_artifact_store(store: Optional[ArtifactStore]):
+    """替换产物存储（测试或嵌入使用）"""
+    global _store
+    _store = store
@@ -1,42 +1,26 @@
 """DeepSeek LLM 服务 - 使用 OpenAI SDK"""
 from openai import OpenAI
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 import os
+import re
 import logging
-import yaml
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # 加载 .env 文件
 from dotenv import load_dotenv
 load_dotenv()
 
-# ===== 提示词加载 =====
-PROMPTS_FILE = os.path.join(os.path.dirname(__file__), "..", "prompts.yaml")
-
-
-def _load_prompts() -> dict:
-    """从 prompts.yaml 加载提示词"""
-    try:
-        with open(PROMPTS_FILE, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
-    except FileNotFoundError:
-        logger.warning(f"提示词配置文件不存在: {PROMPTS_FILE}")
-        return {}
-
-
-def _get_prompt(key: str, default: str = "") -> str:
-    """获取提示词，支持回退到默认值"""
-    prompts = _load_prompts()
-    return prompts.get(key, default)
+from app.services.prompt_registry import PromptRegistry
+from app.services.rate_limit import DEEPSEEK, get_rate_limiter
 
+logger = logging.getLogger(__name__)
 
-# 从配置文件加载提示词
-PROMPTS = _load_prompts()
+# ===== 提示词 =====
+PROMPTS_FILE = os.path.join(os.path.dirname(__file__), "..", "prompts.yaml")
 
-LUO_SYSTEM_PROMPT = PROMPTS.get("luo_system_prompt", "")
-ZIRU_SYSTEM_PROMPT = PROMPTS.get("ziru_system_prompt", "")
-PODCAST_SYSTEM_PROMPT = PROMPTS.get("podcast_system_prompt", "")
-PODCAST_USER_TEMPLATE = PROMPTS.get("podcast_user_template", """请根据以下科技新闻，生成一期脱口秀风格播客逐字稿正文部分。
+DEFAULT_USER_TEMPLATE = """请根据以下科技新闻，生成一期脱口秀风格播客逐字稿正文部分。
 
 新闻素材：
 {news_text}
@@ -48,17 +32,89 @@ PODCAST_USER_TEMPLATE = PROMPTS.get("podcast_user_template", """请根据以下
 4. 适当引用新闻中的关键信息
 5. 最后有结束语
 
-请直接输出对话内容正文。""")
+请直接输出对话内容正文。"""
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """提示词注册表单例（首次使用时才解析 prompts.yaml）"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = PromptRegistry(PROMPTS_FILE)
+    return _registry
 
-# 固定开场白（不传给 LLM）
-INTRO_TEXT = PROMPTS.get("intro_text", "")
+
+# 兼容旧的模块常量：从注册表读取，随热加载更新
+_LEGACY_PROMPTS = {
+    "LUO_SYSTEM_PROMPT": ("luo_system_prompt", ""),
+    "ZIRU_SYSTEM_PROMPT": ("ziru_system_prompt", ""),
+    "PODCAST_SYSTEM_PROMPT": ("podcast_system_prompt", ""),
+    "PODCAST_USER_TEMPLATE": ("podcast_user_template", DEFAULT_USER_TEMPLATE),
+    "PODCAST_SCRIPT_RULES": ("podcast_script_rules", ""),
+    "PODCAST_EXAMPLE": ("podcast_example", ""),
+    "INTRO_TEXT": ("intro_text", ""),
+}
+
+
+def __getattr__(name: str):
+    if name in _LEGACY_PROMPTS:
+        key, default = _LEGACY_PROMPTS[name]
+        return get_prompt_registry().get(key, default)
+    if name == "SCRIPT_SYSTEM_PROMPT":
+        return get_script_system_prompt()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_intro() -> str:
     """获取固定开场白"""
-    return INTRO_TEXT
+    return get_prompt_registry().get("intro_text")
 
-logger = logging.getLogger(__name__)
+
+_system_prompt_cache = (None, "")
+
+
+def get_script_system_prompt() -> str:
+    """人设、格式规则与示例 —— 所有逐字稿请求完全相同，仅在注册表重新加载后重建"""
+    global _system_prompt_cache
+    registry = get_prompt_registry()
+    generation, text = _system_prompt_cache
+    if generation == registry.generation:
+        return text
+
+    parts = [
+        registry.get("podcast_system_prompt"),
+        registry.get("luo_system_prompt"),
+        registry.get("ziru_system_prompt"),
+    ]
+    example = registry.get("podcast_example")
+    if example:
+        parts.append(f"## 格式示例\n\n{example}")
+
+    text = "\n\n".join(p.strip() for p in parts if p)
+    _system_prompt_cache = (registry.generation, text)
+    return text
+
+
+def build_script_messages(news_text: str, role_prompt: str = "") -> List[Dict[str, str]]:
+    """
+    组装逐字稿请求消息
+
+    system 消息和 user 消息开头的规则在每次请求中逐字节相同，
+    可以命中服务端前缀缓存；补充要求和新闻素材放在最后。
+    """
+    user_parts = [get_prompt_registry().get("podcast_script_rules").strip()]
+    if role_prompt:
+        user_parts.append(f"补充要求：\n{role_prompt.strip()}")
+    user_parts.append(f"新闻素材：\n{news_text.strip()}")
+
+    return [
+        {"role": "system", "content": get_script_system_prompt()},
+        {"role": "user", "content": "\n\n".join(user_parts)},
+    ]
 
 
 class LLMResponse(BaseModel):
@@ -100,22 +156,43 @@ class DeepSeekService:
         Returns:
             LLMResponse
         """
-        try:
-            messages = []
+        messages = []
+
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
 
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        return self.generate_messages(messages, max_tokens=max_tokens, temperature=temperature)
+
+    def generate_messages(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 4096,
+        temperature: float = 0.7
+    ) -> LLMResponse:
+        """
+        使用已组装好的消息调用 LLM
 
-            messages.append({"role": "user", "content": prompt})
+        Args:
+            messages: 对话消息（见 build_script_messages）
+            max_tokens: 最大 token 数
+            temperature: 温度（0-1）
 
+        Returns:
+            LLMResponse
+        """
+        try:
             logger.info(f"DeepSeek API request with model: {self.model}")
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
+            # 进程内所有调用共享 DeepSeek 配额（批量模式下多天并行）
+            with get_rate_limiter(DEEPSEEK).slot():
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
 
             # 解析响应
             text = response.choices[0].message.content
@@ -125,6 +202,11 @@ class DeepSeekService:
                 "completion_tokens": response.usage.completion_tokens,
                 "total_tokens": response.usage.total_tokens
             }
+            # DeepSeek 上下文缓存：命中/未命中前缀缓存的 prompt token 数
+            for key in ("prompt_cache_hit_tokens", "prompt_cache_miss_tokens"):
+                value = getattr(response.usage, key, None)
+                if value is not None:
+                    usage[key] = value
 
             logger.info(f"LLM generated {len(text)} chars, usage: {usage}")
 
@@ -135,11 +217,169 @@ class DeepSeekService:
             raise
 
 
+_llm: Optional[DeepSeekService] = None
+_llm_lock = threading.Lock()
+
+
+def get_llm() -> DeepSeekService:
+    """进程内共享的 LLM 服务（复用同一个连接池，避免每次调用重新建连）"""
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = DeepSeekService()
+    return _llm
+
+
+# Map-Reduce 模式参数
+MAP_MAX_WORKERS = 5
+SEGMENT_MAX_TOKENS = 2048
+STITCH_MAX_TOKENS = 1024
+# 串联阶段只给出每个片段首尾各几句台词
+STITCH_CONTEXT_LINES = 2
+
+_STITCH_MARK = re.compile(r"^\[(开场|过渡\s*(\d+)|结束)\]\s*$")
+
+
+def _item_field(item, name: str) -> str:
+    """兼容 dict 和 RSSItem"""
+    if isinstance(item, dict):
+        return item.get(name, "") or ""
+    return getattr(item, name, "") or ""
+
+
+def _format_news_item(i: int, item) -> str:
+    """格式化单条新闻素材"""
+    return f"""
+新闻{i}：{_item_field(item, 'title')}
+URL: {_item_field(item, 'url')}
+摘要: {_item_field(item, 'summary')}
+"""
+
+
+def build_segment_messages(news_text: str) -> List[Dict[str, str]]:
+    """Map 阶段：单条新闻的对话片段消息（与整稿请求共享 system 前缀）"""
+    rules = get_prompt_registry().get("podcast_segment_rules").strip()
+    return [
+        {"role": "system", "content": get_script_system_prompt()},
+        {"role": "user", "content": f"{rules}\n\n新闻素材：\n{news_text.strip()}"},
+    ]
+
+
+def _dialogue_lines(text: str) -> List[str]:
+    return [line.strip() for line in text.splitlines() if line.strip().startswith("**")]
+
+
+def build_stitch_messages(segments: List[dict]) -> List[Dict[str, str]]:
+    """Reduce 阶段：只给出各片段标题和首尾台词，控制输入输出规模"""
+    parts = [get_prompt_registry().get("podcast_stitch_rules").strip()]
+    for seg in segments:
+        lines = _dialogue_lines(seg["script"])
+        head = lines[:STITCH_CONTEXT_LINES]
+        tail = lines[STITCH_CONTEXT_LINES:][-STITCH_CONTEXT_LINES:]
+        excerpt = "\n".join(head + (["……"] if tail else []) + tail)
+        parts.append(f"片段{seg['index'] + 1}（{seg['title']}）：\n{excerpt}")
+
+    return [
+        {"role": "system", "content": get_script_system_prompt()},
+        {"role": "user", "content": "\n\n".join(parts)},
+    ]
+
+
+def parse_stitch_output(text: str) -> Dict[str, str]:
+    """
+    解析串联输出
+
+    Returns:
+        {"opening": ..., "closing": ..., "1": 片段1之后的过渡, ...}
+    """
+    sections: Dict[str, List[str]] = {}
+    current = None
+    for line in text.splitlines():
+        match = _STITCH_MARK.match(line.strip())
+        if match:
+            if match.group(1) == "开场":
+                current = "opening"
+            elif match.group(1) == "结束":
+                current = "closing"
+            else:
+                current = match.group(2)
+            sections[current] = []
+        elif current is not None and line.strip().startswith("**"):
+            sections[current].append(line.strip())
+
+    return {key: "\n".join(lines) for key, lines in sections.items() if lines}
+
+
+def generate_script_segment(index: int, item, llm: DeepSeekService) -> dict:
+    """为单条新闻生成对话片段 {index, title, script}"""
+    response = llm.generate_messages(
+        build_segment_messages(_format_news_item(index + 1, item)),
+        max_tokens=SEGMENT_MAX_TOKENS,
+        temperature=0.8
+    )
+    return {"index": index, "title": _item_field(item, "title"), "script": response.text.strip()}
+
+
+def generate_script_segments(
+    news_items: list,
+    llm: DeepSeekService,
+    max_workers: int = MAP_MAX_WORKERS
+) -> List[dict]:
+    """
+    Map 阶段：并发为每条新闻生成对话片段
+
+    总耗时取决于最慢的一条新闻，而不是全部输出的总长度。
+
+    Returns:
+        按新闻顺序排列的片段 [{index, title, script}]
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [
+            executor.submit(generate_script_segment, i, item, llm)
+            for i, item in enumerate(news_items)
+        ]
+        segments = [f.result() for f in futures]
+
+    logger.info(f"Generated {len(segments)} script segments")
+    return segments
+
+
+def stitch_script_segments(segments: List[dict], llm: DeepSeekService) -> str:
+    """
+    Reduce 阶段：生成开场、过渡和结束语，按顺序拼接片段
+
+    串联输出无法解析时退化为直接拼接片段。
+    """
+    if not segments:
+        return ""
+
+    try:
+        response = llm.generate_messages(
+            build_stitch_messages(segments),
+            max_tokens=STITCH_MAX_TOKENS,
+            temperature=0.7
+        )
+        links = parse_stitch_output(response.text)
+    except Exception as e:
+        logger.warning(f"Stitch pass failed, concatenating segments: {e}")
+        links = {}
+
+    parts = [links.get("opening", "")]
+    for n, seg in enumerate(segments, 1):
+        parts.append(seg["script"])
+        if n < len(segments):
+            parts.append(links.get(str(n), ""))
+    parts.append(links.get("closing", ""))
+
+    return "\n\n".join(p for p in parts if p)
 
 
 def generate_podcast_script(
     news_items: list,
-    llm: Optional[DeepSeekService] = None
+    llm: Optional[DeepSeekService] = None,
+    map_reduce: bool = False,
+    max_workers: int = MAP_MAX_WORKERS
 ) -> str:
     """
     生成播客逐字稿
@@ -147,30 +387,27 @@ def generate_podcast_script(
     Args:
         news_items: 新闻列表 [{title, url, summary, ...}]
         llm: LLM 服务实例
+        map_reduce: 是否按新闻并发生成片段再串联（适合新闻较多的情况）
+        max_workers: Map 阶段并发数
 
     Returns:
         逐字稿文本
     """
     if llm is None:
-        llm = DeepSeekService()
+        llm = get_llm()
+
+    if map_reduce:
+        segments = generate_script_segments(news_items, llm, max_workers=max_workers)
+        return stitch_script_segments(segments, llm)
 
     # 构建新闻内容
-    news_content = []
-    for i, item in enumerate(news_items, 1):
-        news_content.append(f"""
-新闻{i}：{item.get('title', '') if isinstance(item, dict) else item.title}
-URL: {item.get('url', '') if isinstance(item, dict) else item.url}
-摘要: {item.get('summary', '') if isinstance(item, dict) else (item.summary if hasattr(item, 'summary') else '')}
-""")
+    news_content = [_format_news_item(i, item) for i, item in enumerate(news_items, 1)]
 
     news_text = "\n".join(news_content)
 
-    # 使用模板生成提示词
-    prompt = PODCAST_USER_TEMPLATE.format(news_text=news_text)
-
-    response = llm.generate(
-        prompt=prompt,
-        system_prompt=PODCAST_SYSTEM_PROMPT,
+    # 静态前缀在前，新闻素材在后
+    response = llm.generate_messages(
+        build_script_messages(news_text),
         max_tokens=8192,
         temperature=0.8
     )
@@ -0,0 +1,182 @@
+"""Prompt registry - single source of prompts loaded from prompts.yaml
+
+- YAML is parsed once at load time; later lookups are dict reads
+- The file mtime is checked (at most every `check_interval` seconds) and
+  the registry reloads itself when the file changes
+- Templates are precompiled: format fields are extracted and validated
+  up front, so a broken edit is rejected and the previous version kept
+- Every prompt carries a content-hash version
+- Runtime edits (e.g. from the settings page) go to an override file
+  layered on top of the base file
+"""
+import hashlib
+import logging
+import os
+import string
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# Templates that must expose exactly these format fields
+REQUIRED_FIELDS: Dict[str, FrozenSet[str]] = {
+    "podcast_user_template": frozenset({"news_text"}),
+}
+
+
+class PromptError(Exception):
+    """Invalid prompt file or template"""
+    pass
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """A compiled prompt"""
+    key: str
+    text: str
+    fields: FrozenSet[str]
+    version: str
+
+    def render(self, **kwargs) -> str:
+        """Fill template fields; prompts without fields are returned verbatim"""
+        if not self.fields:
+            return self.text
+        missing = self.fields - kwargs.keys()
+        if missing:
+            raise PromptError(f"Prompt '{self.key}' missing fields: {sorted(missing)}")
+        return self.text.format(**{k: kwargs[k] for k in self.fields})
+
+
+def compile_prompt(key: str, text: str) -> Prompt:
+    """Extract and validate format fields"""
+    required = REQUIRED_FIELDS.get(key)
+    try:
+        fields = frozenset(
+            name for _, name, _, _ in string.Formatter().parse(text) if name
+        )
+    except ValueError as e:
+        if required is not None:
+            raise PromptError(f"Prompt '{key}' is not a valid template: {e}")
+        # Plain prompt containing literal braces
+        fields = frozenset()
+
+    if required is not None and fields != required:
+        raise PromptError(
+            f"Prompt '{key}' must use fields {sorted(required)}, found {sorted(fields)}"
+        )
+
+    version = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+    return Prompt(key=key, text=text, fields=fields, version=version)
+
+
+def _read_yaml(path: Optional[str]) -> dict:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    if not isinstance(data, dict):
+        raise PromptError(f"Prompt file must be a mapping: {path}")
+    return data
+
+
+def _mtime(path: Optional[str]) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns if path else None
+    except FileNotFoundError:
+        return None
+
+
+class PromptRegistry:
+    """Hot-reloadable registry of compiled prompts"""
+
+    def __init__(
+        self,
+        path: str,
+        override_path: Optional[str] = None,
+        check_interval: float = 1.0
+    ):
+        self.path = path
+        self.override_path = override_path
+        self.check_interval = check_interval
+        self.generation = 0
+        self._prompts: Dict[str, Prompt] = {}
+        self._mtimes = (None, None)
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self) -> bool:
+        """Parse and compile both files; keep the previous prompts on error"""
+        with self._lock:
+            self._last_check = time.monotonic()
+            mtimes = (_mtime(self.path), _mtime(self.override_path))
+            try:
+                if mtimes[0] is None:
+                    logger.warning(f"Prompts config file not found: {self.path}")
+                raw = _read_yaml(self.path)
+                raw.update(_read_yaml(self.override_path))
+                compiled = {
+                    key: compile_prompt(key, str(value))
+                    for key, value in raw.items()
+                    if value is not None
+                }
+            except (PromptError, yaml.YAMLError, OSError) as e:
+                logger.error(f"Failed to load prompts, keeping version {self.generation}: {e}")
+                self._mtimes = mtimes
+                return False
+
+            self._prompts = compiled
+            self._mtimes = mtimes
+            self.generation += 1
+            logger.info(f"Loaded {len(compiled)} prompts (generation {self.generation})")
+            return True
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        if (_mtime(self.path), _mtime(self.override_path)) != self._mtimes:
+            self.reload()
+
+    def prompt(self, key: str) -> Optional[Prompt]:
+        """Get a compiled prompt"""
+        self._maybe_reload()
+        return self._prompts.get(key)
+
+    def get(self, key: str, default: str = "") -> str:
+        """Get prompt text, fallback to default"""
+        prompt = self.prompt(key)
+        return prompt.text if prompt is not None else default
+
+    def render(self, key: str, default: str = "", **kwargs) -> str:
+        """Render a template (default is compiled on the fly if the key is absent)"""
+        prompt = self.prompt(key) or compile_prompt(key, default)
+        return prompt.render(**kwargs)
+
+    def versions(self) -> Dict[str, str]:
+        """Content-hash version of every prompt"""
+        self._maybe_reload()
+        return {key: p.version for key, p in self._prompts.items()}
+
+    def set_override(self, key: str, text: str):
+        """Validate and persist a runtime override, then reload"""
+        if not self.override_path:
+            raise PromptError("No override file configured")
+        compile_prompt(key, text)
+
+        overrides = _read_yaml(self.override_path)
+        overrides[key] = text
+
+        directory = os.path.dirname(os.path.abspath(self.override_path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".yaml.part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            yaml.safe_dump(overrides, f, allow_unicode=True)
+        os.replace(temp_path, self.override_path)
+
+        self.reload()
@@ -0,0 +1,178 @@
+"""
+服务商全局限流
+同一进程内所有调用方（多个 TTS 实例、多天并行的批量任务）共享同一个服务商的配额
+
+每个服务商一个限流器：
+- 并发上限：同时在途的请求数
+- 每分钟请求数：按固定间隔放行（不突发），保证不超过服务商的 RPM 配额
+
+配置（0 或未设置表示不限制）：
+- MINIMAX_MAX_CONCURRENT / MINIMAX_RPM
+- DEEPSEEK_MAX_CONCURRENT / DEEPSEEK_RPM
+
+配置了 SHARED_STATE_URL 时，配额由所有进程共享（见 shared_state）：
+并发上限为跨进程租约，每分钟请求数按分钟窗口计数（窗口内用满后等到下一分钟）。
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+from .shared_state import count_in_window, get_shared_store, release, try_acquire
+
+MINIMAX = "minimax"
+DEEPSEEK = "deepseek"
+
+# 共享模式下等待并发名额的轮询间隔（秒）
+SHARED_POLL_INTERVAL = 0.2
+RPM_WINDOW = 60
+
+
+class RateLimiter:
+    """并发上限 + 每分钟请求数（store 为共享存储时跨进程生效）"""
+
+    def __init__(self, name: str, max_concurrent: int = 0, per_minute: float = 0, store=None):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.per_minute = per_minute
+        self.store = store
+        self._key = f"ratelimit:{name}"
+        self._semaphore = (
+            threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 and store is None else None
+        )
+        self._interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+        self.requests = 0
+        self.waited = 0.0
+
+    def _reserve(self) -> float:
+        """预约下一个放行时间，返回需要等待的秒数"""
+        with self._lock:
+            self.requests += 1
+            if not self._interval:
+                return 0.0
+            now = time.monotonic()
+            start = max(self._next_at, now)
+            self._next_at = start + self._interval
+            return start - now
+
+    def _sleep(self, seconds: float):
+        with self._lock:
+            self.waited += seconds
+        time.sleep(seconds)
+
+    def _acquire(self) -> Optional[str]:
+        """占用并发名额，共享模式返回租约 ID"""
+        if self._semaphore:
+            self._semaphore.acquire()
+            return None
+        if self.store is None or not self.max_concurrent:
+            return None
+        while True:
+            lease = try_acquire(self.store, f"{self._key}:leases", self.max_concurrent)
+            if lease:
+                return lease
+            self._sleep(SHARED_POLL_INTERVAL * random.uniform(0.5, 1.5))
+
+    def _release(self, lease: Optional[str]):
+        if self._semaphore:
+            self._semaphore.release()
+        elif lease:
+            release(self.store, f"{self._key}:leases", lease)
+
+    def _pace(self):
+        """等到每分钟请求数允许放行"""
+        if self.store is None:
+            wait = self._reserve()
+            if wait > 0:
+                self._sleep(wait)
+            return
+
+        with self._lock:
+            self.requests += 1
+        if not self.per_minute:
+            return
+        while count_in_window(self.store, f"{self._key}:rpm", RPM_WINDOW) > self.per_minute:
+            # 本分钟额度已用完，等到下一个窗口（加一点抖动，避免各进程同时醒来）
+            self._sleep(RPM_WINDOW - time.time() % RPM_WINDOW + random.uniform(0, 0.5))
+
+    @contextmanager
+    def slot(self):
+        """占用一次请求额度（with 块内发起请求）"""
+        lease = self._acquire()
+        try:
+            self._pace()
+            yield
+        finally:
+            self._release(lease)
+
+    @asynccontextmanager
+    async def aslot(self):
+        """slot 的异步版本：等待额度在线程中进行，不阻塞事件循环"""
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self._acquire))
+        try:
+            lease = await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # 调用方已取消，但线程仍可能拿到名额：拿到后立即归还
+            acquiring.add_done_callback(
+                lambda f: None if f.cancelled() or f.exception() else self._release(f.result())
+            )
+            raise
+        try:
+            await asyncio.to_thread(self._pace)
+            yield
+        finally:
+            await asyncio.to_thread(self._release, lease)
+
+    def summary(self) -> str:
+        limits = []
+        if self.max_concurrent:
+            limits.append(f"并发 {self.max_concurrent}")
+        if self.per_minute:
+            limits.append(f"{self.per_minute:g} 次/分钟")
+        if self.store is not None and limits:
+            limits.append("跨进程共享")
+        return (
+            f"{self.name}: {self.requests} 次请求，限流等待 {self.waited:.1f}s"
+            f"（{'，'.join(limits) or '不限'}）"
+        )
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _env_number(name: str) -> float:
+    value = os.getenv(name, "").strip()
+    return float(value) if value else 0
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """服务商的全局限流器（首次使用时按环境变量创建，配置了共享存储时跨进程共享）"""
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(provider)
+            if limiter is None:
+                prefix = provider.upper()
+                limiter = RateLimiter(
+                    provider,
+                    max_concurrent=int(_env_number(f"{prefix}_MAX_CONCURRENT")),
+                    per_minute=_env_number(f"{prefix}_RPM"),
+                    store=get_shared_store(),
+                )
+                _limiters[provider] = limiter
+    return limiter
+
+
+def set_rate_limiter(provider: str, limiter: Optional[RateLimiter]):
+    """替换服务商的限流器（None 表示恢复为按环境变量创建）"""
+    with _limiters_lock:
+        if limiter is None:
+            _limiters.pop(provider, None)
+        else:
+            _limiters[provider] = limiter
@@ -0,0 +1,103 @@
+"""TTS 分段规划 - 在解析和合成之间调整任务粒度
+
+- 相邻的同一说话人台词合并为一个任务（减少上传/轮询/下载往返）
+- 超长台词按句子边界拆分（避免单个任务过长）
+- 每个分段记录来源台词索引，便于编辑时回溯
+"""
+import re
+from dataclasses import dataclass, field
+from typing import List
+
+# 单个 TTS 任务的目标字数上限
+MAX_SEGMENT_CHARS = 600
+
+# 句子边界：中英文句末标点之后
+_SENTENCE_END = re.compile(r"(?<=[。！？!?；;…])")
+
+
+@dataclass
+class Segment:
+    """TTS 任务分段"""
+    speaker: str
+    text: str
+    index: int  # 分段索引（决定 part_NNN.mp3 编号）
+    source_indices: List[int] = field(default_factory=list)  # 对应的原始对话索引
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "speaker": self.speaker,
+            "text": self.text,
+            "source_indices": self.source_indices,
+        }
+
+
+def split_sentences(text: str) -> List[str]:
+    """按句末标点切分，保留标点"""
+    return [s for s in _SENTENCE_END.split(text) if s.strip()]
+
+
+def _split_long_text(text: str, max_chars: int) -> List[str]:
+    """将超长文本按句子边界打包成不超过 max_chars 的若干段"""
+    if len(text) <= max_chars:
+        return [text]
+
+    pieces = []
+    current = ""
+    for sentence in split_sentences(text):
+        # 单句本身超长时只能硬切
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+
+        if len(current) + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current += sentence
+
+    if current:
+        pieces.append(current)
+    return [p.strip() for p in pieces if p.strip()]
+
+
+def plan_segments(dialogues: list, max_chars: int = MAX_SEGMENT_CHARS) -> List[Segment]:
+    """
+    将对话列表规划为 TTS 分段
+
+    Args:
+        dialogues: 对话列表（需有 speaker / text / index 属性）
+        max_chars: 单个分段的最大字数
+
+    Returns:
+        Segment 列表，index 从 0 连续编号
+    """
+    segments: List[Segment] = []
+
+    for d in dialogues:
+        pieces = _split_long_text(d.text, max_chars)
+
+        for piece in pieces:
+            last = segments[-1] if segments else None
+            can_merge = (
+                last is not None
+                and len(pieces) == 1
+                and last.speaker == d.speaker
+                and len(last.text) + 1 + len(piece) <= max_chars
+            )
+            if can_merge:
+                last.text = f"{last.text}\n{piece}"
+                if d.index not in last.source_indices:
+                    last.source_indices.append(d.index)
+            else:
+                segments.append(Segment(
+                    speaker=d.speaker,
+                    text=piece,
+                    index=len(segments),
+                    source_indices=[d.index]
+                ))
+
+    return segments
@@ -1,45 +1,99 @@
 """MiniMax TTS 异步服务 - 基于 tts_base.py"""
+import io
 import os
-import re
 import time
-import subprocess
 import requests
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 
 from .tts_base import BaseTTSService, get_tts_service
+from .audio_utils import download_to_file, write_atomic
+from .segment_planner import Segment, plan_segments, MAX_SEGMENT_CHARS
+from .audio_timeline import AudioTimeline, TARGET_LUFS
+from . import script_format
+from .voice_roster import MINIMAX, get_voice_roster
+from .rate_limit import get_rate_limiter
 
 # API 配置
 API_KEY = os.getenv("MINIMAX_API_KEY")
-VOICE_IDS = {
-    "luoyonghao": "luoyonghao2",
-    "wangziru": "wangziru_test"
-}
 
 UPLOAD_URL = "https://api.minimaxi.com/v1/files/upload"
+T2A_URL = "https://api.minimaxi.com/v1/t2a_v2"
 T2A_ASYNC_URL = "https://api.minimaxi.com/v1/t2a_async_v2"
 TASK_QUERY_URL = "https://api.minimaxi.com/v1/query/t2a_async_query_v2"
 HEADERS = {"Authorization": f"Bearer {API_KEY}"}
 
+MODEL = "speech-2.6-hd"
 MAX_CONCURRENT = 5
+# 不超过该长度的台词走同步 T2A 接口（直接提交文本，无需上传和轮询）
+INLINE_MAX_CHARS = 300
 
+# 进度回调：progress(event, **data)，事件见 batch_generate / merge_audio
+ProgressCallback = Callable[..., None]
+
+
+def _no_progress(event: str, **data):
+    pass
 
 @dataclass
 class Dialogue:
     """对话片段"""
-    speaker: str  # "luoyonghao" | "wangziru"
+    speaker: str  # 说话人键（见 voice_roster）
     text: str
     index: int  # 原始索引
 
 
+@dataclass
+class VoiceStats:
+    """单个音色的合成耗时统计"""
+    speaker: str
+    completed: int = 0
+    failed: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def record(self, seconds: float):
+        self.completed += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.total_seconds / self.completed if self.completed else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.speaker}: 完成 {self.completed}，失败 {self.failed}，"
+            f"平均 {self.avg_seconds:.1f}s，最长 {self.max_seconds:.1f}s"
+        )
+
+
 class MiniMaxTTSService(BaseTTSService):
     """MiniMax 异步 TTS 服务"""
 
-    def __init__(self, max_concurrent: int = MAX_CONCURRENT):
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT,
+        inline_max_chars: int = INLINE_MAX_CHARS,
+        voice_concurrency: Optional[Dict[str, int]] = None
+    ):
         self.max_concurrent = max_concurrent
+        self.inline_max_chars = inline_max_chars
+        # 每个音色独立的 worker 数，未配置的音色使用 max_concurrent
+        self.voice_concurrency = voice_concurrency or {}
+        # 提交类请求（上传/创建任务/同步合成）的全局并发上限
         self.semaphore = threading.Semaphore(max_concurrent)
+        # 进程内所有实例共享的 MiniMax 配额（见 rate_limit）
+        self.limiter = get_rate_limiter(MINIMAX)
+        self.voice_stats: Dict[str, VoiceStats] = {}
+        # batch_generate 的 worker 线程各自的进度回调
+        self._progress = threading.local()
+
+    def _voice_concurrency(self, speaker: str) -> int:
+        return self.voice_concurrency.get(speaker, self.max_concurrent)
 
     def parse_dialogues(self, filename: str) -> List[Dialogue]:
         """解析逐字稿文件"""
@@ -52,73 +106,86 @@ class MiniMaxTTSService(BaseTTSService):
         return self._parse_content(script_content)
 
     def _parse_content(self, content: str) -> List[Dialogue]:
-        """解析内容为对话列表"""
-        dialogues = []
-        # 支持新旧两种格式：彪悍罗/OK王 或 罗永浩/王自如
-        pattern = r"\*\*彪悍罗：\*\*([^\*]+)|\*\*OK王：\*\*([^\*]+)|\*\*罗永浩：\*\*([^\*]+)|\*\*王自如：\*\*([^\*]+)"
-
-        for match in re.finditer(pattern, content):
-            text = match.group(1) or match.group(2) or match.group(3) or match.group(4)
-            # 彪悍罗/罗永浩 -> luoyonghao, OK王/王自如 -> wangziru
-            if match.group(1) or match.group(3):
-                speaker = "luoyonghao"
-            else:
-                speaker = "wangziru"
-            dialogues.append(Dialogue(
-                speaker=speaker,
-                text=text.strip(),
-                index=len(dialogues)
-            ))
-        return dialogues
+        """解析内容为对话列表（JSON 或 Markdown，见 script_format）"""
+        return [
+            Dialogue(speaker=turn.speaker, text=turn.text, index=i)
+            for i, turn in enumerate(script_format.parse_script(content))
+        ]
 
-    def _upload_and_create_task(self, text: str, speaker: str, task_idx: int) -> dict:
-        """上传文本并创建任务"""
-        import tempfile
+    def plan_segments(self, dialogues: List[Dialogue], max_chars: int = MAX_SEGMENT_CHARS) -> List[Segment]:
+        """合并相邻同一说话人的短台词、拆分超长台词，得到 TTS 任务列表"""
+        return plan_segments(dialogues, max_chars=max_chars)
+
+    def _voice_setting(self, speaker: str) -> dict:
+        """音色 ID 与参数来自主播名册"""
+        return get_voice_roster().voice(speaker, MINIMAX)
+
+    def _audio_setting(self) -> dict:
+        return {
+            "sample_rate": 32000, "format": "mp3", "bitrate": 128000, "channel": 1
+        }
+
+    def _route(self, text: str) -> str:
+        """按文本长度选择合成路径：inline（同步接口）或 async（文件上传 + 异步任务）"""
+        return "inline" if len(text) <= self.inline_max_chars else "async"
+
+    def _synthesize_inline(self, text: str, speaker: str) -> bytes:
+        """同步 T2A：直接提交文本，返回音频"""
+        payload = {
+            "model": MODEL,
+            "text": text,
+            "stream": False,
+            "voice_setting": self._voice_setting(speaker),
+            "audio_setting": self._audio_setting(),
+            "output_format": "hex"
+        }
+        with self.semaphore, self.limiter.slot():
+            resp = requests.post(T2A_URL, headers=HEADERS, json=payload)
+
+        result = resp.json()
+        base_resp = result.get("base_resp") or {}
+        if base_resp.get("status_code", 0) != 0:
+            raise Exception(f"同步合成失败: {base_resp.get('status_msg')}")
+        return bytes.fromhex(result["data"]["audio"])
 
+    def _upload_and_create_task(self, text: str, speaker: str, task_idx: int) -> dict:
+        """上传文本并创建任务（文本直接从内存上传，不落盘）"""
         with self.semaphore:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-                f.write(text)
-                temp_path = f.name
-
-            try:
-                with open(temp_path, 'rb') as f:
-                    files = {"file": ("temp_text.txt", f)}
-                    data = {"purpose": "t2a_async_input"}
-                    resp = requests.post(UPLOAD_URL, headers=HEADERS, data=data, files=files)
-
-                file_id = resp.json()["file"]["file_id"]
-
-                payload = {
-                    "model": "speech-2.6-hd",
-                    "text_file_id": file_id,
-                    "voice_setting": {
-                        "voice_id": VOICE_IDS[speaker],
-                        "speed": 1.0, "vol": 1.0, "pitch": 0
-                    },
-                    "audio_setting": {
-                        "sample_rate": 32000, "format": "mp3", "bitrate": 128000, "channel": 1
-                    }
-                }
+            buffer = io.BytesIO(text.encode("utf-8"))
+            files = {"file": ("temp_text.txt", buffer, "text/plain")}
+            data = {"purpose": "t2a_async_input"}
+            with self.limiter.slot():
+                resp = requests.post(UPLOAD_URL, headers=HEADERS, data=data, files=files)
+
+            file_id = resp.json()["file"]["file_id"]
+
+            payload = {
+                "model": MODEL,
+                "text_file_id": file_id,
+                "voice_setting": self._voice_setting(speaker),
+                "audio_setting": self._audio_setting()
+            }
+            with self.limiter.slot():
                 resp = requests.post(T2A_ASYNC_URL, headers=HEADERS, json=payload)
-                task_id = resp.json().get("task_id")
-
-                return {"index": task_idx, "task_id": task_id, "speaker": speaker}
+            task_id = resp.json().get("task_id")
 
-            finally:
-                os.unlink(temp_path)
+            return {"index": task_idx, "task_id": task_id, "speaker": speaker}
 
     def _query_task(self, task_id: str) -> dict:
         """查询任务状态"""
         url = f"{TASK_QUERY_URL}?task_id={task_id}"
-        resp = requests.get(url, headers=HEADERS)
+        with self.limiter.slot():
+            resp = requests.get(url, headers=HEADERS)
         return resp.json()
 
     def _wait_task(self, task_id: str, max_wait: int = 600) -> str:
         """等待任务完成"""
+        progress = getattr(self._progress, "callback", _no_progress)
         start = time.time()
         while time.time() - start < max_wait:
             result = self._query_task(task_id)
             status = result.get("status", "")
+            progress("tts.polling", task_id=task_id, status=status, elapsed=round(time.time() - start, 2))
 
             if status == "Success":
                 return result.get("file_id")
@@ -128,23 +195,37 @@ class MiniMaxTTSService(BaseTTSService):
                 time.sleep(2)
         raise Exception(f"超时: {task_id}")
 
-    def _download_audio(self, file_id: str) -> bytes:
-        """下载音频"""
+    def _download_audio(self, file_id: str, output_path: str) -> str:
+        """流式下载音频到文件（校验完整性，失败自动重试）"""
         url = f"https://api.minimaxi.com/v1/files/retrieve_content?file_id={file_id}"
-        resp = requests.get(url, headers=HEADERS)
-        return resp.content
+        return download_to_file(url, output_path, headers=HEADERS)
 
     def generate(self, text: str, speaker: str, output_path: str) -> str:
-        """同步生成（不使用异步任务）"""
-        raise NotImplementedError("请使用 batch_generate 异步模式")
+        """生成单个片段（短文本走同步接口，长文本走异步任务）"""
+        if self._route(text) == "inline":
+            return write_atomic(self._synthesize_inline(text, speaker), output_path)
+
+        task = self._upload_and_create_task(text, speaker, 0)
+        file_id = self._wait_task(task["task_id"])
+        return self._download_audio(file_id, output_path)
 
     def batch_generate(
         self,
         dialogues: List[Dialogue],
         output_dir: str,
-        skip_existing: bool = True
+        skip_existing: bool = True,
+        progress: ProgressCallback = _no_progress
     ) -> List[str]:
-        """批量生成"""
+        """
+        批量生成
+
+        按音色分成独立的工作队列，每个队列内长文本优先（缩短总耗时），
+        每个 worker 独立完成 提交 -> 轮询 -> 下载，某个音色变慢不会占用其他音色的并发。
+
+        progress 依次收到（从 worker 线程调用）：
+        tts.submitted / tts.polling（异步任务）/ tts.downloaded 或 tts.failed，
+        均带 index、speaker，完成事件带 elapsed、done、total。
+        """
         os.makedirs(output_dir, exist_ok=True)
 
         # 过滤已存在的
@@ -158,89 +239,90 @@ class MiniMaxTTSService(BaseTTSService):
                 print("所有片段已存在")
                 return []
 
-        # === 阶段 1: 并发提交任务 ===
-        print("=" * 60)
-        print("[TTS] 阶段 1: 并发提交任务...")
-        print("=" * 60)
+        # 每个音色一个队列，长文本优先
+        queues = {}
+        for d in dialogues:
+            queues.setdefault(d.speaker, []).append(d)
+        for speaker in queues:
+            queues[speaker] = deque(sorted(queues[speaker], key=lambda d: len(d.text), reverse=True))
 
-        tasks = []
-        with ThreadPoolExecutor(max_workers=self.max_concurrent) as executor:
-            futures = {
-                executor.submit(self._upload_and_create_task, d.text, d.speaker, d.index): d
-                for d in dialogues
-            }
+        self.voice_stats = {speaker: VoiceStats(speaker=speaker) for speaker in queues}
 
-            for future in as_completed(futures):
-                d = futures[future]
-                try:
-                    result = future.result()
-                    tasks.append(result)
-                    print(f"[{d.index+1}/{len(dialogues)}] 已提交")
-                except Exception as e:
-                    print(f"[{d.index}] 失败: {e}")
-
-        tasks.sort(key=lambda x: x["index"])
-        print(f"\n成功提交 {len(tasks)}/{len(dialogues)} 个任务")
-
-        # === 阶段 2: 并发等待完成 ===
-        print("\n" + "=" * 60)
-        print("[TTS] 阶段 2: 并发等待完成...")
+        print("=" * 60)
+        print("[TTS] 按音色并行生成: " + "，".join(
+            f"{speaker} {len(q)} 段 × {self._voice_concurrency(speaker)} 并发"
+            for speaker, q in queues.items()
+        ))
         print("=" * 60)
 
-        completed = []
+        audio_parts = []
         lock = threading.Lock()
+        total = len(dialogues)
 
-        def process_task(task):
-            task_id = task["task_id"]
-            idx = task["index"]
-
-            try:
-                print(f"[{idx+1}/{len(tasks)}] 等待中...")
-                file_id = self._wait_task(task_id)
+        def voice_worker(speaker: str):
+            queue = queues[speaker]
+            stats = self.voice_stats[speaker]
+            while True:
                 with lock:
-                    task["file_id"] = file_id
-                    completed.append(task)
-                    print(f"[{idx+1}/{len(tasks)}] 完成!")
-            except Exception as e:
-                print(f"[{idx+1}/{len(tasks)}] 失败: {e}")
+                    if not queue:
+                        return
+                    d = queue.popleft()
 
-        with ThreadPoolExecutor(max_workers=self.max_concurrent) as executor:
-            executor.map(process_task, tasks)
+                path = os.path.join(output_dir, f"part_{d.index+1:03d}.mp3")
+                item = {"index": d.index + 1, "speaker": speaker}
 
-        print(f"\n完成 {len(completed)}/{len(tasks)} 个任务")
+                def item_progress(event: str, **data):
+                    progress(event, **item, **data)
 
-        # === 阶段 3: 并发下载 ===
-        print("\n" + "=" * 60)
-        print("[TTS] 阶段 3: 并发下载音频...")
-        print("=" * 60)
+                # 轮询事件由 _wait_task 通过线程局部的回调发出
+                self._progress.callback = item_progress
+                item_progress("tts.submitted", route=self._route(d.text), chars=len(d.text))
+                start = time.time()
+                try:
+                    self.generate(d.text, d.speaker, path)
+                    elapsed = time.time() - start
+                    with lock:
+                        stats.record(elapsed)
+                        audio_parts.append(path)
+                        done = len(audio_parts)
+                        print(f"[{d.index+1}] {speaker} 完成 ({elapsed:.1f}s) - {done}/{total}")
+                    item_progress("tts.downloaded", elapsed=round(elapsed, 2), done=done, total=total)
+                except Exception as e:
+                    with lock:
+                        stats.failed += 1
+                    print(f"[{d.index+1}] {speaker} 失败: {e}")
+                    item_progress("tts.failed", error=str(e), elapsed=round(time.time() - start, 2))
+
+        workers = [
+            speaker
+            for speaker, queue in queues.items()
+            for _ in range(min(self._voice_concurrency(speaker), len(queue)))
+        ]
+        with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+            list(executor.map(voice_worker, workers))
 
-        audio_parts = []
-        lock2 = threading.Lock()
-
-        def download_and_save(task):
-            idx = task["index"]
-            file_id = task.get("file_id")
-            if not file_id:
-                return
-
-            try:
-                audio = self._download_audio(file_id)
-                path = os.path.join(output_dir, f"part_{idx+1:03d}.mp3")
-                with open(path, "wb") as f:
-                    f.write(audio)
-                with lock2:
-                    audio_parts.append(path)
-                    print(f"[{idx+1}/{len(completed)}] 下载完成")
-            except Exception as e:
-                print(f"[{idx+1}] 下载失败: {e}")
-
-        with ThreadPoolExecutor(max_workers=self.max_concurrent) as executor:
-            executor.map(download_and_save, completed)
+        print(f"\n完成 {len(audio_parts)}/{total} 个片段")
+        for stats in self.voice_stats.values():
+            print(f"  {stats.summary()}")
 
         return sorted(audio_parts)
 
-    def merge_audio(self, audio_parts: List[str], output_path: str, skip_existing: bool = True) -> bool:
-        """使用 FFmpeg 拼接音频（重新编码，避免文件头损坏问题）"""
+    def merge_audio(
+        self,
+        audio_parts: List[str],
+        output_path: str,
+        skip_existing: bool = True,
+        target_lufs: Optional[float] = TARGET_LUFS,
+        progress: ProgressCallback = _no_progress
+    ) -> bool:
+        """
+        使用 FFmpeg 拼接音频（片段逐个转码统一采样率与声道并缓存，再用 concat demuxer 拼接；
+        片段完整性已在下载时校验）
+
+        每个片段的时长和响度只测量一次并缓存在片段目录的 manifest.json，
+        拼接时按缓存的响度对每个片段施加增益，使各音色音量一致。
+        完成后 progress 收到 tts.merged（parts、duration、elapsed）。
+        """
         if not audio_parts:
             print("没有音频片段可拼接")
             return False
@@ -254,37 +336,34 @@ class MiniMaxTTSService(BaseTTSService):
             os.path.basename(x).split('_')[1].split('.')[0]
         ))
 
-        list_file = os.path.join(os.path.dirname(audio_parts[0]), "concat_list.txt")
-        with open(list_file, "w") as f:
-            for path in audio_parts:
-                f.write(f"file '{os.path.abspath(path)}'\n")
-
-        # 重新编码合并，忽略文件头问题
-        cmd = [
-            "ffmpeg", "-y",
-            "-f", "concat",
-            "-safe", "0",
-            "-i", list_file,
-            "-acodec", "libmp3lame",
-            "-q:a", "2",
-            "-ar", "44100",
-            "-ac", "2",
-            output_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode != 0:
-            print(f"合并失败: {result.stderr[-300:]}")
-            os.remove(list_file)
+        start = time.time()
+        timeline = AudioTimeline.build(
+            audio_parts,
+            manifest_dir=os.path.dirname(audio_parts[0]),
+            target_lufs=target_lufs
+        )
+        if not timeline.render(output_path):
             return False
 
-        os.remove(list_file)
         print(f"拼接完成: {output_path}")
-        print(f"共 {len(audio_parts)} 个片段")
+        print(f"共 {len(audio_parts)} 个片段，时长 {timeline.total_duration:.1f}s")
+        progress(
+            "tts.merged",
+            parts=len(audio_parts),
+            duration=round(timeline.total_duration, 2),
+            elapsed=round(time.time() - start, 2)
+        )
         return True
 
-    def merge_with_intro(self, intro_path: str, body_path: str, output_path: str, skip_existing: bool = True) -> bool:
-        """将 intro 和正文合并"""
+    def merge_with_intro(
+        self,
+        intro_path: str,
+        body_path: str,
+        output_path: str,
+        skip_existing: bool = True,
+        target_lufs: Optional[float] = TARGET_LUFS
+    ) -> bool:
+        """将 intro 和正文合并（intro 同样归一化到目标响度）"""
         if not os.path.exists(intro_path):
             print(f"警告: Intro 文件不存在: {intro_path}")
             return False
@@ -298,31 +377,14 @@ class MiniMaxTTSService(BaseTTSService):
             print(f"已存在，跳过合并: {output_path}")
             return True
 
-        # FFmpeg concat 合并
-        list_file = os.path.join(os.path.dirname(body_path), "intro_concat.txt")
-        with open(list_file, "w") as f:
-            f.write(f"file '{os.path.abspath(intro_path)}'\n")
-            f.write(f"file '{os.path.abspath(body_path)}'\n")
-
-        cmd = [
-            "ffmpeg", "-y",
-            "-f", "concat",
-            "-safe", "0",
-            "-i", list_file,
-            "-acodec", "libmp3lame",
-            "-q:a", "2",
-            "-ar", "44100",
-            "-ac", "2",
-            output_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode != 0:
-            print(f"合并失败: {result.stderr[-300:]}")
-            os.remove(list_file)
+        timeline = AudioTimeline.build(
+            [intro_path, body_path],
+            manifest_dir=os.path.dirname(body_path),
+            target_lufs=target_lufs
+        )
+        if not timeline.render(output_path):
             return False
 
-        os.remove(list_file)
         print(f"已添加 Intro: {output_path}")
         return True
 
@@ -372,7 +434,9 @@ def generate_podcast_audio(
         audio_parts = generate_podcast_audio(raw_dialogues, splits_dir, provider=provider)
     else:
         tts = MiniMaxTTSService()
-        audio_parts = tts.batch_generate(dialogues, splits_dir)
+        segments = tts.plan_segments(dialogues)
+        print(f"{len(dialogues)} 段对话规划为 {len(segments)} 个 TTS 任务")
+        audio_parts = tts.batch_generate(segments, splits_dir)
 
     if merge and audio_parts:
         date = os.path.basename(output_dir)
@@ -403,9 +467,9 @@ def main():
     dialogues = parse_dialogues(script_path)
     print(f"解析到 {len(dialogues)} 段对话")
 
-    luo = sum(1 for d in dialogues if d.speaker == "luoyonghao")
-    wang = sum(1 for d in dialogues if d.speaker == "wangziru")
-    print(f"罗永浩: {luo} 次，王自如: {wang} 次\n")
+    roster = get_voice_roster()
+    counts = Counter(d.speaker for d in dialogues)
+    print("，".join(f"{roster.label(s)}: {n} 次" for s, n in counts.items()) + "\n")
 
     output_path = generate_podcast_audio(dialogues, base_dir)
     print(f"\n完成: {output_path}")
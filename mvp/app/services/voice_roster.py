@@ -0,0 +1,137 @@
+"""主播/音色名册
+
+说话人键（如 luoyonghao）是逐字稿解析和语音合成共用的标识：
+- 主播标签（彪悍罗、罗永浩 ...）-> 说话人键：解析逐字稿时每行一次字典查找
+- 说话人键 + TTS 提供方 -> 音色 ID 与音色参数：合成时查找
+
+名册在内存中构建好所有查找表，修改时整体替换（set_voice_roster），读取方无需加锁。
+后端从数据库 voice_hosts 表加载；MVP 使用 DEFAULT_HOSTS。
+SCRIPT_SPEAKER_ALIASES（如 "主持人=luoyonghao,嘉宾=wangziru"）可以补充标签。
+"""
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Union
+
+MINIMAX = "minimax"
+ELEVENLABS = "elevenlabs"
+
+# 各提供方的默认音色参数（主播的 voices 配置会覆盖）
+DEFAULT_VOICE_SETTINGS: Dict[str, dict] = {
+    MINIMAX: {"speed": 1.0, "vol": 1.0, "pitch": 0},
+    ELEVENLABS: {"stability": 0.5, "similarity_boost": 0.5, "style": 0.0, "use_speaker_boost": True},
+}
+
+DEFAULT_HOSTS: List[dict] = [
+    {
+        "key": "luoyonghao",
+        "name": "彪悍罗",
+        "aliases": ["罗永浩"],
+        "voices": {
+            MINIMAX: {"voice_id": "luoyonghao2"},
+            ELEVENLABS: {"voice_id": os.getenv("ELEVENLABS_VOICE_LUO", "")},
+        },
+    },
+    {
+        "key": "wangziru",
+        "name": "OK王",
+        "aliases": ["王自如"],
+        "voices": {
+            MINIMAX: {"voice_id": "wangziru_test"},
+            ELEVENLABS: {"voice_id": os.getenv("ELEVENLABS_VOICE_ZIRU", "")},
+        },
+    },
+]
+
+
+class VoiceNotConfigured(ValueError):
+    """说话人没有配置该提供方的音色"""
+
+
+@dataclass
+class Host:
+    """主播"""
+    key: str                 # 说话人键
+    name: str                # 逐字稿中的主标签（输出 Markdown 时使用）
+    aliases: List[str] = field(default_factory=list)
+    voices: Dict[str, dict] = field(default_factory=dict)  # 提供方 -> {"voice_id", 音色参数...}
+    enabled: bool = True
+
+
+def _extra_aliases() -> Dict[str, str]:
+    aliases = {}
+    for pair in os.getenv("SCRIPT_SPEAKER_ALIASES", "").split(","):
+        label, sep, speaker = pair.partition("=")
+        if sep and label.strip() and speaker.strip():
+            aliases[label.strip()] = speaker.strip()
+    return aliases
+
+
+class VoiceRoster:
+    """不可变的主播名册（所有查找都是字典读取）"""
+
+    def __init__(self, hosts: Iterable[Union[Host, dict]]):
+        self.hosts: Dict[str, Host] = {}
+        self.aliases: Dict[str, str] = {}
+        self.labels: Dict[str, str] = {}
+
+        for host in hosts:
+            if isinstance(host, dict):
+                host = Host(**host)
+            if not host.enabled:
+                continue
+            self.hosts[host.key] = host
+            self.labels[host.key] = host.name
+            for label in [host.name, *host.aliases]:
+                label = label.strip()
+                if label:
+                    self.aliases.setdefault(label, host.key)
+
+        for label, key in _extra_aliases().items():
+            if key in self.hosts:
+                self.aliases.setdefault(label, key)
+
+    def resolve(self, label: str) -> Optional[str]:
+        """标签 -> 说话人键"""
+        return self.aliases.get(label.strip())
+
+    def label(self, speaker: str) -> str:
+        """说话人键 -> 主标签"""
+        return self.labels.get(speaker, speaker)
+
+    def voice(self, speaker: str, provider: str) -> dict:
+        """
+        说话人在某个提供方的音色配置
+
+        Returns:
+            {"voice_id": ..., 音色参数...}（默认参数已合并）
+
+        Raises:
+            VoiceNotConfigured: 没有该说话人或没有配置 voice_id
+        """
+        host = self.hosts.get(speaker)
+        voice = (host.voices.get(provider) if host else None) or {}
+        if not voice.get("voice_id"):
+            raise VoiceNotConfigured(f"未配置 {speaker} 的 {provider} 音色 ID")
+        return {**DEFAULT_VOICE_SETTINGS.get(provider, {}), **voice}
+
+
+_roster: Optional[VoiceRoster] = None
+_roster_lock = threading.Lock()
+
+
+def get_voice_roster() -> VoiceRoster:
+    """当前名册（未加载时使用 DEFAULT_HOSTS）"""
+    global _roster
+    if _roster is None:
+        with _roster_lock:
+            if _roster is None:
+                _roster = VoiceRoster(DEFAULT_HOSTS)
+    return _roster
+
+
+def set_voice_roster(roster: VoiceRoster):
+    """替换名册（主播配置修改后调用）"""
+    global _roster
+    with _roster_lock:
+        _roster = roster
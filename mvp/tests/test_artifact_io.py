@@ -0,0 +1,111 @@
+"""Tests for the JSON Lines pipeline artifacts"""
+import json
+import os
+import pytest
+from app.services.artifact_io import (
+    SCHEMA_VERSION, ArtifactFormatError, NewsRecord, iter_jsonl, load_news, load_script,
+    read_header, write_jsonl, write_news, write_script
+)
+from app.services.script_format import Turn
+
+
+def _set_mtime(path, seconds):
+    os.utime(path, (seconds, seconds))
+
+
+class TestJsonl:
+    """Test the header, schema check and record streaming"""
+
+    def test_header_and_records(self, tmp_path):
+        """Test the header carries kind, schema and metadata, and records stream back in order"""
+        path = str(tmp_path / "news.jsonl")
+        count = write_news(path, [{"title": " a ", "summary": "第一行\n第二行"}, NewsRecord(title="b")], date="2026-02-05")
+
+        header = read_header(path, "news")
+        assert count == 2
+        assert header["kind"] == "news"
+        assert header["schema"] == SCHEMA_VERSION
+        assert header["date"] == "2026-02-05"
+        records = list(iter_jsonl(path, "news"))
+        assert [r["title"] for r in records] == ["a", "b"]
+        assert records[0]["summary"] == "第一行\n第二行"
+
+    def test_kind_mismatch(self, tmp_path):
+        """Test reading an artifact as the wrong kind fails"""
+        path = str(tmp_path / "talks.jsonl")
+        write_jsonl(path, "script", [{"speaker": "luoyonghao", "text": "hi"}])
+
+        with pytest.raises(ArtifactFormatError, match="类型不符"):
+            list(iter_jsonl(path, "news"))
+
+    def test_newer_schema_rejected(self, tmp_path):
+        """Test files written by a newer schema version are refused"""
+        path = tmp_path / "news.jsonl"
+        path.write_text(json.dumps({"type": "header", "kind": "news", "schema": SCHEMA_VERSION + 1}) + "\n")
+
+        with pytest.raises(ArtifactFormatError, match="schema"):
+            read_header(str(path), "news")
+
+    def test_missing_header(self, tmp_path):
+        """Test a file without a header line is rejected"""
+        path = tmp_path / "news.jsonl"
+        path.write_text('{"title": "a"}\n')
+
+        with pytest.raises(ArtifactFormatError, match="文件头"):
+            list(iter_jsonl(str(path)))
+
+
+class TestLoadNews:
+    """Test news.jsonl with the legacy news.txt fallback"""
+
+    def test_legacy_news_txt(self, tmp_path):
+        """Test news.txt blocks, including multi-line summaries, are parsed"""
+        (tmp_path / "news.txt").write_text(
+            "新闻1: 英伟达发布新芯片\nURL: https://a/1\n摘要: 第一行\n第二行\n\n"
+            "新闻2: 苹果推出新款 MacBook\nURL: https://a/2\n摘要: 续航提升\n",
+            encoding="utf-8"
+        )
+
+        news = load_news(str(tmp_path))
+
+        assert [n["title"] for n in news] == ["英伟达发布新芯片", "苹果推出新款 MacBook"]
+        assert news[0]["url"] == "https://a/1"
+        assert news[0]["summary"] == "第一行\n第二行"
+
+    def test_jsonl_preferred(self, tmp_path):
+        """Test news.jsonl wins over news.txt"""
+        (tmp_path / "news.txt").write_text("新闻1: 旧\nURL: x\n摘要: y\n", encoding="utf-8")
+        write_news(str(tmp_path / "news.jsonl"), [{"title": "新"}])
+
+        assert [n["title"] for n in load_news(str(tmp_path))] == ["新"]
+
+    def test_missing(self, tmp_path):
+        """Test a day without either file raises FileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            load_news(str(tmp_path))
+
+
+class TestLoadScript:
+    """Test talks.jsonl versus a hand-edited talks.txt"""
+
+    def test_jsonl_used_when_current(self, tmp_path):
+        """Test talks.jsonl is read when it is not older than talks.txt"""
+        turns = write_script(str(tmp_path), "**彪悍罗：**你好\n**王自如：**ok")
+
+        assert load_script(str(tmp_path)) == turns == [Turn("luoyonghao", "你好"), Turn("wangziru", "ok")]
+
+    def test_edited_text_wins(self, tmp_path):
+        """Test a talks.txt edited after talks.jsonl was written is parsed instead"""
+        write_script(str(tmp_path), "**彪悍罗：**你好")
+        text_path = tmp_path / "talks.txt"
+        text_path.write_text("**彪悍罗：**改过的台词", encoding="utf-8")
+        _set_mtime(tmp_path / "talks.jsonl", 1_000_000)
+        _set_mtime(text_path, 2_000_000)
+
+        assert load_script(str(tmp_path)) == [Turn("luoyonghao", "改过的台词")]
+
+    def test_text_only(self, tmp_path):
+        """Test a directory with only talks.txt still loads"""
+        (tmp_path / "talks.txt").write_text("**彪悍罗：**只有原文", encoding="utf-8")
+
+        assert load_script(str(tmp_path)) == [Turn("luoyonghao", "只有原文")]
@@ -0,0 +1,143 @@
+"""Tests for the content-addressed artifact store"""
+import io
+import os
+import pytest
+from app.services import artifact_store
+from app.services.artifact_store import LocalArtifactStore, S3ArtifactStore, file_digest
+
+
+class FakeS3Error(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3Client:
+    """In-memory stand-in for the boto3 S3 client calls the store uses"""
+
+    def __init__(self):
+        self.objects = {}
+        self.puts = []
+
+    def put_object(self, Bucket, Key, Body):
+        data = Body if isinstance(Body, bytes) else Body.read()
+        self.objects[(Bucket, Key)] = data
+        self.puts.append(Key)
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise FakeS3Error("NoSuchKey")
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise FakeS3Error("404")
+        return {}
+
+
+def _write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+class TestLocalArtifactStore:
+    """Test the on-disk store"""
+
+    def test_identical_content_stored_once(self, tmp_path):
+        """Test two keys with the same content share one blob and one inode"""
+        store = LocalArtifactStore(str(tmp_path / "store"))
+        source = _write(tmp_path / "a.mp3", b"segment audio")
+
+        first = store.put_file("segments/a.mp3", source)
+        second = store.put_file("2026-02-05/2026-02-05.mp3", source)
+
+        assert first == second == file_digest(source)
+        blobs = [f for _, _, files in os.walk(store.blob_dir) for f in files]
+        assert blobs == [first]
+        assert os.path.samefile(store._ref_path("segments/a.mp3"), store._ref_path("2026-02-05/2026-02-05.mp3"))
+
+    def test_get_file_links_or_copies(self, tmp_path):
+        """Test link=True hardlinks the blob and the default copies it"""
+        store = LocalArtifactStore(str(tmp_path / "store"))
+        store.put_bytes("segments/a.mp3", b"audio")
+
+        assert store.get_file("segments/a.mp3", str(tmp_path / "linked.mp3"), link=True)
+        assert store.get_file("segments/a.mp3", str(tmp_path / "copied.mp3"))
+
+        ref = store._ref_path("segments/a.mp3")
+        assert os.path.samefile(ref, tmp_path / "linked.mp3")
+        assert not os.path.samefile(ref, tmp_path / "copied.mp3")
+        assert (tmp_path / "copied.mp3").read_bytes() == b"audio"
+
+    def test_link_falls_back_to_copy(self, tmp_path, monkeypatch):
+        """Test a failing hardlink (e.g. across devices) falls back to a copy"""
+        store = LocalArtifactStore(str(tmp_path / "store"))
+        store.put_bytes("segments/a.mp3", b"audio")
+
+        def no_link(src, dst):
+            raise OSError(18, "Invalid cross-device link")
+
+        monkeypatch.setattr(artifact_store.os, "link", no_link)
+        assert store.get_file("segments/a.mp3", str(tmp_path / "out.mp3"), link=True)
+
+        assert (tmp_path / "out.mp3").read_bytes() == b"audio"
+        assert not os.path.samefile(store._ref_path("segments/a.mp3"), tmp_path / "out.mp3")
+        assert not [f for f in os.listdir(tmp_path) if f.endswith(".part")]
+
+    def test_missing_key(self, tmp_path):
+        """Test a key that was never stored reads as absent"""
+        store = LocalArtifactStore(str(tmp_path / "store"))
+
+        assert not store.get_file("segments/missing.mp3", str(tmp_path / "out.mp3"))
+        assert not store.exists("segments/missing.mp3")
+        assert store.digest("segments/missing.mp3") is None
+        assert not (tmp_path / "out.mp3").exists()
+
+    def test_rejects_escaping_keys(self, tmp_path):
+        """Test keys cannot leave the store root"""
+        store = LocalArtifactStore(str(tmp_path / "store"))
+        with pytest.raises(ValueError):
+            store.put_bytes("../outside.mp3", b"x")
+
+
+class TestS3ArtifactStore:
+    """Test the S3 store against an injected fake client"""
+
+    @pytest.fixture
+    def store(self):
+        return S3ArtifactStore("bucket", prefix="podcast", client=FakeS3Client())
+
+    def test_round_trip(self, store, tmp_path):
+        """Test put / exists / get return the same content"""
+        digest = store.put_file("2026-02-05/news.jsonl", _write(tmp_path / "news.jsonl", b'{"title": "a"}\n'))
+
+        assert store.exists("2026-02-05/news.jsonl")
+        assert store.digest("2026-02-05/news.jsonl") == digest
+        assert store.get_file("2026-02-05/news.jsonl", str(tmp_path / "out" / "news.jsonl"))
+        assert (tmp_path / "out" / "news.jsonl").read_bytes() == b'{"title": "a"}\n'
+        assert ("bucket", f"podcast/blobs/{digest[:2]}/{digest}") in store.client.objects
+
+    def test_existing_blob_not_uploaded_again(self, store, tmp_path):
+        """Test identical content under a new key only writes the ref"""
+        source = _write(tmp_path / "a.mp3", b"segment audio")
+        store.put_file("segments/a.mp3", source)
+        store.client.puts.clear()
+
+        store.put_file("segments/b.mp3", source)
+
+        assert store.client.puts == ["podcast/refs/segments/b.mp3"]
+
+    def test_missing_key(self, store, tmp_path):
+        """Test a missing ref reads as absent instead of raising"""
+        assert not store.exists("segments/missing.mp3")
+        assert not store.get_file("segments/missing.mp3", str(tmp_path / "out.mp3"))
+
+    def test_corrupt_blob_rejected(self, store, tmp_path):
+        """Test content that does not match its hash is not written"""
+        digest = store.put_bytes("segments/a.mp3", b"audio")
+        store.client.objects[("bucket", f"podcast/blobs/{digest[:2]}/{digest}")] = b"tampered"
+
+        with pytest.raises(IOError):
+            store.get_file("segments/a.mp3", str(tmp_path / "out.mp3"))
+        assert not (tmp_path / "out.mp3").exists()
@@ -0,0 +1,175 @@
+"""Tests for batch mode with stubbed RSS, LLM and TTS"""
+import os
+import re
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+import pytest
+from app import podcast_pipeline
+from app.graph import nodes
+from app.services.artifact_io import load_news
+from app.services.llm import DeepSeekService
+from app.services.rate_limit import DEEPSEEK, RateLimiter, set_rate_limiter
+from app.services.rss import RSSItem, RSSService
+
+DAYS = ["2026-02-03", "2026-02-04", "2026-02-05"]
+FEEDS = ["https://a.example/rss", "https://b.example/rss"]
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+class FakeCompletions:
+    """OpenAI chat.completions stand-in: one reply per request, tracks concurrency"""
+
+    def __init__(self, fail_day=None):
+        self.fail_day = fail_day
+        self.days = Counter()
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def create(self, model, messages, max_tokens, temperature):
+        content = messages[-1]["content"]
+        day = _DATE.search(content).group(0)
+        with self._lock:
+            self.days[day] += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.02)
+            if day == self.fail_day:
+                raise RuntimeError(f"upstream error for {day}")
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=f"**罗永浩**：{day}\n**王自如**：好"))],
+                usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15),
+            )
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def feeds(monkeypatch):
+    """Each feed has two stories per day, one out-of-range story and one undated story"""
+    fetched = Counter()
+
+    def fetch_sync(self, url, limit=10):
+        fetched[url] += 1
+        items = [
+            RSSItem(title=f"{day} {url} 新闻{i}", url=f"{url}/{day}/{i}", summary="摘要",
+                    published_at=f"{day}T0{i}:00:00Z")
+            for day in DAYS for i in range(2)
+        ]
+        items.append(RSSItem(title="旧闻", url=f"{url}/old", summary="", published_at="Sun, 01 Feb 2026 08:00:00 GMT"))
+        items.append(RSSItem(title="无日期", url=f"{url}/none", summary=""))
+        return items
+
+    monkeypatch.setattr(RSSService, "fetch_sync", fetch_sync)
+    return fetched
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(podcast_pipeline, "OUTPUT_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def limiter():
+    limiter = RateLimiter(DEEPSEEK, max_concurrent=1)
+    set_rate_limiter(DEEPSEEK, limiter)
+    yield limiter
+    set_rate_limiter(DEEPSEEK, None)
+
+
+@pytest.fixture
+def tts(monkeypatch):
+    """Replaces synthesis and merging; records which days reached them"""
+    days = Counter()
+    lock = threading.Lock()
+
+    def tts_node(state):
+        with lock:
+            days[state["date"]] += 1
+        return {"audio_parts": [f"{state['date']}-part"]}
+
+    def merge_node(state):
+        path = os.path.join(state["base_dir"], f"{state['date']}.mp3")
+        with open(path, "wb") as f:
+            f.write(b"mp3")
+        return {"audio_path": path}
+
+    monkeypatch.setattr(nodes, "tts_node", tts_node)
+    monkeypatch.setattr(nodes, "merge_node", merge_node)
+    return days
+
+
+def _use_llm(monkeypatch, completions):
+    llm = DeepSeekService(api_key="test")
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(nodes, "_llm", lambda: llm)
+
+
+class TestBatch:
+    """Test feed fan-in, per-day execution and shared rate limiting"""
+
+    def test_prefetch_buckets_by_day(self, feeds, output_dir):
+        """Test each feed is fetched once and stories land in their publish day"""
+        ready = podcast_pipeline._prefetch_news(DAYS, FEEDS)
+
+        assert ready == DAYS
+        assert feeds == {url: 1 for url in FEEDS}
+        for day in DAYS:
+            news = load_news(str(output_dir / day))
+            assert sorted(item["title"] for item in news) == sorted(
+                f"{day} {url} 新闻{i}" for url in FEEDS for i in range(2)
+            )
+            assert {item["source"] for item in news} == set(FEEDS)
+
+    def test_prefetch_keeps_existing_news_on_resume(self, feeds, output_dir):
+        """Test a rerun keeps the news of days that already have it"""
+        podcast_pipeline._prefetch_news(DAYS[:1], FEEDS[:1])
+        podcast_pipeline._prefetch_news(DAYS[:1], FEEDS)
+
+        assert {item["source"] for item in load_news(str(output_dir / DAYS[0]))} == {FEEDS[0]}
+
+    def test_every_day_runs_once_through_the_limiter(self, feeds, output_dir, limiter, tts, monkeypatch):
+        """Test each day gets one script and one TTS pass, with LLM calls serialized by the limiter"""
+        completions = FakeCompletions()
+        _use_llm(monkeypatch, completions)
+
+        results = podcast_pipeline.run_batch(DAYS[0], DAYS[-1], FEEDS, workers=3)
+
+        assert results == {day: "done" for day in DAYS}
+        assert feeds == {url: 1 for url in FEEDS}
+        assert completions.days == {day: 1 for day in DAYS}
+        assert tts == {day: 1 for day in DAYS}
+        assert limiter.requests == len(DAYS)
+        assert completions.max_active == 1
+        for day in DAYS:
+            assert (output_dir / day / f"{day}.mp3").exists()
+
+    def test_failed_day_does_not_abort_others(self, feeds, output_dir, limiter, tts, monkeypatch):
+        """Test one day's LLM failure is reported while the other days finish"""
+        completions = FakeCompletions(fail_day=DAYS[1])
+        _use_llm(monkeypatch, completions)
+
+        results = podcast_pipeline.run_batch(DAYS[0], DAYS[-1], FEEDS, workers=3)
+
+        assert results[DAYS[0]] == "done"
+        assert results[DAYS[2]] == "done"
+        assert results[DAYS[1]].startswith("failed: ")
+        assert "upstream error" in results[DAYS[1]]
+        assert completions.days == {day: 1 for day in DAYS}
+        assert tts == {DAYS[0]: 1, DAYS[2]: 1}
+
+    def test_days_without_news_are_skipped(self, feeds, output_dir, limiter, tts, monkeypatch):
+        """Test days with no stories are skipped without any LLM call"""
+        completions = FakeCompletions()
+        _use_llm(monkeypatch, completions)
+
+        results = podcast_pipeline.run_batch("2026-02-05", "2026-02-06", FEEDS, no_tts=True)
+
+        assert results == {"2026-02-05": "done", "2026-02-06": "skipped"}
+        assert completions.days == {"2026-02-05": 1}
+        assert tts == {}
@@ -0,0 +1,148 @@
+"""Tests for the map-reduce script generation"""
+import threading
+from app.services.llm import (
+    LLMResponse, generate_script_segments, parse_stitch_output, stitch_script_segments
+)
+
+
+class FakeLLM:
+    """Answers segment requests per news title and stitch requests with a fixed reply"""
+
+    def __init__(self, stitch_reply="", stitch_error=None):
+        self.stitch_reply = stitch_reply
+        self.stitch_error = stitch_error
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def generate_messages(self, messages, max_tokens=4096, temperature=0.7):
+        user = messages[-1]["content"]
+        with self._lock:
+            self.calls.append(user)
+        if "新闻素材" in user:
+            title = user.split("新闻素材：", 1)[1].split("URL:")[0].split("：", 1)[1].strip()
+            return LLMResponse(text=f"\n**罗永浩**：说说{title}\n**王自如**：好的{title}\n")
+        if self.stitch_error:
+            raise self.stitch_error
+        return LLMResponse(text=self.stitch_reply)
+
+
+def _segments(*titles):
+    return [
+        {"index": i, "title": t, "script": f"**罗永浩**：{t}\n**王自如**：{t}"}
+        for i, t in enumerate(titles)
+    ]
+
+
+class TestParseStitchOutput:
+    """Test parsing of the [开场]/[过渡 N]/[结束] sections"""
+
+    def test_all_markers(self):
+        """Test each marker collects the dialogue lines below it"""
+        text = (
+            "[开场]\n**罗永浩**：欢迎\n**王自如**：大家好\n"
+            "[过渡 1]\n**罗永浩**：接下来\n"
+            "[过渡2]\n**王自如**：再看\n"
+            "[结束]\n**罗永浩**：再见\n"
+        )
+
+        assert parse_stitch_output(text) == {
+            "opening": "**罗永浩**：欢迎\n**王自如**：大家好",
+            "1": "**罗永浩**：接下来",
+            "2": "**王自如**：再看",
+            "closing": "**罗永浩**：再见",
+        }
+
+    def test_ignores_chatter_and_text_before_markers(self):
+        """Test lines outside markers and non-dialogue lines are dropped"""
+        text = "好的，下面是串联：\n**罗永浩**：游离\n[开场]\n说明文字\n  **罗永浩**：欢迎  \n"
+
+        assert parse_stitch_output(text) == {"opening": "**罗永浩**：欢迎"}
+
+    def test_missing_and_empty_markers(self):
+        """Test missing markers are absent and markers without dialogue are dropped"""
+        text = "[开场]\n\n[过渡 1]\n**王自如**：接下来\n"
+
+        assert parse_stitch_output(text) == {"1": "**王自如**：接下来"}
+        assert parse_stitch_output("没有任何标记") == {}
+
+    def test_out_of_order_markers(self):
+        """Test sections are keyed by marker, not by position"""
+        text = "[结束]\n**罗永浩**：再见\n[过渡 2]\n**王自如**：第二段后\n[开场]\n**罗永浩**：欢迎\n"
+
+        assert parse_stitch_output(text) == {
+            "closing": "**罗永浩**：再见",
+            "2": "**王自如**：第二段后",
+            "opening": "**罗永浩**：欢迎",
+        }
+
+
+class TestGenerateScriptSegments:
+    """Test the map stage"""
+
+    def test_segments_keep_news_order(self):
+        """Test segments come back in news order with index and title"""
+        llm = FakeLLM()
+        news = [{"title": f"新闻{i}", "url": "", "summary": ""} for i in range(6)]
+
+        segments = generate_script_segments(news, llm, max_workers=3)
+
+        assert [s["index"] for s in segments] == list(range(6))
+        assert [s["title"] for s in segments] == [f"新闻{i}" for i in range(6)]
+        assert segments[2]["script"] == "**罗永浩**：说说新闻2\n**王自如**：好的新闻2"
+        assert len(llm.calls) == 6
+
+    def test_empty(self):
+        """Test no news yields no segments"""
+        assert generate_script_segments([], FakeLLM()) == []
+
+
+class TestStitchScriptSegments:
+    """Test the reduce stage"""
+
+    def test_links_inserted_between_segments(self):
+        """Test opening, transitions and closing land in their slots"""
+        llm = FakeLLM(
+            "[开场]\n**罗永浩**：开场\n[过渡 1]\n**王自如**：过渡一\n"
+            "[过渡 2]\n**罗永浩**：过渡二\n[结束]\n**王自如**：结束\n"
+        )
+
+        script = stitch_script_segments(_segments("甲", "乙", "丙"), llm)
+
+        assert script.split("\n\n") == [
+            "**罗永浩**：开场",
+            "**罗永浩**：甲\n**王自如**：甲",
+            "**王自如**：过渡一",
+            "**罗永浩**：乙\n**王自如**：乙",
+            "**罗永浩**：过渡二",
+            "**罗永浩**：丙\n**王自如**：丙",
+            "**王自如**：结束",
+        ]
+
+    def test_missing_and_out_of_order_markers(self):
+        """Test absent links are skipped and reordered markers still land in place"""
+        llm = FakeLLM("[结束]\n**王自如**：结束\n[过渡 2]\n**罗永浩**：过渡二\n[过渡 9]\n**罗永浩**：多余\n")
+
+        script = stitch_script_segments(_segments("甲", "乙", "丙"), llm)
+
+        assert script.split("\n\n") == [
+            "**罗永浩**：甲\n**王自如**：甲",
+            "**罗永浩**：乙\n**王自如**：乙",
+            "**罗永浩**：过渡二",
+            "**罗永浩**：丙\n**王自如**：丙",
+            "**王自如**：结束",
+        ]
+
+    def test_stitch_failure_concatenates(self):
+        """Test a failed stitch call falls back to the bare segments"""
+        llm = FakeLLM(stitch_error=RuntimeError("boom"))
+
+        script = stitch_script_segments(_segments("甲", "乙"), llm)
+
+        assert script == "**罗永浩**：甲\n**王自如**：甲\n\n**罗永浩**：乙\n**王自如**：乙"
+
+    def test_no_segments_skips_llm(self):
+        """Test an empty segment list returns an empty script without calling the LLM"""
+        llm = FakeLLM()
+
+        assert stitch_script_segments([], llm) == ""
+        assert llm.calls == []
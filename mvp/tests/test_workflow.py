@@ -0,0 +1,107 @@
+"""Tests for the LangGraph pipeline with stubbed services"""
+import threading
+import pytest
+import app.podcast_pipeline as podcast_pipeline
+from app.graph import nodes
+from app.graph.workflow import run_workflow
+from app.services.artifact_io import load_script, write_news
+from app.services.llm import SEGMENT_MAX_TOKENS, STITCH_MAX_TOKENS, LLMResponse
+
+DATE = "2026-02-05"
+
+
+class FakeLLM:
+    """Counts segment and stitch requests and answers with fixed dialogue"""
+
+    def __init__(self):
+        self.segments = []
+        self.stitches = 0
+        self.whole = 0
+        self._lock = threading.Lock()
+
+    def generate_messages(self, messages, max_tokens=4096, temperature=0.7):
+        user = messages[-1]["content"]
+        with self._lock:
+            if max_tokens == SEGMENT_MAX_TOKENS:
+                title = user.split("新闻素材：", 1)[1].split("URL:")[0].split("：", 1)[1].strip()
+                self.segments.append(title)
+                return LLMResponse(text=f"**罗永浩**：聊聊{title}\n**王自如**：{title}不错")
+            if max_tokens == STITCH_MAX_TOKENS:
+                self.stitches += 1
+                return LLMResponse(text="[开场]\n**罗永浩**：开场\n[结束]\n**王自如**：结束")
+            self.whole += 1
+            return LLMResponse(text="**罗永浩**：整稿\n**王自如**：收到")
+
+
+@pytest.fixture
+def base_dir(tmp_path):
+    news = [{"title": f"新闻{i}", "url": f"https://n/{i}", "summary": f"摘要{i}"} for i in range(3)]
+    news.append({"title": "新闻1", "url": "https://n/dup", "summary": "重复"})
+    write_news(str(tmp_path / "news.jsonl"), news, date=DATE)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = FakeLLM()
+    monkeypatch.setattr(nodes, "_llm", lambda: fake)
+    return fake
+
+
+class TestWorkflow:
+    """Test routing, fan-out and checkpoint resume without network or TTS"""
+
+    def test_map_reduce_fan_out(self, base_dir, llm):
+        """Test each selected story gets exactly one segment and segments are stitched in order"""
+        state = run_workflow(DATE, base_dir, skip_fetch=True, map_reduce=True, no_tts=True)
+
+        assert sorted(llm.segments) == ["新闻0", "新闻1", "新闻2"]
+        assert llm.stitches == 1
+        assert llm.whole == 0
+        assert [s["index"] for s in state["script_segments"]] == [0, 1, 2]
+        body = state["final_script"]
+        assert body.index("开场") < body.index("聊聊新闻0") < body.index("聊聊新闻1") \
+            < body.index("聊聊新闻2") < body.index("结束")
+        assert len(load_script(base_dir)) >= 8
+        assert "audio_path" not in state
+
+    def test_single_pass(self, base_dir, llm):
+        """Test the default route writes the whole script in one request"""
+        state = run_workflow(DATE, base_dir, skip_fetch=True, no_tts=True)
+
+        assert llm.whole == 1
+        assert llm.segments == []
+        assert "整稿" in state["final_script"]
+        assert state["show_notes_path"].endswith("show_notes.md")
+
+    def test_resume_from_checkpoint(self, base_dir, llm, monkeypatch):
+        """Test a rerun after a failure continues from the checkpoint without redoing the script"""
+        generate_show_notes = podcast_pipeline._generate_show_notes
+        failures = []
+
+        def flaky_show_notes(*args):
+            if not failures:
+                failures.append(1)
+                raise RuntimeError("disk full")
+            return generate_show_notes(*args)
+
+        monkeypatch.setattr(podcast_pipeline, "_generate_show_notes", flaky_show_notes)
+
+        with pytest.raises(RuntimeError, match="disk full"):
+            run_workflow(DATE, base_dir, skip_fetch=True, map_reduce=True, no_tts=True)
+        assert len(llm.segments) == 3 and llm.stitches == 1
+
+        state = run_workflow(DATE, base_dir, skip_fetch=True, map_reduce=True, no_tts=True)
+
+        assert len(llm.segments) == 3
+        assert llm.stitches == 1
+        assert state["show_notes_path"].endswith("show_notes.md")
+        assert "聊聊新闻2" in state["final_script"]
+
+    def test_no_resume_starts_over(self, base_dir, llm):
+        """Test resume=False discards the checkpoint and regenerates"""
+        run_workflow(DATE, base_dir, skip_fetch=True, map_reduce=True, no_tts=True)
+        run_workflow(DATE, base_dir, skip_fetch=True, map_reduce=True, no_tts=True, resume=False)
+
+        assert len(llm.segments) == 6
+        assert llm.stitches == 2